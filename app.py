@@ -7,12 +7,23 @@ from app.components.audio_input import create_audio_input
 from app.components.image_input import create_image_input
 from app.utils.session_state import initialize_session_state
 from app.utils.env_loader import load_environment
-from app.models.legal_agent import get_legal_agent
+from app.utils.ocr import get_ocr_pipeline
+from app.utils.resources import health_check
+from app.models.legal_agent import DEFAULT_MODEL, LEGAL_MODELS, get_legal_agent
+from app.models.model_registry import get_model_registry
+from app.models.model_store import startup_missing_models
+from app.models.response_cache import get_response_cache
+from app.models.semantic_cache import get_semantic_cache
+from app.models.speech import get_speech_engine
+from app.models.warmup import FAILED, READY, start_model_warmup
 import pandas as pd
 
 # Load environment variables
 env = load_environment()
 
+# Load models in the background once per process (no-op on reruns)
+warmup = start_model_warmup()
+
 # Page configuration
 st.set_page_config(
     page_title="AI-Lawyer | Bangladesh Legal Consultant",
@@ -29,6 +40,18 @@ def main():
     # Initialize session state for persistent data
     initialize_session_state()
     
+    # Fail fast when running offline and the model cache has not been filled
+    # (checked once per process, and again after a model fails to load)
+    if env.get("USE_LOCAL_MODELS", True):
+        missing = startup_missing_models()
+        if missing:
+            st.error(
+                f"These models are not in the local model cache: {', '.join(missing)}. "
+                "Run `python -m app.models.model_store prefetch` on a machine with network access, "
+                "or set USE_LOCAL_MODELS=False."
+            )
+            st.stop()
+    
     # Create sidebar with navigation and options
     create_sidebar()
     
@@ -67,6 +90,14 @@ def main():
             legal_categories
         )
         
+        # Show warm-up progress instead of blocking the page
+        if warmup is not None:
+            warmup_state = warmup.state(LEGAL_MODELS.get(selected_category, DEFAULT_MODEL))
+            if warmup_state == FAILED:
+                st.warning(f"The {selected_category} specialist model could not be preloaded; it will be loaded with your first question.")
+            elif warmup_state not in (None, READY):
+                st.info(f"The {selected_category} specialist model is warming up ({warmup_state}). You can write your question now; it will be answered as soon as the model is ready.")
+        
         # Input components based on selected method
         user_input = None
         if input_method == "Text":
@@ -85,15 +116,39 @@ def main():
                 # Get the appropriate legal agent
                 legal_agent = get_legal_agent(selected_category)
                 
-                # Process query with the legal agent
-                response = legal_agent.process_query(
+                # Stream the legal agent's answer as it is generated
+                st.markdown("## Legal Advice")
+                advice_placeholder = st.empty()
+                stream = legal_agent.stream_query(
                     user_input, 
                     input_type=input_method.lower()
                 )
                 
-                # Display response
-                st.markdown("## Legal Advice")
-                st.markdown(response['advice'])
+                streamed_text = ""
+                for chunk in stream:
+                    streamed_text += chunk
+                    advice_placeholder.markdown(streamed_text)
+                
+                # Replace the raw stream with the post-processed advice
+                response = stream.response
+                advice_placeholder.markdown(response['advice'])
+                
+                if response.get('degraded'):
+                    st.caption("This answer was shortened to respond within the time limit.")
+                
+                document_usage = response.get('token_usage', {}).get('map')
+                if document_usage and document_usage['chunks_dropped']:
+                    st.caption(
+                        f"This document was too long to analyze in full: the first "
+                        f"{document_usage['chunks_analyzed']} of {document_usage['chunks']} sections were analyzed."
+                    )
+                
+                synthesis_usage = response.get('token_usage', {}).get('synthesis')
+                if synthesis_usage and synthesis_usage.get('truncated_tokens'):
+                    st.caption(
+                        f"The input was too long for the model: its last "
+                        f"{synthesis_usage['truncated_tokens']} tokens were left out of the analysis."
+                    )
                 
                 if response.get('citations'):
                     st.markdown("### References & Citations")
@@ -129,7 +184,9 @@ def main():
                     elif item['input_type'] == "Audio":
                         st.audio(item['query'])
                     else:  # Image
-                        st.image(item['query'])
+                        if item['query'].get('preview') is not None:
+                            st.image(item['query']['preview'])
+                        st.markdown(f"**Document text:** {item['query']['text'][:500]}")
                         
                     st.markdown("**Response:**")
                     st.markdown(item['response']['advice'])
@@ -145,6 +202,15 @@ def main():
         st.markdown("---")
         st.subheader("Debug Information")
         st.json({"session_state": {k: str(v) for k, v in st.session_state.items() if k != "history"}})
+        st.json({"resources": health_check()})
+        st.json({"models": get_model_registry().stats()})
+        if warmup is not None:
+            st.json({"warmup": warmup.status()})
+        st.json({"speech": get_speech_engine().stats()})
+        st.json({"response_cache": get_response_cache().stats})
+        st.json({"ocr_cache": get_ocr_pipeline().stats})
+        if get_semantic_cache() is not None:
+            st.json({"semantic_cache": get_semantic_cache().stats})
 
 # Run the application
 if __name__ == "__main__":
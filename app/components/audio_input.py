@@ -1,10 +1,8 @@
 import streamlit as st
 import os
-import tempfile
-import numpy as np
-import speech_recognition as sr
-from datetime import datetime
-import soundfile as sf
+from app.models.model_store import ModelNotAvailableError
+from app.models.speech import LANGUAGES, get_speech_engine, transcribe_stream
+from app.utils.env_loader import read_environment
 
 def create_audio_input():
     """
@@ -19,6 +17,18 @@ def create_audio_input():
     with st.container():
         st.markdown("### Record or upload your legal question")
         
+        # Spoken language, limited to what the configured speech engine supports
+        engine = get_speech_engine()
+        language_options = ["auto"] + list(engine.languages)
+        configured = read_environment()["STT_LANGUAGE"]
+        language = st.selectbox(
+            "Spoken language:",
+            language_options,
+            index=language_options.index(configured) if configured in language_options else 0,
+            format_func=lambda code: "Detect automatically" if code == "auto" else LANGUAGES[code]
+        )
+        language = None if language == "auto" else language
+        
         # Tabs for different audio input methods
         record_tab, upload_tab = st.tabs(["Record Audio", "Upload Audio File"])
         
@@ -36,17 +46,12 @@ def create_audio_input():
             )
             
             if audio_bytes:
-                # Save audio bytes to a temporary file
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                    tmp_file.write(audio_bytes)
-                    temp_filename = tmp_file.name
-                
                 st.audio(audio_bytes, format="audio/wav")
                 
                 # Transcribe button
                 if st.button("Transcribe Recording", key="transcribe_recording"):
                     with st.spinner("Transcribing your audio..."):
-                        transcribed_text = transcribe_audio(temp_filename)
+                        transcribed_text = transcribe_audio(audio_bytes, ".wav", language)
                         
                         if transcribed_text:
                             st.success("Audio transcribed successfully!")
@@ -62,17 +67,14 @@ def create_audio_input():
             uploaded_file = st.file_uploader("Choose an audio file", type=["wav", "mp3", "m4a", "ogg"])
             
             if uploaded_file is not None:
-                # Save uploaded file to a temporary file
-                with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{uploaded_file.name.split(".")[-1]}') as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    temp_filename = tmp_file.name
-                
                 st.audio(uploaded_file, format=f"audio/{uploaded_file.name.split('.')[-1]}")
                 
                 # Transcribe button
                 if st.button("Transcribe Upload", key="transcribe_upload"):
                     with st.spinner("Transcribing your audio..."):
-                        transcribed_text = transcribe_audio(temp_filename)
+                        transcribed_text = transcribe_audio(
+                            uploaded_file.getvalue(), os.path.splitext(uploaded_file.name)[1].lower(), language
+                        )
                         
                         if transcribed_text:
                             st.success("Audio transcribed successfully!")
@@ -117,34 +119,40 @@ def create_audio_input():
     return None
 
 
-def transcribe_audio(audio_file_path):
+def transcribe_audio(audio_bytes, suffix, language=None):
     """
-    Transcribes the given audio file to text.
+    Transcribes a recording to text with the local speech engine, decoding
+    it straight from memory and showing the transcript as each spoken
+    segment is recognized.
     
     Args:
-        audio_file_path (str): Path to the audio file
+        audio_bytes (bytes): The recorded or uploaded file
+        suffix (str): Its extension, e.g. '.mp3'
+        language (str): 'en' or 'bn', or None to detect the language
         
     Returns:
         str: Transcribed text, or None if transcription failed
     """
     try:
-        # Initialize recognizer
-        recognizer = sr.Recognizer()
+        engine = get_speech_engine()
+        if not engine.is_loaded:
+            # The model is loaded once per process and shared by every session
+            with st.spinner("Loading the speech recognition model (first use only)..."):
+                engine.load()
         
-        # Load the audio file
-        with sr.AudioFile(audio_file_path) as source:
-            # Record the audio data
-            audio_data = recognizer.record(source)
-            
-            # Attempt to recognize speech using Google Speech Recognition
-            # In a production environment, you'd use a local model like Whisper
-            text = recognizer.recognize_google(audio_data)
-            return text
+        partial_placeholder = st.empty()
+        texts = []
+        for segment in transcribe_stream(audio_bytes, language=language, engine=engine, suffix=suffix):
+            if segment.text:
+                texts.append(segment.text)
+                partial_placeholder.caption(f"[{segment.end:.0f}s] {' '.join(texts)}")
+        partial_placeholder.empty()
+        
+        return " ".join(texts) or None
             
+    except ModelNotAvailableError as e:
+        st.error(f"Speech recognition model is not available: {str(e)}")
+        return None
     except Exception as e:
         st.error(f"Error during transcription: {str(e)}")
-        return None
-    finally:
-        # Clean up temporary file
-        if os.path.exists(audio_file_path):
-            os.unlink(audio_file_path) 
\ No newline at end of file
+        return None 
\ No newline at end of file
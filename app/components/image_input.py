@@ -1,10 +1,16 @@
 import streamlit as st
-import os
-import tempfile
-import pytesseract
+import io
+import time
 from PIL import Image
-import cv2
-import numpy as np
+from app.utils.documents import DocumentPage, assemble_pages, is_pdf, iter_pdf_pages
+from app.utils.ocr import content_hash, get_ocr_pipeline, image_dpi
+from app.utils.resources import find_tesseract
+
+# Processed uploads remembered per session; older ones are processed again if uploaded again
+MAX_SESSION_DOCUMENTS = 4
+
+# Longest side of the preview image kept for display
+PREVIEW_PIXELS = 1200
 
 def create_image_input():
     """
@@ -12,7 +18,7 @@ def create_image_input():
     This component allows users to upload images of legal documents for analysis.
     
     Returns:
-        dict: A dictionary containing the extracted text and the image path if processed, None otherwise
+        dict: A dictionary containing the extracted text and the document's content hash if processed, None otherwise
     """
     
     # Container for image input
@@ -23,88 +29,110 @@ def create_image_input():
         uploaded_file = st.file_uploader(
             "Upload document images or photos",
             type=["jpg", "jpeg", "png", "pdf"],
-            help="You can upload images of legal documents, contracts, notices, or any other relevant visual evidence."
+            help="You can upload images or PDFs of legal documents, contracts, notices, or any other relevant visual evidence."
         )
         
+        # Report missing OCR resources up front instead of failing on upload
+        tesseract = find_tesseract()
+        if tesseract["binary"] is None:
+            st.warning("Tesseract OCR is not installed, so text cannot be extracted from images.")
+        elif tesseract["missing"]:
+            st.warning(f"OCR language packs not installed: {', '.join(tesseract['missing'])}. Text will be read with the remaining languages.")
+        
         if uploaded_file is not None:
-            # Create temp file to save the uploaded image
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{uploaded_file.name.split(".")[-1]}') as tmp_file:
-                tmp_file.write(uploaded_file.getvalue())
-                temp_filename = tmp_file.name
+            # OCR runs once per upload; reruns from editing or clicking reuse the stored result
+            with st.spinner("Processing document..."):
+                document = process_upload(uploaded_file)
             
-            # Display the uploaded image
-            img = Image.open(uploaded_file)
-            st.image(img, caption="Uploaded Document", use_column_width=True)
+            # Display the uploaded image (the first page of a PDF)
+            for page in document["pages"]:
+                st.image(page, caption="Uploaded Document", use_column_width=True)
             
-            # Process the image
-            with st.spinner("Processing document..."):
-                # Extract text from the image
-                extracted_text = extract_text_from_image(temp_filename)
+            if document["metadata"].get("page_count"):
+                st.caption(
+                    f"{document['metadata']['page_count']} pages, "
+                    f"{document['metadata']['ocr_pages']} read with OCR"
+                )
+            
+            failed_pages = document["metadata"].get("failed_pages")
+            if failed_pages:
+                st.warning(
+                    f"Could not read page(s) {', '.join(str(number) for number in failed_pages)}; "
+                    f"their text is missing. First error: {next(iter(failed_pages.values()))}"
+                )
+            
+            if document["error"]:
+                st.error(f"Error extracting text: {document['error']}")
+            
+            extracted_text = document["text"]
+            
+            if extracted_text:
+                st.success(f"Document processed successfully in {document['metadata']['seconds']:.1f}s!")
                 
-                if extracted_text:
-                    st.success("Document processed successfully!")
+                # Show the extracted text with an option to edit; keyed by content so edits survive reruns
+                with st.expander("Extracted Text (click to view/edit)"):
+                    extracted_text = st.text_area(
+                        "Review and edit the extracted text if needed:",
+                        value=extracted_text,
+                        height=250,
+                        key=f"document_text_{document['hash'][:16]}"
+                    )
+                
+                # Additional context
+                with st.expander("Add additional context (optional)"):
+                    document_type = st.selectbox(
+                        "Document type:",
+                        [
+                            "Select document type",
+                            "Contract",
+                            "Court Notice",
+                            "Property Deed",
+                            "Marriage Certificate",
+                            "Divorce Papers",
+                            "Business Registration",
+                            "Tax Document",
+                            "Police Report",
+                            "Other"
+                        ],
+                        index=0
+                    )
                     
-                    # Show the extracted text with an option to edit
-                    with st.expander("Extracted Text (click to view/edit)"):
-                        extracted_text = st.text_area(
-                            "Review and edit the extracted text if needed:",
-                            value=extracted_text,
-                            height=250
-                        )
+                    if document_type == "Other":
+                        document_type = st.text_input("Specify document type:")
                     
-                    # Additional context
-                    with st.expander("Add additional context (optional)"):
-                        document_type = st.selectbox(
-                            "Document type:",
-                            [
-                                "Select document type",
-                                "Contract",
-                                "Court Notice",
-                                "Property Deed",
-                                "Marriage Certificate",
-                                "Divorce Papers",
-                                "Business Registration",
-                                "Tax Document",
-                                "Police Report",
-                                "Other"
-                            ],
-                            index=0
-                        )
-                        
-                        if document_type == "Other":
-                            document_type = st.text_input("Specify document type:")
-                        
-                        context = st.text_area(
-                            "Additional information about this document:",
-                            placeholder="E.g., This is a rental agreement I signed last year, but the landlord is now claiming different terms."
-                        )
+                    context = st.text_area(
+                        "Additional information about this document:",
+                        placeholder="E.g., This is a rental agreement I signed last year, but the landlord is now claiming different terms."
+                    )
+                
+                # Submit button
+                col1, col2, col3 = st.columns([1, 2, 1])
+                with col2:
+                    submit_button = st.button("Submit for Analysis", type="primary", use_container_width=True)
+                
+                # Process submission
+                if submit_button and extracted_text.strip():
+                    # Store the submission in session state
+                    st.session_state.submit_clicked = True
                     
-                    # Submit button
-                    col1, col2, col3 = st.columns([1, 2, 1])
-                    with col2:
-                        submit_button = st.button("Submit for Analysis", type="primary", use_container_width=True)
+                    result = {
+                        "text": extracted_text,
+                        "document_hash": document["hash"],
+                        "preview": document["pages"][0] if document["pages"] else None,
+                        "page_offsets": document["page_offsets"]
+                    }
                     
-                    # Process submission
-                    if submit_button and extracted_text.strip():
-                        # Store the submission in session state
-                        st.session_state.submit_clicked = True
-                        
-                        result = {
-                            "text": extracted_text,
-                            "image_path": temp_filename
-                        }
-                        
-                        # Add metadata if available
-                        if document_type and document_type != "Select document type":
-                            result["document_type"] = document_type
-                        
-                        if context:
-                            result["context"] = context
-                        
-                        return result
-                else:
-                    st.error("Failed to extract text from the document. Please try uploading a clearer image.")
-        
+                    # Add metadata if available
+                    if document_type and document_type != "Select document type":
+                        result["document_type"] = document_type
+                    
+                    if context:
+                        result["context"] = context
+                    
+                    return result
+            else:
+                st.error("Failed to extract text from the document. Please try uploading a clearer image.")
+    
         # Usage tips
         with st.expander("Tips for best results"):
             st.markdown("""
@@ -120,50 +148,109 @@ def create_image_input():
     return None
 
 
-def extract_text_from_image(image_path):
+def process_upload(uploaded_file):
     """
-    Extracts text from an image file using OCR.
+    Processes an uploaded document once per content.
+    
+    Streamlit reruns the whole script on every widget interaction. The OCR
+    text, preview image and metadata are therefore stored in the session
+    under the upload's content hash, and are only computed again when a
+    different file is uploaded. Recognized text is also cached process-wide
+    by the OCR pipeline, so other sessions uploading the same file skip OCR.
     
     Args:
-        image_path (str): Path to the image file
+        uploaded_file: The file from st.file_uploader
         
     Returns:
-        str: Extracted text, or None if extraction failed
+        dict: 'hash', 'name', 'text' (None if extraction failed), 'pages' (preview images),
+        'page_offsets' (where each page's text starts and ends in 'text'), 'metadata' and 'error'
     """
+    documents = st.session_state.processed_documents
+    upload_hashes = st.session_state.upload_hashes
+    
+    # Hash each upload once; Streamlit keeps the same file_id across reruns
+    upload_id = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+    key = upload_hashes.get(upload_id)
+    if key is None:
+        key = upload_hashes[upload_id] = content_hash(uploaded_file.getvalue())
+    
+    if key in documents:
+        documents.move_to_end(key)
+        return documents[key]
+    
+    data = uploaded_file.getvalue()
+    started = time.perf_counter()
+    document = {
+        "hash": key,
+        "name": uploaded_file.name,
+        "text": None,
+        "pages": [],
+        "page_offsets": [],
+        "metadata": {"size_bytes": len(data)},
+        "error": None,
+    }
+    
     try:
-        # Read the image with OpenCV
-        image = cv2.imread(image_path)
-        
-        # Preprocess the image for better OCR
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Apply threshold to get a binary image
-        _, binary = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
-        
-        # Denoise
-        denoised = cv2.fastNlMeansDenoising(binary, None, 10, 7, 21)
-        
-        # Save the preprocessed image temporarily
-        preprocessed_path = image_path + "_prep.jpg"
-        cv2.imwrite(preprocessed_path, denoised)
-        
-        # Use pytesseract to extract text (you can use different languages here)
-        # For Bengali: lang='ben'
-        # For English: lang='eng'
-        # For both: lang='eng+ben'
-        text = pytesseract.image_to_string(Image.open(preprocessed_path), lang='eng')
-        
-        # Clean up preprocessed image
-        os.remove(preprocessed_path)
-        
-        return text
+        if is_pdf(data):
+            process_pdf(data, document)
+        else:
+            process_image(data, document)
     except Exception as e:
-        st.error(f"Error extracting text: {str(e)}")
-        return None
-    finally:
-        # Clean up image file if it exists
-        if os.path.exists(image_path):
-            # In a real application, you might want to keep this file for reference
-            # or delete it after a certain period
-            pass 
\ No newline at end of file
+        document["error"] = str(e)
+    document["metadata"]["seconds"] = time.perf_counter() - started
+    
+    documents[key] = document
+    while len(documents) > MAX_SESSION_DOCUMENTS:
+        documents.popitem(last=False)
+    # Forget uploads whose documents were evicted
+    st.session_state.upload_hashes = {upload_id: key for upload_id, key in upload_hashes.items() if key in documents}
+    
+    return document
+
+
+def process_image(data, document):
+    """
+    OCRs a single uploaded image into document.
+    
+    Args:
+        data (bytes): The image file
+        document (dict): The document being built by process_upload()
+    """
+    image = Image.open(io.BytesIO(data))
+    document["metadata"].update({"width": image.width, "height": image.height, "format": image.format, "dpi": image_dpi(data)})
+    image.thumbnail((PREVIEW_PIXELS, PREVIEW_PIXELS))
+    document["pages"].append(image)
+    
+    text = get_ocr_pipeline().extract_text(data)
+    document["text"], document["page_offsets"] = assemble_pages([DocumentPage(1, text, "ocr")])
+
+
+def process_pdf(data, document):
+    """
+    Extracts the text of an uploaded PDF into document, showing each page as it is read.
+    
+    Pages with a text layer are read directly; scanned pages are OCR'd in
+    parallel on the worker processes. Pages that could not be read are
+    listed in the metadata's 'failed_pages' instead of failing the upload.
+    
+    Args:
+        data (bytes): The PDF file
+        document (dict): The document being built by process_upload()
+    """
+    progress = st.empty()
+    pages = []
+    for page in iter_pdf_pages(data, preview=document["pages"]):
+        pages.append(page)
+        if page.error:
+            progress.caption(f"Could not read page {page.number}: {page.error}")
+        else:
+            progress.caption(f"Read page {page.number} ({'OCR' if page.source == 'ocr' else 'text layer'})...")
+    progress.empty()
+    
+    document["text"], document["page_offsets"] = assemble_pages(pages)
+    document["metadata"].update({
+        "format": "PDF",
+        "page_count": len(pages),
+        "ocr_pages": sum(1 for page in pages if page.source == "ocr"),
+        "failed_pages": {page.number: page.error for page in pages if page.error},
+    }) 
\ No newline at end of file
@@ -0,0 +1,229 @@
+import re
+
+from app.utils.resources import get_sentence_splitter
+
+# An act name: capitalized words (with connecting 'of', 'and', ...) ending in an instrument type,
+# e.g. "Muslim Family Laws Ordinance", "Dissolution of Muslim Marriages Act", "Code of Civil Procedure".
+# At least one name word is required, so a sentence opening with "Act" or "Order" is not a citation
+_ACT_NAME = (
+    r"(?:[Tt]he\s+)?"
+    r"(?:"
+    r"(?:[A-Z][\w'&\-]*\s+(?:(?:of|and|the|on|for|in)\s+)?){1,8}?"
+    r"(?:Act|Ordinance|Order|Code|Rules|Regulations)"
+    r"(?:\s+of\s+(?:Civil|Criminal)\s+Procedure)?"
+    r"|Code\s+of\s+(?:Civil|Criminal)\s+Procedure"
+    r")"
+)
+
+
+def _year(group):
+    """Optional trailing year such as ', 1961' or ' (1961)', captured as group"""
+    return r"(?:,?\s*\(?(?P<" + group + r">1[89]\d{2}|20\d{2})\)?)?"
+
+
+_PARTY = r"[A-Z][\w.&'\-]*(?:\s+(?:[A-Z][\w.&'\-]*|of|and)){0,5}"
+
+# Citation forms, tried in this order at each position of a single scan
+CITATION_PATTERNS = [
+    # (1999) 51 DLR (AD) 172, 12 BLD 45
+    ("report", (
+        r"(?:\((?P<report_year>(?:19|20)\d{2})\)\s+)?"
+        r"(?P<report_volume>\d{1,3})\s+(?P<reporter>DLR|BLD|BLC|MLR|ADC)\s+"
+        r"(?:\((?P<report_division>AD|HCD|HC)\)\s+)?(?P<report_page>\d+)"
+    )),
+    # Section 6 of the Muslim Family Laws Ordinance, 1961
+    ("section", (
+        r"\b(?:Sections?|Sec\.)\s*(?P<section>\d+[A-Z]?(?:\(\w{1,4}\))*)"
+        r"(?:\s+(?:of|under)\s+(?P<section_act>" + _ACT_NAME + r")" + _year("section_year") + r")?"
+    )),
+    # Article 27 of the Constitution
+    ("article", r"\b(?:Articles?|Art\.)\s*(?P<article>\d+[A-Z]?(?:\(\d+\))?)(?:\s+of\s+the\s+Constitution)?"),
+    # Abdul Kader v. State
+    ("case", r"\b(?P<party1>" + _PARTY + r")\s+(?:v\.|vs\.?|versus)\s+(?P<party2>" + _PARTY + r")"),
+    # The Registration Act, 1908
+    ("act", r"\b(?P<act>" + _ACT_NAME + r")\b" + _year("act_year")),
+]
+
+# Every form starts with a capital, a digit or "(", so the lookahead rejects most positions
+# before any alternative is tried
+CITATION_REGEX = re.compile(
+    r"(?=[A-Z(0-9])(?:" + "|".join(f"(?P<kind_{kind}>{pattern})" for kind, pattern in CITATION_PATTERNS) + ")"
+)
+
+# Capitalized sentence openers that the name patterns pick up, e.g. "Under the ... Act"
+_LEAD_WORDS_REGEX = re.compile(r"(?:(?:in|see|as|per|following|also|cf\.|the|and|under|by|according\s+to)\s+)+", re.IGNORECASE)
+
+
+class Citation:
+    """A citation found in a response, with its character offsets and corpus resolution."""
+
+    __slots__ = (
+        "kind", "text", "start", "end", "act", "section", "year", "article",
+        "reporter", "volume", "division", "page", "parties", "resolved"
+    )
+
+    def __init__(self, kind, text, start, end, act=None, section=None, year=None, article=None,
+                 reporter=None, volume=None, division=None, page=None, parties=None):
+        self.kind = kind
+        self.text = text
+        self.start = start
+        self.end = end
+        self.act = act
+        self.section = section
+        self.year = year
+        self.article = article
+        self.reporter = reporter
+        self.volume = volume
+        self.division = division
+        self.page = page
+        self.parties = parties
+        self.resolved = False
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__ if getattr(self, slot) is not None}
+
+
+def _strip_lead_words(name):
+    match = _LEAD_WORDS_REGEX.match(name)
+    return name[match.end():] if match else name
+
+
+def parse_citations(text):
+    """
+    Find every citation in text in one left-to-right scan.
+
+    Args:
+        text (str): A generated response
+
+    Returns:
+        list: Citation objects in order of appearance
+    """
+    citations = []
+    for match in CITATION_REGEX.finditer(text):
+        # The enclosing kind_* group closes last, so it names the matched form
+        kind = match.lastgroup[len("kind_"):]
+        groups = match.groupdict()
+        citation = Citation(kind, match.group(), match.start(), match.end())
+
+        if kind == "report":
+            citation.year = groups["report_year"]
+            citation.volume = groups["report_volume"]
+            citation.reporter = groups["reporter"]
+            citation.division = groups["report_division"]
+            citation.page = groups["report_page"]
+        elif kind == "section":
+            citation.section = groups["section"]
+            citation.act = groups["section_act"]
+            citation.year = groups["section_year"]
+        elif kind == "article":
+            citation.article = groups["article"]
+        elif kind == "case":
+            party1 = _strip_lead_words(groups["party1"])
+            citation.parties = [party1, groups["party2"]]
+            citation.start = match.end("party1") - len(party1)
+            citation.text = text[citation.start:citation.end]
+        else:
+            act = _strip_lead_words(groups["act"])
+            citation.act = act
+            citation.year = groups["act_year"]
+            citation.start = match.end("act") - len(act)
+            citation.text = text[citation.start:citation.end]
+
+        citations.append(citation)
+    return citations
+
+
+def resolve_citations(citations, store):
+    """
+    Match parsed citations against the legal corpus, filling in missing years
+    and marking citations that name a known act or section.
+
+    Args:
+        citations (list): Citation objects from parse_citations()
+        store (CorpusStore): The legal corpus
+
+    Returns:
+        list: The same citations
+    """
+    for citation in citations:
+        if citation.act is None:
+            continue
+
+        act = store.act(citation.act)
+        if act is None:
+            continue
+
+        citation.act = act.name
+        citation.year = citation.year or str(act.year)
+        citation.resolved = citation.section is None or store.section(act.name, citation.section) is not None
+    return citations
+
+
+def split_sentences(text, citations=()):
+    """
+    Split text into sentences with the best available splitter (punkt or the
+    abbreviation-aware regex), without breaking inside a citation (e.g. at
+    the period of "v." or "Sec.").
+
+    Args:
+        text (str): The text to split
+        citations (list): Citations in order of appearance, from parse_citations(text)
+
+    Returns:
+        list: (start, end) offsets of each sentence
+    """
+    sentences = []
+    start = 0
+    index = 0
+
+    for _, end in get_sentence_splitter()(text):
+        # Citations are sorted, so skipping past those that end earlier keeps this linear
+        while index < len(citations) and citations[index].end < end:
+            index += 1
+        if index < len(citations) and citations[index].start < end:
+            continue
+
+        if text[start:end].strip():
+            sentences.append((start, end))
+        start = end
+
+    if text[start:].strip():
+        sentences.append((start, len(text)))
+    return sentences
+
+
+def extract_citations(text, store=None):
+    """
+    Separate the cited sentences of a response from the rest.
+
+    Args:
+        text (str): A generated response
+        store (CorpusStore): Optional legal corpus to resolve citations against
+
+    Returns:
+        tuple: (text without citation sentences, citation sentences joined by newlines,
+        list of citation dicts)
+    """
+    citations = parse_citations(text)
+    if store is not None:
+        resolve_citations(citations, store)
+    spans = [citation.to_dict() for citation in citations]
+
+    cited = []
+    regular_text = []
+    index = 0
+    for start, end in split_sentences(text, citations):
+        while index < len(citations) and citations[index].end <= start:
+            index += 1
+        sentence = text[start:end].strip()
+        if index < len(citations) and citations[index].start < end:
+            cited.append(sentence)
+        else:
+            regular_text.append(sentence)
+
+    # Without inline citations, fall back to a trailing "References:" section
+    if not cited and "References:" in text:
+        advice, references = text.split("References:", 1)
+        return advice, f"References: {references}", spans
+
+    return " ".join(regular_text), "\n".join(cited), spans
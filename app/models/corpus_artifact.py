@@ -0,0 +1,524 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+from app.models.corpus_store import (
+    DATA_DIR, Act, CategoryCorpus, CorpusStore, Precedent, Section, hash_sources, list_data_files, normalize_act_name
+)
+from app.models.retrieval import HashingEmbedder, collect_documents, get_embedder
+from app.utils.env_loader import read_environment
+
+# File layout: header, section directory, then 16-byte aligned sections
+MAGIC = b"BDLC"
+FORMAT_VERSION = 3
+HEADER = struct.Struct("<4sHH32sI")        # magic, version, reserved, source sha256, section count
+DIRECTORY_ENTRY = struct.Struct("<4sQQ")   # tag, offset, length
+EMBEDDING_HEADER = struct.Struct("<IIIxxxx")  # rows, dim, embedder name string id, pad to 16
+ALIGNMENT = 16
+
+# Record tables; string fields are ids into the string table
+CATEGORY_DTYPE = np.dtype([
+    ("key", "<u4"), ("name", "<u4"), ("description", "<u4"),
+    ("act_start", "<u4"), ("act_count", "<u4"),
+    ("precedent_start", "<u4"), ("precedent_count", "<u4"),
+    ("common_issues", "<u4"),
+])
+ACT_DTYPE = np.dtype([
+    ("category", "<u4"), ("name", "<u4"), ("year", "<i4"), ("description", "<u4"),
+    ("keyword_start", "<u4"), ("keyword_count", "<u4"),
+    ("section_start", "<u4"), ("section_count", "<u4"),
+])
+SECTION_DTYPE = np.dtype([("act", "<u4"), ("number", "<u4"), ("title", "<u4"), ("content", "<u4")])
+PRECEDENT_DTYPE = np.dtype([
+    ("category", "<u4"), ("title", "<u4"), ("year", "<i4"), ("citation", "<u4"), ("summary", "<u4"),
+    ("keyword_start", "<u4"), ("keyword_count", "<u4"),
+])
+POSTING_DTYPE = np.dtype([("keyword", "<u4"), ("start", "<u4"), ("count", "<u4")])
+NAME_DTYPE = np.dtype([("name", "<u4"), ("act", "<u4")])
+ROW_DTYPE = np.dtype([("act", "<u4"), ("section", "<i4")])
+
+# Year stored for precedents without one
+NO_YEAR = -1
+
+
+class CorpusArtifactError(ValueError):
+    """Raised when a corpus artifact is missing, truncated or of another format version."""
+
+
+class _StringTable:
+    """Deduplicating string table builder"""
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def add(self, value):
+        value = value or ""
+        if value not in self.ids:
+            self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return self.ids[value]
+
+    def to_bytes(self):
+        encoded = [value.encode("utf-8") for value in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        return struct.pack("<I", len(encoded)) + offsets.tobytes() + b"".join(encoded)
+
+
+def build_artifact(data_dir=DATA_DIR, path=None, embedder=None):
+    """
+    Compile the legal JSON files into a single binary artifact.
+
+    Args:
+        data_dir (str): Directory holding the category JSON files
+        path (str): Output file, defaults to CORPUS_ARTIFACT_PATH
+        embedder: Embedder for the retrieval matrix, defaults to HashingEmbedder
+
+    Returns:
+        str: The artifact path
+    """
+    path = path or read_environment()["CORPUS_ARTIFACT_PATH"]
+    embedder = embedder or HashingEmbedder()
+    store = CorpusStore(data_dir)
+    source_hash = hash_sources(list_data_files(data_dir))
+
+    strings = _StringTable()
+    categories, acts, sections, precedents, keyword_ids, rows = [], [], [], [], [], []
+    postings = {}
+    act_names = {}
+
+    for key in store.categories():
+        corpus = store.category(key)
+        act_start = len(acts)
+        precedent_start = len(precedents)
+
+        for act in corpus.acts:
+            act_index = len(acts)
+            act_names[normalize_act_name(act.name)] = act_index
+            keyword_start = len(keyword_ids)
+            for keyword in act.keywords:
+                keyword_id = strings.add(keyword)
+                keyword_ids.append(keyword_id)
+                postings.setdefault(keyword, []).append(act_index)
+
+            section_start = len(sections)
+            # Embedding rows follow collect_documents(): the act, then its sections
+            rows.append((act_index, -1))
+            for section in act.sections:
+                rows.append((act_index, len(sections)))
+                sections.append((act_index, strings.add(section.number), strings.add(section.title), strings.add(section.content)))
+
+            acts.append((
+                strings.add(key), strings.add(act.name), act.year, strings.add(act.description),
+                keyword_start, len(act.keywords), section_start, len(act.sections)
+            ))
+
+        for precedent in corpus.precedents:
+            keyword_start = len(keyword_ids)
+            keyword_ids.extend(strings.add(keyword) for keyword in precedent.keywords)
+            precedents.append((
+                strings.add(key), strings.add(precedent.title),
+                precedent.year if isinstance(precedent.year, int) else NO_YEAR,
+                strings.add(precedent.citation), strings.add(precedent.summary),
+                keyword_start, len(precedent.keywords)
+            ))
+
+        categories.append((
+            strings.add(key), strings.add(corpus.name), strings.add(corpus.description),
+            act_start, len(corpus.acts), precedent_start, len(corpus.precedents),
+            strings.add(json.dumps(list(corpus.common_issues), ensure_ascii=False))
+        ))
+
+    # Keyword index: keywords sorted by text so lookups can bisect
+    posting_records, posting_acts = [], []
+    for keyword in sorted(postings):
+        posting_records.append((strings.add(keyword), len(posting_acts), len(postings[keyword])))
+        posting_acts.extend(postings[keyword])
+
+    # Act name index: normalized names sorted for bisecting, as the store looks acts up
+    name_records = [(strings.add(name), act_names[name]) for name in sorted(act_names)]
+
+    texts, _ = collect_documents(store)
+    matrix = np.ascontiguousarray(embedder.embed_documents(texts), dtype="<f4")
+    embedding_header = EMBEDDING_HEADER.pack(matrix.shape[0], matrix.shape[1], strings.add(embedder.name))
+
+    sections_payload = [
+        (b"CATS", np.array(categories, dtype=CATEGORY_DTYPE).tobytes()),
+        (b"ACTS", np.array(acts, dtype=ACT_DTYPE).tobytes()),
+        (b"SECT", np.array(sections, dtype=SECTION_DTYPE).tobytes()),
+        (b"PREC", np.array(precedents, dtype=PRECEDENT_DTYPE).tobytes()),
+        (b"KWID", np.array(keyword_ids, dtype="<u4").tobytes()),
+        (b"POST", np.array(posting_records, dtype=POSTING_DTYPE).tobytes()),
+        (b"PACT", np.array(posting_acts, dtype="<u4").tobytes()),
+        (b"NAME", np.array(name_records, dtype=NAME_DTYPE).tobytes()),
+        (b"ROWS", np.array(rows, dtype=ROW_DTYPE).tobytes()),
+        (b"EMBD", embedding_header + matrix.tobytes()),
+        # Data files that failed to parse or validate, as a JSON object of path -> message
+        (b"ERRS", json.dumps(store.errors, ensure_ascii=False).encode("utf-8")),
+        # The string table is last so every id above has been assigned
+        (b"STRS", strings.to_bytes()),
+    ]
+
+    directory_size = HEADER.size + DIRECTORY_ENTRY.size * len(sections_payload)
+    offset = _align(directory_size)
+    directory = []
+    for tag, payload in sections_payload:
+        directory.append((tag, offset, len(payload)))
+        offset = _align(offset + len(payload))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, bytes.fromhex(source_hash), len(sections_payload)))
+            for entry in directory:
+                f.write(DIRECTORY_ENTRY.pack(*entry))
+            for (tag, payload), (_, section_offset, _) in zip(sections_payload, directory):
+                f.write(b"\0" * (section_offset - f.tell()))
+                f.write(payload)
+
+        # Atomic swap, so processes that have the old file mapped are unaffected
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return path
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class CorpusArtifact:
+    """
+    Read-only view of a compiled corpus artifact.
+
+    The file is opened with mmap and every table is a NumPy view into the
+    mapping, so worker processes share the same pages and opening the file
+    only reads the fixed-size header and section directory. Records become
+    Python objects one category at a time, the first time a lookup needs
+    that category, and act lookups go through the precompiled name and
+    keyword indexes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            raise CorpusArtifactError(f"{path}: file is truncated")
+
+        magic, version, _, source_hash, section_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise CorpusArtifactError(f"{path}: not a corpus artifact")
+        if version != FORMAT_VERSION:
+            raise CorpusArtifactError(f"{path}: format version {version}, expected {FORMAT_VERSION}")
+
+        self.format_version = version
+        self.source_hash = source_hash.hex()
+        self._sections = {}
+        for i in range(section_count):
+            tag, offset, length = DIRECTORY_ENTRY.unpack_from(self._mmap, HEADER.size + i * DIRECTORY_ENTRY.size)
+            if offset + length > len(self._mmap):
+                raise CorpusArtifactError(f"{path}: section {tag!r} is truncated")
+            self._sections[tag] = (offset, length)
+
+        # String table: count, count + 1 offsets, then the UTF-8 blob
+        strings_offset, _ = self._sections[b"STRS"]
+        count = struct.unpack_from("<I", self._mmap, strings_offset)[0]
+        self._string_offsets = np.frombuffer(self._mmap, dtype="<u4", count=count + 1, offset=strings_offset + 4)
+        self._string_blob = strings_offset + 4 + self._string_offsets.nbytes
+        self._string_cache = {}
+        self._categories = {}
+        self._category_records = None
+        self._lock = threading.Lock()
+
+    def _table(self, tag, dtype):
+        offset, length = self._sections[tag]
+        return np.frombuffer(self._mmap, dtype=dtype, count=length // dtype.itemsize, offset=offset)
+
+    def string(self, string_id):
+        """
+        Args:
+            string_id (int): Id into the string table
+
+        Returns:
+            str: The decoded string
+        """
+        string_id = int(string_id)
+        value = self._string_cache.get(string_id)
+        if value is None:
+            start = self._string_blob + int(self._string_offsets[string_id])
+            end = self._string_blob + int(self._string_offsets[string_id + 1])
+            value = sys.intern(self._mmap[start:end].decode("utf-8"))
+            self._string_cache[string_id] = value
+        return value
+
+    @property
+    def embedder_name(self):
+        offset, _ = self._sections[b"EMBD"]
+        return self.string(EMBEDDING_HEADER.unpack_from(self._mmap, offset)[2])
+
+    def embeddings(self):
+        """
+        Returns:
+            np.ndarray: Read-only (rows, dim) float32 view of the retrieval matrix
+        """
+        offset, _ = self._sections[b"EMBD"]
+        rows, dim, _ = EMBEDDING_HEADER.unpack_from(self._mmap, offset)
+        matrix = np.frombuffer(self._mmap, dtype="<f4", count=rows * dim, offset=offset + EMBEDDING_HEADER.size)
+        return matrix.reshape(rows, dim)
+
+    def errors(self):
+        """
+        Returns:
+            dict: Error messages of the data files left out of the artifact, keyed by path
+        """
+        offset, length = self._sections[b"ERRS"]
+        return json.loads(self._mmap[offset:offset + length].decode("utf-8"))
+
+    def index_entries(self):
+        """
+        Returns:
+            list: Retrieval metadata dicts, one per embedding row
+        """
+        acts = self._table(b"ACTS", ACT_DTYPE)
+        sections = self._table(b"SECT", SECTION_DTYPE)
+        entries = []
+
+        for row in self._table(b"ROWS", ROW_DTYPE):
+            act = acts[row["act"]]
+            section_index = int(row["section"])
+            entry = {
+                "category": self.string(act["category"]),
+                "act": self.string(act["name"]),
+                "year": int(act["year"]),
+                "description": self.string(act["description"]),
+                "section": None,
+                "title": "",
+            }
+            if section_index >= 0:
+                section = sections[section_index]
+                entry.update(
+                    section=self.string(section["number"]),
+                    title=self.string(section["title"]),
+                    content=self.string(section["content"])
+                )
+            entries.append(entry)
+
+        return entries
+
+    def _bisect(self, table, field, value):
+        """Position of the first record whose string field is >= value, in a table sorted by it"""
+        low, high = 0, len(table)
+        while low < high:
+            mid = (low + high) // 2
+            if self.string(table[mid][field]) < value:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def category_keys(self):
+        """
+        Returns:
+            list: Keys of the categories in the artifact
+        """
+        return list(self._category_index())
+
+    def _category_index(self):
+        """Category key -> CATS record, read on first use"""
+        if self._category_records is None:
+            self._category_records = {
+                self.string(record["key"]): record for record in self._table(b"CATS", CATEGORY_DTYPE)
+            }
+        return self._category_records
+
+    def category(self, key):
+        """
+        Materialize one category as corpus store records, once.
+
+        Args:
+            key (str): Category key
+
+        Returns:
+            CategoryCorpus: The category, or None if the artifact has no such category
+        """
+        with self._lock:
+            corpus = self._categories.get(key)
+            if corpus is None:
+                record = self._category_index().get(key)
+                if record is None:
+                    return None
+                corpus = self._categories[key] = self._build_category(record)
+            return corpus
+
+    def _build_category(self, record):
+        acts_table = self._table(b"ACTS", ACT_DTYPE)
+        sections_table = self._table(b"SECT", SECTION_DTYPE)
+        precedents_table = self._table(b"PREC", PRECEDENT_DTYPE)
+        keyword_ids = self._table(b"KWID", np.dtype("<u4"))
+        string = self.string
+        key = string(record["key"])
+
+        def keywords(start, count):
+            return tuple(string(i) for i in keyword_ids[start:start + count])
+
+        acts = []
+        for row in acts_table[record["act_start"]:record["act_start"] + record["act_count"]]:
+            act = Act(key, string(row["name"]), int(row["year"]), string(row["description"]),
+                      keywords(row["keyword_start"], row["keyword_count"]))
+            act.sections = tuple(
+                Section(act, string(section["number"]), string(section["title"]), string(section["content"]))
+                for section in sections_table[row["section_start"]:row["section_start"] + row["section_count"]]
+            )
+            acts.append(act)
+
+        precedents = tuple(
+            Precedent(
+                key, string(row["title"]), None if row["year"] == NO_YEAR else int(row["year"]),
+                string(row["citation"]), string(row["summary"]),
+                keywords(row["keyword_start"], row["keyword_count"])
+            )
+            for row in precedents_table[record["precedent_start"]:record["precedent_start"] + record["precedent_count"]]
+        )
+
+        return CategoryCorpus(
+            key, string(record["name"]), string(record["description"]), tuple(acts), precedents,
+            tuple(json.loads(string(record["common_issues"])))
+        )
+
+    def act(self, act_index):
+        """
+        Args:
+            act_index (int): Row of the ACTS table
+
+        Returns:
+            Act: The act record, materializing its category if needed
+        """
+        row = self._table(b"ACTS", ACT_DTYPE)[act_index]
+        key = self.string(row["category"])
+        corpus = self.category(key)
+        return corpus.acts[int(act_index) - int(self._category_index()[key]["act_start"])]
+
+    def act_named(self, name):
+        """
+        Look an act up through the precompiled name index.
+
+        Args:
+            name (str): Act name, matched as normalize_act_name() does
+
+        Returns:
+            Act: The act, or None
+        """
+        name = normalize_act_name(name)
+        names = self._table(b"NAME", NAME_DTYPE)
+        position = self._bisect(names, "name", name)
+        if position == len(names) or self.string(names[position]["name"]) != name:
+            return None
+        return self.act(names[position]["act"])
+
+    def acts_for_keyword(self, keyword):
+        """
+        Look up acts through the precompiled keyword index.
+
+        Args:
+            keyword (str): Keyword, matched case-insensitively
+
+        Returns:
+            list: Acts tagged with the keyword
+        """
+        keyword = keyword.strip().lower()
+        postings = self._table(b"POST", POSTING_DTYPE)
+        position = self._bisect(postings, "keyword", keyword)
+        if position == len(postings) or self.string(postings[position]["keyword"]) != keyword:
+            return []
+
+        posting_acts = self._table(b"PACT", np.dtype("<u4"))
+        start, count = int(postings[position]["start"]), int(postings[position]["count"])
+        return [self.act(i) for i in posting_acts[start:start + count]]
+
+    def acts_in_year(self, year):
+        """
+        Returns:
+            list: Acts enacted in the given year
+        """
+        rows = np.flatnonzero(self._table(b"ACTS", ACT_DTYPE)["year"] == year)
+        return [self.act(i) for i in rows]
+
+    def sections_numbered(self, number):
+        """
+        Returns:
+            list: Sections with the given number across all acts
+        """
+        number = str(number)
+        sections = self._table(b"SECT", SECTION_DTYPE)
+        number_ids = [i for i in np.unique(sections["number"]) if self.string(i) == number]
+        acts = self._table(b"ACTS", ACT_DTYPE)
+
+        found = []
+        for section_index in np.flatnonzero(np.isin(sections["number"], number_ids)):
+            act_index = sections[section_index]["act"]
+            act = self.act(act_index)
+            found.append(act.sections[int(section_index) - int(acts[act_index]["section_start"])])
+        return found
+
+
+def ensure_artifact(data_dir=DATA_DIR, path=None, source_hash=None, embedder=None):
+    """
+    Open the corpus artifact, rebuilding it first if it is missing, of an
+    older format, or its content hash does not match the source JSON.
+
+    Args:
+        data_dir (str): Directory holding the category JSON files
+        path (str): Artifact path, defaults to CORPUS_ARTIFACT_PATH
+        source_hash (str): Precomputed hash_sources() digest of the data files
+        embedder: Embedder to use when rebuilding; defaults to the one the
+            stale artifact was built with, or HashingEmbedder
+
+    Returns:
+        CorpusArtifact: The up-to-date artifact
+    """
+    path = path or read_environment()["CORPUS_ARTIFACT_PATH"]
+    if source_hash is None:
+        source_hash = hash_sources(list_data_files(data_dir))
+
+    existing = None
+    if os.path.exists(path):
+        try:
+            existing = CorpusArtifact(path)
+        except (CorpusArtifactError, ValueError, OSError) as e:
+            print(f"Rebuilding corpus artifact: {e}")
+
+    if existing is not None and existing.source_hash == source_hash:
+        return existing
+
+    if embedder is None:
+        embedder = get_embedder(existing.embedder_name) if existing is not None else HashingEmbedder()
+
+    build_artifact(data_dir, path, embedder)
+    return CorpusArtifact(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the legal corpus into a binary artifact")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directory of legal JSON files")
+    parser.add_argument("--output", default=read_environment()["CORPUS_ARTIFACT_PATH"], help="Artifact path")
+    parser.add_argument("--embedder", default="hashing-384", help="'hashing-<dim>' or a model name for the retrieval matrix")
+
+    args = parser.parse_args()
+
+    path = build_artifact(args.data_dir, args.output, get_embedder(args.embedder))
+    artifact = CorpusArtifact(path)
+    print(f"✓ Corpus artifact written to {path} ({os.path.getsize(path)} bytes, source {artifact.source_hash[:16]})")
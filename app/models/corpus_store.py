@@ -0,0 +1,481 @@
+import glob
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+from app.models.keyword_index import KeywordIndex
+from app.utils.env_loader import read_environment
+
+# Directory holding one JSON file per legal category
+DATA_DIR = os.path.join("app", "data")
+
+# Minimum seconds between file mtime checks in refresh()
+RELOAD_CHECK_SECONDS = 5.0
+
+
+class CorpusSchemaError(ValueError):
+    """Raised when a legal data file does not match the expected schema."""
+
+
+def category_key(category):
+    """Convert a category name to its data file / session key form, e.g. 'business_corporate'"""
+    return category.lower().replace(' & ', '_').replace(' ', '_')
+
+
+def normalize_act_name(name):
+    """Normalize an act name for lookup, e.g. 'The Contract Act' -> 'contract act'"""
+    name = " ".join(name.lower().replace(",", " ").split())
+    return name[4:] if name.startswith("the ") else name
+
+
+class Section:
+    """A numbered section of an act."""
+
+    __slots__ = ("act", "number", "title", "content")
+
+    def __init__(self, act, number, title, content):
+        self.act = act
+        self.number = number
+        self.title = title
+        self.content = content
+
+
+class Act:
+    """An act or ordinance with its keywords and sections."""
+
+    __slots__ = ("category", "name", "year", "description", "keywords", "sections")
+
+    def __init__(self, category, name, year, description, keywords):
+        self.category = category
+        self.name = name
+        self.year = year
+        self.description = description
+        self.keywords = keywords
+        self.sections = ()
+
+
+class Precedent:
+    """A reported case relevant to a category."""
+
+    __slots__ = ("category", "title", "year", "citation", "summary", "keywords")
+
+    def __init__(self, category, title, year, citation, summary, keywords):
+        self.category = category
+        self.title = title
+        self.year = year
+        self.citation = citation
+        self.summary = summary
+        self.keywords = keywords
+
+
+class CategoryCorpus:
+    """Everything loaded from one category's data file."""
+
+    __slots__ = ("key", "name", "description", "acts", "precedents", "common_issues", "keyword_index")
+
+    def __init__(self, key, name, description, acts, precedents, common_issues):
+        self.key = key
+        self.name = name
+        self.description = description
+        self.acts = acts
+        self.precedents = precedents
+        self.common_issues = common_issues
+        self.keyword_index = KeywordIndex(acts)
+
+
+def list_data_files(data_dir=DATA_DIR):
+    """
+    Returns:
+        list: Sorted paths of the category JSON files in data_dir
+    """
+    return sorted(glob.glob(os.path.join(data_dir, "*.json")))
+
+
+def hash_sources(paths):
+    """
+    Hash the names and contents of the data files.
+
+    Args:
+        paths (list): Data file paths
+
+    Returns:
+        str: Hex SHA-256 digest identifying this version of the corpus
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except OSError:
+            continue
+        digest.update(os.path.basename(path).encode("utf-8"))
+        digest.update(len(raw).to_bytes(8, "little"))
+        digest.update(raw)
+    return digest.hexdigest()
+
+
+def _require(condition, path, message):
+    if not condition:
+        raise CorpusSchemaError(f"{path}: {message}")
+
+
+def validate_category_data(data, path):
+    """
+    Check that a parsed data file matches the legal corpus schema.
+
+    Args:
+        data: The parsed JSON document
+        path (str): File path, used in error messages
+
+    Raises:
+        CorpusSchemaError: If the document is malformed
+    """
+    _require(isinstance(data, dict), path, "top level must be an object")
+    _require(isinstance(data.get("acts", []), list), path, "'acts' must be a list")
+
+    for i, act in enumerate(data.get("acts", [])):
+        where = f"acts[{i}]"
+        _require(isinstance(act, dict), path, f"{where} must be an object")
+        _require(isinstance(act.get("name"), str) and act["name"].strip(), path, f"{where}.name must be a non-empty string")
+        _require(isinstance(act.get("year"), int), path, f"{where}.year must be an integer")
+        _require(isinstance(act.get("keywords", []), list), path, f"{where}.keywords must be a list")
+        _require(all(isinstance(k, str) for k in act.get("keywords", [])), path, f"{where}.keywords must be strings")
+        _require(isinstance(act.get("sections", []), list), path, f"{where}.sections must be a list")
+
+        for j, section in enumerate(act.get("sections", [])):
+            _require(isinstance(section, dict), path, f"{where}.sections[{j}] must be an object")
+            _require(isinstance(section.get("number"), (str, int)), path, f"{where}.sections[{j}].number is required")
+            _require(isinstance(section.get("content", ""), str), path, f"{where}.sections[{j}].content must be a string")
+
+    _require(isinstance(data.get("precedents", []), list), path, "'precedents' must be a list")
+    for i, precedent in enumerate(data.get("precedents", [])):
+        _require(isinstance(precedent, dict) and isinstance(precedent.get("title"), str), path, f"precedents[{i}].title is required")
+
+    _require(isinstance(data.get("common_issues", []), list), path, "'common_issues' must be a list")
+
+
+def _build_category(key, data):
+    """Intern a validated data file into compact records"""
+    intern = sys.intern
+    key = intern(key)
+
+    acts = []
+    for raw_act in data.get("acts", []):
+        act = Act(
+            key,
+            intern(raw_act["name"]),
+            raw_act["year"],
+            raw_act.get("description", ""),
+            tuple(intern(k.strip().lower()) for k in raw_act.get("keywords", []))
+        )
+        act.sections = tuple(
+            Section(act, intern(str(raw["number"])), raw.get("title", ""), raw.get("content", ""))
+            for raw in raw_act.get("sections", [])
+        )
+        acts.append(act)
+
+    precedents = [
+        Precedent(
+            key,
+            raw["title"],
+            raw.get("year"),
+            raw.get("citation", ""),
+            raw.get("summary", ""),
+            tuple(intern(k.strip().lower()) for k in raw.get("keywords", []))
+        )
+        for raw in data.get("precedents", [])
+    ]
+
+    return CategoryCorpus(
+        key,
+        data.get("name", key),
+        data.get("description", ""),
+        tuple(acts),
+        tuple(precedents),
+        tuple(data.get("common_issues", []))
+    )
+
+
+class _CorpusTables:
+    """An immutable snapshot of the corpus and its lookups, swapped whole on reload."""
+
+    def __init__(self, categories, mtimes, source_hash):
+        self.categories = categories
+        self.mtimes = mtimes
+        self.source_hash = source_hash
+        self.version = source_hash[:16]
+        self.acts_by_name = {}
+        self.acts_by_year = {}
+        self.acts_by_keyword = {}
+        self.sections_by_number = {}
+
+        for corpus in categories.values():
+            for act in corpus.acts:
+                self.acts_by_name[normalize_act_name(act.name)] = act
+                self.acts_by_year.setdefault(act.year, []).append(act)
+                for keyword in act.keywords:
+                    self.acts_by_keyword.setdefault(keyword, []).append(act)
+                for section in act.sections:
+                    self.sections_by_number.setdefault(section.number, []).append(section)
+
+    def category_keys(self):
+        return list(self.categories)
+
+    def category(self, key):
+        return self.categories.get(key)
+
+    def act(self, name):
+        return self.acts_by_name.get(normalize_act_name(name))
+
+    def acts_in_year(self, year):
+        return list(self.acts_by_year.get(year, ()))
+
+    def acts_for_keyword(self, keyword):
+        return list(self.acts_by_keyword.get(keyword.strip().lower(), ()))
+
+    def sections_numbered(self, number):
+        return list(self.sections_by_number.get(str(number), ()))
+
+
+class _ArtifactTables:
+    """
+    The same lookups answered from a memory-mapped corpus artifact. Nothing
+    is materialized up front; each category becomes records on first use.
+    """
+
+    def __init__(self, artifact, mtimes, source_hash):
+        self.artifact = artifact
+        self.mtimes = mtimes
+        self.source_hash = source_hash
+        self.version = source_hash[:16]
+
+    def category_keys(self):
+        return self.artifact.category_keys()
+
+    def category(self, key):
+        return self.artifact.category(key)
+
+    def act(self, name):
+        return self.artifact.act_named(name)
+
+    def acts_in_year(self, year):
+        return self.artifact.acts_in_year(year)
+
+    def acts_for_keyword(self, keyword):
+        return self.artifact.acts_for_keyword(keyword)
+
+    def sections_numbered(self, number):
+        return self.artifact.sections_numbered(number)
+
+
+class CorpusStore:
+    """
+    Process-wide store of the legal corpus in app/data/*.json.
+
+    Files are parsed and validated once, interned into slotted records and
+    indexed by act name, year, section number and keyword. With a corpus
+    artifact, records are instead read lazily from its mmap and looked up
+    through its precompiled indexes. refresh() watches
+    file mtimes and reloads in place, so agents can hold a reference to the
+    store instead of their own copy of the data.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, artifact_path=None):
+        """
+        Load the corpus.
+
+        Args:
+            data_dir (str): Directory holding the category JSON files
+            artifact_path (str): Optional precompiled corpus artifact to load from,
+                rebuilt automatically when stale
+        """
+        self.data_dir = data_dir
+        self.artifact_path = artifact_path
+        self.errors = {}
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._tables = _CorpusTables({}, {}, "")
+        self.load()
+
+    def _data_files(self):
+        return list_data_files(self.data_dir)
+
+    def _parse_files(self, paths):
+        """Parse and validate the JSON data files, skipping (and reporting) broken ones"""
+        categories = {}
+        errors = {}
+
+        for path in paths:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                validate_category_data(data, path)
+            except (OSError, ValueError) as e:
+                # A broken file is reported and skipped rather than hiding the whole corpus
+                errors[path] = str(e)
+                print(f"Error loading legal data: {e}")
+                continue
+
+            key = os.path.splitext(os.path.basename(path))[0]
+            categories[key] = _build_category(key, data)
+
+        return categories, errors
+
+    def load(self):
+        """Load and index every data file, replacing the current tables"""
+        paths = self._data_files()
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.path.getmtime(path)
+            except OSError:
+                continue
+
+        source_hash = hash_sources(paths)
+        tables = None
+        errors = {}
+
+        if self.artifact_path:
+            try:
+                from app.models.corpus_artifact import ensure_artifact
+
+                artifact = ensure_artifact(self.data_dir, self.artifact_path, source_hash)
+                tables = _ArtifactTables(artifact, mtimes, source_hash)
+                # Files skipped when the artifact was compiled are still reported
+                errors = artifact.errors()
+            except Exception as e:
+                print(f"Error loading corpus artifact, falling back to JSON: {e}")
+
+        if tables is None:
+            categories, errors = self._parse_files(paths)
+            tables = _CorpusTables(categories, mtimes, source_hash)
+
+        with self._lock:
+            self._tables = tables
+            self.errors = errors
+            self._last_check = time.monotonic()
+
+    def refresh(self, force=False):
+        """
+        Reload the corpus if any data file was added, removed or modified.
+
+        Args:
+            force (bool): Check mtimes even if the last check was recent
+
+        Returns:
+            bool: True if the corpus was reloaded
+        """
+        if not force and time.monotonic() - self._last_check < RELOAD_CHECK_SECONDS:
+            return False
+        self._last_check = time.monotonic()
+
+        current = {}
+        for path in self._data_files():
+            try:
+                current[path] = os.path.getmtime(path)
+            except OSError:
+                continue
+
+        if current == self._tables.mtimes:
+            return False
+
+        self.load()
+        return True
+
+    @property
+    def version(self):
+        """Short content hash of the loaded data files"""
+        return self._tables.version
+
+    @property
+    def source_hash(self):
+        """Full hash_sources() digest of the loaded data files"""
+        return self._tables.source_hash
+
+    def categories(self):
+        """
+        Returns:
+            list: Keys of the loaded categories
+        """
+        return self._tables.category_keys()
+
+    def category(self, key):
+        """
+        Args:
+            key (str): Category key, see category_key()
+
+        Returns:
+            CategoryCorpus: The category's records, or None if it has no data
+        """
+        return self._tables.category(key)
+
+    def act(self, name):
+        """
+        Args:
+            name (str): Act name, matched case-insensitively with or without 'The'
+
+        Returns:
+            Act: The act, or None
+        """
+        return self._tables.act(name)
+
+    def acts_by_year(self, year):
+        """
+        Returns:
+            list: Acts enacted in the given year
+        """
+        return self._tables.acts_in_year(year)
+
+    def acts_by_keyword(self, keyword):
+        """
+        Returns:
+            list: Acts tagged with the keyword
+        """
+        return self._tables.acts_for_keyword(keyword)
+
+    def sections_by_number(self, number):
+        """
+        Returns:
+            list: Sections with the given number across all acts
+        """
+        return self._tables.sections_numbered(number)
+
+    def section(self, act_name, number):
+        """
+        Args:
+            act_name (str): Act name
+            number: Section number
+
+        Returns:
+            Section: The section, or None
+        """
+        act = self.act(act_name)
+        if act is None:
+            return None
+        for section in act.sections:
+            if section.number == str(number):
+                return section
+        return None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_corpus_store():
+    """
+    Get the process-wide corpus store, loading it on first use.
+
+    Returns:
+        CorpusStore: The shared store
+    """
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            artifact_path = read_environment()["CORPUS_ARTIFACT_PATH"]
+            _store = CorpusStore(artifact_path=artifact_path or None)
+        return _store
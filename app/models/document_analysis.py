@@ -0,0 +1,183 @@
+from app.utils.env_loader import read_environment
+from app.utils.lazy_import import lazy_import
+
+text_splitter = lazy_import("langchain.text_splitter")
+
+# Per-chunk ("map") prompt; the notes from every chunk feed one synthesis prompt
+MAP_PROMPT = """Summarize the legal issues, parties, obligations, dates and amounts in this part of a {document_type}.
+
+{chunk}
+
+Key points:"""
+
+# Token window of the encoder when the tokenizer does not report a sensible one
+DEFAULT_MAX_INPUT_TOKENS = 512
+
+
+def count_tokens(tokenizer, text):
+    """
+    Returns:
+        int: Number of tokens in text, without special tokens
+    """
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def max_input_tokens(tokenizer):
+    """
+    Returns:
+        int: The encoder's input window (tokenizers report a huge sentinel when unknown)
+    """
+    limit = getattr(tokenizer, "model_max_length", None)
+    if not limit or limit > 100000:
+        return DEFAULT_MAX_INPUT_TOKENS
+    return limit
+
+
+def split_document(text, tokenizer, chunk_tokens, overlap_tokens=0):
+    """
+    Split text into chunks of at most chunk_tokens tokenizer tokens, preferring
+    paragraph, then line, then sentence boundaries.
+
+    Args:
+        text (str): The document text
+        tokenizer: The generating model's tokenizer
+        chunk_tokens (int): Maximum tokens per chunk
+        overlap_tokens (int): Tokens repeated between consecutive chunks
+
+    Returns:
+        list: The chunks, in document order
+    """
+    splitter = text_splitter.RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+        tokenizer,
+        chunk_size=chunk_tokens,
+        chunk_overlap=overlap_tokens,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+    return [chunk for chunk in splitter.split_text(text) if chunk.strip()]
+
+
+def truncate_tokens(tokenizer, text, limit):
+    """
+    Returns:
+        tuple: (text cut to at most limit tokens, number of tokens dropped)
+    """
+    ids = tokenizer.encode(text, add_special_tokens=False)
+    if len(ids) <= limit:
+        return text, 0
+    return tokenizer.decode(ids[:limit], skip_special_tokens=True), len(ids) - limit
+
+
+class DocumentAnalyzer:
+    """
+    Map-reduce condensation of documents longer than the encoder's window.
+
+    The document is split by token count, every chunk is summarized in one
+    batch through the shared inference worker (map), and the chunk notes
+    replace the raw text in the final legal analysis prompt (reduce). Only
+    as many chunks are summarized as their notes fit in the reduce prompt,
+    and the tokens spent across both stages, including the reduce prompt's
+    input window and its generated answer, stay within token_budget. The
+    first chunk is always summarized. Chunks beyond either limit are
+    dropped and reported.
+    """
+
+    def __init__(self, token_budget=4096, chunk_tokens=384, overlap_tokens=32, map_max_new_tokens=96):
+        """
+        Initialize the analyzer.
+
+        Args:
+            token_budget (int): Input plus generated tokens allowed across all stages
+            chunk_tokens (int): Maximum document tokens per map prompt
+            overlap_tokens (int): Tokens repeated between consecutive chunks
+            map_max_new_tokens (int): Tokens generated per chunk summary
+        """
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.map_max_new_tokens = map_max_new_tokens
+
+    def needs_condensing(self, tokenizer, text):
+        """
+        Returns:
+            bool: True if text does not fit in a single chunk
+        """
+        return count_tokens(tokenizer, text) > self.chunk_tokens
+
+    def condense(self, text, model, tokenizer, worker, document_type="legal document", deadline=None,
+                 notes_window=None, synthesis_max_tokens=0):
+        """
+        Summarize a long document chunk by chunk.
+
+        Args:
+            text (str): The full document text
+            model: The generating model
+            tokenizer: Its tokenizer
+            worker (BatchingInferenceWorker): Worker to batch the chunk prompts through
+            document_type (str): Document type named in the map prompt
+            deadline (float): Optional time.monotonic() deadline for the map stage
+            notes_window (int): Tokens the notes may take in the reduce prompt, i.e. the
+                input window minus the prompt around them; defaults to the whole window
+            synthesis_max_tokens (int): Tokens the reduce step may generate
+
+        Returns:
+            tuple: (notes text to analyze instead of the document, token usage dict)
+        """
+        chunks = split_document(text, tokenizer, self.chunk_tokens, self.overlap_tokens)
+        prompts = [MAP_PROMPT.format(document_type=document_type, chunk=chunk) for chunk in chunks]
+        window = max_input_tokens(tokenizer)
+        prompt_tokens = [min(count_tokens(tokenizer, prompt), window) for prompt in prompts]
+
+        # Reserve the reduce prompt and its answer, then fit as many chunks as possible
+        budget = self.token_budget - window - synthesis_max_tokens
+        notes_window = window if notes_window is None else notes_window
+        note_tokens = self.map_max_new_tokens + count_tokens(tokenizer, f"Part {len(chunks)}:\n")
+        kept = 0
+        for tokens in prompt_tokens:
+            cost = tokens + self.map_max_new_tokens
+            if kept and (cost > budget or (kept + 1) * note_tokens > notes_window):
+                break
+            budget -= cost
+            kept += 1
+
+        # Submitted together, the chunk prompts share one batched generate(). Short chunk
+        # summaries are kept out of the latency estimate made for full answers
+        futures = [
+            worker.submit(
+                model, tokenizer, prompt, deadline=deadline,
+                record_latency=False, max_new_tokens=self.map_max_new_tokens
+            )
+            for prompt in prompts[:kept]
+        ]
+        notes = [future.result() for future in futures]
+
+        combined = "\n".join(f"Part {i + 1}: {note.strip()}" for i, note in enumerate(notes))
+        usage = {
+            "document_tokens": count_tokens(tokenizer, text),
+            "map": {
+                "chunks": len(chunks),
+                "chunks_analyzed": kept,
+                "chunks_dropped": len(chunks) - kept,
+                "input_tokens": sum(prompt_tokens[:kept]),
+                "output_tokens": sum(count_tokens(tokenizer, note) for note in notes),
+                "notes_tokens": count_tokens(tokenizer, combined),
+                "notes_window": notes_window,
+            },
+            "token_budget": self.token_budget,
+        }
+        return combined, usage
+
+
+def get_document_analyzer():
+    """
+    Create a DocumentAnalyzer from the DOCUMENT_* settings.
+
+    Returns:
+        DocumentAnalyzer: The configured analyzer
+    """
+    env = read_environment()
+    return DocumentAnalyzer(
+        token_budget=env["DOCUMENT_TOKEN_BUDGET"],
+        chunk_tokens=env["DOCUMENT_CHUNK_TOKENS"],
+        overlap_tokens=env["DOCUMENT_CHUNK_OVERLAP"],
+        map_max_new_tokens=env["DOCUMENT_MAP_MAX_TOKENS"]
+    )
@@ -0,0 +1,198 @@
+import os
+import threading
+
+from app.utils.env_loader import read_environment
+from app.utils.lazy_import import lazy_import
+
+torch = lazy_import("torch")
+
+
+class LoadStrategy:
+    """How to load and prepare model weights for a given backend."""
+
+    __slots__ = ("name", "device", "dtype", "quantization", "description", "runtime")
+
+    def __init__(self, name, device, dtype, quantization, description, runtime="torch"):
+        self.name = name
+        self.device = device
+        self.dtype = dtype
+        self.quantization = quantization
+        self.description = description
+        self.runtime = runtime
+
+    @property
+    def weight_dtype(self):
+        """The dtype the weights end up in, used as the registry key's dtype"""
+        if self.runtime == "onnxruntime":
+            return f"onnx-{self.dtype}"
+        if self.quantization == "dynamic-int8":
+            return "qint8"
+        if self.quantization == "bitsandbytes-int8":
+            return "int8"
+        return self.dtype
+
+    def from_pretrained_kwargs(self):
+        """
+        Returns:
+            dict: Keyword arguments for AutoModelForSeq2SeqLM.from_pretrained()
+        """
+        if self.quantization == "bitsandbytes-int8":
+            return {"load_in_8bit": True, "device_map": "auto"}
+        return {"torch_dtype": getattr(torch, self.dtype)}
+
+    def prepare(self, model):
+        """
+        Move and quantize a freshly loaded model according to the strategy.
+
+        Args:
+            model: The loaded model
+
+        Returns:
+            The model ready for inference
+        """
+        if self.quantization == "bitsandbytes-int8":
+            return model.eval()
+
+        model = model.to(self.device).eval()
+        if self.quantization == "dynamic-int8":
+            # Quantize Linear weights to int8; activations stay fp32
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "device": self.device,
+            "dtype": self.dtype,
+            "quantization": self.quantization,
+            "runtime": self.runtime,
+            "num_threads": torch.get_num_threads(),
+        }
+
+
+STRATEGIES = {
+    "cpu-fp32": LoadStrategy("cpu-fp32", "cpu", "float32", None, "Full precision on CPU"),
+    "cpu-bf16": LoadStrategy("cpu-bf16", "cpu", "bfloat16", None, "bfloat16 on CPUs with native bf16 (AVX512-BF16/AMX)"),
+    "cpu-int8-dynamic": LoadStrategy("cpu-int8-dynamic", "cpu", "float32", "dynamic-int8", "PyTorch dynamic int8 quantization of Linear layers"),
+    "cuda-fp16": LoadStrategy("cuda-fp16", "cuda", "float16", None, "Half precision on GPU"),
+    "cuda-int8": LoadStrategy("cuda-int8", "cuda", "float16", "bitsandbytes-int8", "bitsandbytes 8-bit weights on GPU"),
+    "mps-fp16": LoadStrategy("mps-fp16", "mps", "float16", None, "Half precision on Apple silicon"),
+    "onnx-cpu": LoadStrategy("onnx-cpu", "cpu", "float32", None, "Exported graphs on ONNX Runtime", runtime="onnxruntime"),
+}
+
+
+def detect_backend():
+    """
+    Returns:
+        str: 'cuda', 'mps' or 'cpu'
+    """
+    if torch.cuda.is_available():
+        return "cuda"
+    if getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def cpu_supports_bf16():
+    """
+    Returns:
+        bool: True if the CPU has native bfloat16 matmul instructions
+    """
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def available_strategies(backend=None):
+    """
+    Args:
+        backend (str): Backend to list strategies for, defaults to the detected one
+
+    Returns:
+        list: Names of the strategies usable on this host
+    """
+    backend = backend or detect_backend()
+    names = [name for name, strategy in STRATEGIES.items() if strategy.device == backend]
+
+    if backend == "cpu" and not cpu_supports_bf16():
+        names.remove("cpu-bf16")
+    if backend == "cpu":
+        try:
+            import onnxruntime  # noqa: F401
+            import optimum.onnxruntime  # noqa: F401
+        except ImportError:
+            names.remove("onnx-cpu")
+    if backend == "cuda":
+        try:
+            import bitsandbytes  # noqa: F401
+        except ImportError:
+            names.remove("cuda-int8")
+    return names
+
+
+def select_load_strategy(name=None):
+    """
+    Pick the load strategy for this host.
+
+    Args:
+        name (str): Strategy name or 'auto', defaults to MODEL_LOAD_STRATEGY
+
+    Returns:
+        LoadStrategy: The selected strategy
+    """
+    env = read_environment()
+    name = name or env["MODEL_LOAD_STRATEGY"]
+
+    # INFERENCE_BACKEND=onnx swaps the automatic choice for the ONNX Runtime graphs
+    if name == "auto" and env["INFERENCE_BACKEND"] == "onnx":
+        name = "onnx-cpu"
+
+    if name != "auto":
+        if name not in STRATEGIES:
+            raise ValueError(f"Unknown MODEL_LOAD_STRATEGY '{name}', expected one of: auto, {', '.join(STRATEGIES)}")
+        return STRATEGIES[name]
+
+    backend = detect_backend()
+    if backend == "cuda":
+        return STRATEGIES["cuda-fp16"]
+    if backend == "mps":
+        return STRATEGIES["mps-fp16"]
+
+    # fp16 matmuls are emulated on most CPUs; use bf16 only where it is native
+    return STRATEGIES["cpu-bf16"] if cpu_supports_bf16() else STRATEGIES["cpu-fp32"]
+
+
+def find_strategy(device, weight_dtype):
+    """
+    Look up the strategy matching a model registry key.
+
+    Args:
+        device (str): The strategy's device
+        weight_dtype (str): The strategy's weight_dtype
+
+    Returns:
+        LoadStrategy: The matching strategy
+    """
+    for strategy in STRATEGIES.values():
+        if strategy.device == device and strategy.weight_dtype == weight_dtype:
+            return strategy
+    raise ValueError(f"No load strategy for device={device} dtype={weight_dtype}")
+
+
+_threads_configured = False
+_threads_lock = threading.Lock()
+
+
+def configure_threads():
+    """Apply MODEL_NUM_THREADS (default: all cores) to PyTorch intra-op parallelism once"""
+    global _threads_configured
+
+    with _threads_lock:
+        if _threads_configured:
+            return
+        num_threads = read_environment()["MODEL_NUM_THREADS"] or os.cpu_count() or 1
+        torch.set_num_threads(num_threads)
+        _threads_configured = True
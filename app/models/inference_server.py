@@ -0,0 +1,363 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from app.utils.env_loader import read_environment
+from app.utils.lazy_import import lazy_import
+
+torch = lazy_import("torch")
+transformers = lazy_import("transformers")
+
+# Smallest max_time handed to generate() when a request's deadline is near or past
+MIN_GENERATION_SECONDS = 0.1
+
+# Smoothing factor for the latency and output length estimates
+LATENCY_EWMA_ALPHA = 0.3
+
+
+def _ewma(previous, sample):
+    return sample if previous is None else LATENCY_EWMA_ALPHA * sample + (1 - LATENCY_EWMA_ALPHA) * previous
+
+
+class DecodeTimer:
+    """
+    Stopping criterion that never stops generation, only timestamps it.
+
+    generate() calls stopping criteria once per decoding step, so the first
+    call marks the end of prefill (prompt encoding plus the first token) and
+    the calls after it time the decode steps.
+    """
+
+    def __init__(self):
+        self.first_step = None
+        self.last_step = None
+        self.steps = 0
+
+    def __call__(self, input_ids, scores, **kwargs):
+        now = time.monotonic()
+        if self.first_step is None:
+            self.first_step = now
+        self.last_step = now
+        self.steps += 1
+        return torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+
+
+class BatchStreamer:
+    """
+    Streamer for a batched generate() call that hands each sequence's tokens
+    to its own request's streamer (None for requests that are not streamed).
+
+    generate() puts the decoder prompt as a (batch, length) tensor, then one
+    (batch,) tensor of tokens per step. A sequence's streamer is ended as
+    soon as it emits end-of-sequence, so its reader does not wait for the
+    longest sequence in the batch.
+    """
+
+    def __init__(self, streamers, eos_token_id=None):
+        self.streamers = list(streamers)
+        self.eos_token_id = eos_token_id
+        self._prompt_done = False
+
+    def put(self, value):
+        if value.dim() == 1:
+            value = value.unsqueeze(-1)
+        for i, streamer in enumerate(self.streamers):
+            if streamer is None:
+                continue
+            tokens = value[i]
+            streamer.put(tokens)
+            if self._prompt_done and self.eos_token_id is not None and (tokens == self.eos_token_id).any():
+                streamer.end()
+                self.streamers[i] = None
+        self._prompt_done = True
+
+    def end(self):
+        for i, streamer in enumerate(self.streamers):
+            if streamer is not None:
+                streamer.end()
+                self.streamers[i] = None
+
+
+class LatencyEstimate:
+    """Smoothed prefill time, per decode step time and output length of one model."""
+
+    __slots__ = ("prefill_seconds", "token_seconds", "output_tokens")
+
+    def __init__(self):
+        self.prefill_seconds = None
+        self.token_seconds = None
+        self.output_tokens = None
+
+    def record(self, prefill_seconds, token_seconds, output_tokens):
+        self.prefill_seconds = _ewma(self.prefill_seconds, prefill_seconds)
+        if token_seconds is not None:
+            self.token_seconds = _ewma(self.token_seconds, token_seconds)
+        self.output_tokens = _ewma(self.output_tokens, output_tokens)
+
+    def seconds(self, max_tokens):
+        """
+        Returns:
+            float: prefill + per-token time x expected output length (at most max_tokens),
+            or None until a decode step has been timed
+        """
+        if self.token_seconds is None:
+            return None
+        return self.prefill_seconds + self.token_seconds * min(self.output_tokens, max_tokens)
+
+
+class InferenceRequest:
+    """A single prompt waiting to be generated by the inference worker."""
+
+    __slots__ = ("model", "tokenizer", "prompt", "generate_kwargs", "deadline", "streamer", "record_latency", "future")
+
+    def __init__(self, model, tokenizer, prompt, generate_kwargs, deadline=None, streamer=None, record_latency=True):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.prompt = prompt
+        self.generate_kwargs = generate_kwargs
+        self.deadline = deadline
+        self.streamer = streamer
+        self.record_latency = record_latency
+        self.future = Future()
+
+    def batch_key(self):
+        """Requests can share a generate() call when model and settings match"""
+        return (id(self.model), self.record_latency, tuple(sorted(self.generate_kwargs.items())))
+
+
+class BatchingInferenceWorker:
+    """
+    In-process inference server with dynamic micro-batching.
+
+    Prompts submitted from any thread are queued and a dedicated worker thread
+    collects prompts for the same model for up to max_wait_ms (or until
+    max_batch_size prompts are waiting), runs them as one padded generate()
+    batch and resolves each caller's future with its decoded text.
+
+    Streamed requests are batched the same way; each sequence's tokens are
+    fed to its own request's streamer as the batch generates them.
+    """
+
+    def __init__(self, max_wait_ms=20, max_batch_size=8):
+        """
+        Initialize the worker. The thread is started on first submit.
+
+        Args:
+            max_wait_ms (float): How long to wait for more prompts to join a batch
+            max_batch_size (int): Maximum number of prompts per generate() call
+        """
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_size = max(1, max_batch_size)
+        self._queue = queue.Queue()
+        self._pending = deque()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._latency = {}
+
+    def start(self):
+        """Start the worker thread if it is not already running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="inference-worker", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Ask the worker thread to exit once the queue is drained"""
+        self._queue.put(None)
+
+    def submit(self, model, tokenizer, prompt, deadline=None, streamer=None, record_latency=True, **generate_kwargs):
+        """
+        Queue a prompt for generation.
+
+        Args:
+            model: The seq2seq model to generate with
+            tokenizer: The tokenizer matching the model
+            prompt (str): The prompt text
+            deadline (float): Optional time.monotonic() deadline, enforced via max_time
+            streamer: Optional transformers streamer fed as tokens are generated;
+                it is ended even if generation fails
+            record_latency (bool): Fold this generation's timing into the latency
+                estimate; off for unrepresentative calls such as warm-up
+            **generate_kwargs: Extra keyword arguments for model.generate()
+
+        Returns:
+            Future: Resolves to the decoded generated text
+        """
+        self.start()
+        request = InferenceRequest(model, tokenizer, prompt, generate_kwargs, deadline, streamer, record_latency)
+        self._queue.put(request)
+        return request.future
+
+    def estimate_seconds(self, model, max_tokens):
+        """
+        Estimate how long a generation with model capped at max_tokens will take.
+
+        The estimate is prefill time plus per-token decode time times the
+        model's typical output length, both learned from earlier generations,
+        rather than the worst case of decoding all max_tokens.
+
+        Args:
+            model: The model that will generate
+            max_tokens (int): The request's output length limit
+
+        Returns:
+            float: Estimated seconds, or None if the model has not generated yet
+        """
+        estimate = self._latency.get(id(model))
+        return estimate.seconds(max_tokens) if estimate is not None else None
+
+    def _record_latency(self, model, started, timer, output_tokens):
+        """
+        Fold one generate() call's timing into the model's latency estimate.
+
+        Args:
+            model: The model that generated
+            started (float): time.monotonic() when generate() was called
+            timer (DecodeTimer): The call's step timestamps
+            output_tokens (float): Mean generated length of the batch's sequences
+        """
+        if timer.steps == 0:
+            return
+        prefill_seconds = timer.first_step - started
+        token_seconds = None
+        if timer.steps > 1:
+            token_seconds = (timer.last_step - timer.first_step) / (timer.steps - 1)
+        self._latency.setdefault(id(model), LatencyEstimate()).record(prefill_seconds, token_seconds, output_tokens)
+
+    def _next_request(self, timeout=None):
+        """Take the next request, preferring ones deferred from an earlier batch"""
+        if self._pending:
+            return self._pending.popleft()
+        return self._queue.get(timeout=timeout)
+
+    def _collect_batch(self, first):
+        """Gather requests compatible with the first one until the batch window closes"""
+        batch = [first]
+        key = first.batch_key()
+
+        # Deferred requests that fit this batch go first
+        deferred = deque()
+        while self._pending and len(batch) < self.max_batch_size:
+            request = self._pending.popleft()
+            if request is not None and request.batch_key() == key:
+                batch.append(request)
+            else:
+                deferred.append(request)
+        deferred.extend(self._pending)
+        self._pending = deferred
+
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            if request is not None and request.batch_key() == key:
+                batch.append(request)
+            else:
+                # Different model/settings (or the stop sentinel): handle next round
+                self._pending.append(request)
+                if request is None:
+                    break
+
+        return batch
+
+    def _run(self):
+        """Worker thread main loop"""
+        while True:
+            first = self._next_request()
+            if first is None:
+                return
+
+            batch = self._collect_batch(first)
+            self._run_batch(batch)
+
+    @staticmethod
+    def _output_tokens(tokenizer, outputs):
+        """Mean generated length of a batch, not counting padding or the decoder start token"""
+        if tokenizer.pad_token_id is None:
+            return float(outputs.shape[-1])
+        return (outputs != tokenizer.pad_token_id).sum(dim=-1).float().mean().item()
+
+    def _run_batch(self, batch):
+        """Run one padded generate() call and resolve every request in the batch"""
+        running = []
+        for request in batch:
+            if request.future.set_running_or_notify_cancel():
+                running.append(request)
+            elif request.streamer is not None:
+                request.streamer.end()
+        batch = running
+        if not batch:
+            return
+
+        model = batch[0].model
+        tokenizer = batch[0].tokenizer
+        generate_kwargs = dict(batch[0].generate_kwargs)
+
+        # The tightest deadline in the batch bounds the whole generate() call
+        deadlines = [request.deadline for request in batch if request.deadline is not None]
+        if deadlines:
+            generate_kwargs["max_time"] = max(min(deadlines) - time.monotonic(), MIN_GENERATION_SECONDS)
+
+        # One streamer for the batch fans tokens out to the streamed requests
+        streamer = None
+        if any(request.streamer is not None for request in batch):
+            streamer = BatchStreamer([request.streamer for request in batch], tokenizer.eos_token_id)
+            generate_kwargs["streamer"] = streamer
+
+        try:
+            inputs = tokenizer(
+                [request.prompt for request in batch],
+                padding=True,
+                truncation=True,
+                return_tensors="pt"
+            ).to(model.device)
+
+            timer = DecodeTimer()
+            started = time.monotonic()
+            with torch.no_grad():
+                outputs = model.generate(**inputs, stopping_criteria=transformers.StoppingCriteriaList([timer]), **generate_kwargs)
+            if batch[0].record_latency:
+                self._record_latency(model, started, timer, self._output_tokens(tokenizer, outputs))
+
+            texts = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        except Exception as e:
+            # Unblock consumers waiting on their streamers
+            if streamer is not None:
+                streamer.end()
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        for request, text in zip(batch, texts):
+            request.future.set_result(text)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_inference_worker():
+    """
+    Get the process-wide inference worker, creating it on first use.
+
+    Returns:
+        BatchingInferenceWorker: The shared worker
+    """
+    global _worker
+
+    with _worker_lock:
+        if _worker is None:
+            env = read_environment()
+            _worker = BatchingInferenceWorker(
+                max_wait_ms=env["INFERENCE_MAX_WAIT_MS"],
+                max_batch_size=env["INFERENCE_MAX_BATCH_SIZE"]
+            )
+        return _worker
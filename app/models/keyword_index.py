@@ -0,0 +1,84 @@
+import math
+import re
+from collections import Counter
+
+# BM25 term-frequency saturation
+BM25_K1 = 1.2
+
+
+class KeywordMatch:
+    """An act matched by the keyword index, with its hit counts and score."""
+
+    __slots__ = ("act", "hits", "score")
+
+    def __init__(self, act, hits, score):
+        self.act = act
+        self.hits = hits
+        self.score = score
+
+
+class KeywordIndex:
+    """
+    Keyword lookup over a category's acts, compiled once into a single
+    case-insensitive regex so a text is scanned in one pass regardless of
+    how many acts or keywords there are.
+    """
+
+    def __init__(self, acts):
+        """
+        Compile the index.
+
+        Args:
+            acts (list): Act records with a 'keywords' tuple
+        """
+        self.acts = list(acts)
+        self._acts_by_keyword = {}
+
+        for position, act in enumerate(self.acts):
+            for keyword in act.keywords:
+                keyword = keyword.strip().lower()
+                if keyword:
+                    acts_for_keyword = self._acts_by_keyword.setdefault(keyword, [])
+                    if position not in acts_for_keyword:
+                        acts_for_keyword.append(position)
+
+        # Rarer keywords say more about which act is relevant
+        total = len(self.acts)
+        self._idf = {
+            keyword: math.log(1 + (total - len(positions) + 0.5) / (len(positions) + 0.5))
+            for keyword, positions in self._acts_by_keyword.items()
+        }
+
+        # Longest first so multi-word keywords win over their prefixes
+        keywords = sorted(self._acts_by_keyword, key=len, reverse=True)
+        if keywords:
+            alternation = "|".join(re.escape(keyword) for keyword in keywords)
+            self._pattern = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE)
+        else:
+            self._pattern = None
+
+    def match(self, text):
+        """
+        Find every act whose keywords occur in the text.
+
+        Args:
+            text (str): The text to scan
+
+        Returns:
+            list: KeywordMatch objects, highest BM25-style score first
+        """
+        if self._pattern is None or not text:
+            return []
+
+        keyword_counts = Counter(m.group(0).lower() for m in self._pattern.finditer(text))
+
+        hits = {}
+        scores = {}
+        for keyword, count in keyword_counts.items():
+            weight = self._idf[keyword] * count * (BM25_K1 + 1) / (count + BM25_K1)
+            for position in self._acts_by_keyword[keyword]:
+                hits[position] = hits.get(position, 0) + count
+                scores[position] = scores.get(position, 0.0) + weight
+
+        ranked = sorted(scores, key=lambda position: (-scores[position], position))
+        return [KeywordMatch(self.acts[position], hits[position], scores[position]) for position in ranked]
@@ -1,18 +1,20 @@
-import os
-import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+import queue
+import weakref
 import streamlit as st
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-import nltk
-from nltk.tokenize import sent_tokenize
-import json
 import time
+import threading
+from app.models.model_registry import get_model_registry
+from app.models.inference_server import get_inference_worker
+from app.models.retrieval import get_legal_index
+from app.models.corpus_store import category_key, get_corpus_store
+from app.models.response_cache import get_response_cache, make_cache_key
+from app.models.semantic_cache import get_semantic_cache
+from app.models.citation_parser import extract_citations
+from app.models.document_analysis import count_tokens, get_document_analyzer, max_input_tokens, truncate_tokens
+from app.utils.env_loader import read_environment
+from app.utils.lazy_import import lazy_import
 
-# Download necessary NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+transformers = lazy_import("transformers")
 
 # Legal domain model mappings
 LEGAL_MODELS = {
@@ -29,8 +31,8 @@ LEGAL_MODELS = {
 
 # Default models when specific ones are not available
 DEFAULT_MODEL = "google/flan-t5-small"
-DOCUMENT_MODEL = "BAAI/bge-small-en-v1.5"
-SPEECH_MODEL = "google/flan-t5-small"
+# DOCUMENT_MODEL (retrieval embeddings) is defined in app.models.retrieval,
+# SPEECH_MODEL (transcription) in app.models.speech
 
 # Model config based on user selection
 MODEL_CONFIG = {
@@ -51,17 +53,18 @@ MODEL_CONFIG = {
     }
 }
 
-# Load specialized legal data from JSON files (if available)
-def load_legal_data(category):
-    try:
-        data_file = os.path.join("app", "data", f"{category.lower().replace(' & ', '_').replace(' ', '_')}.json")
-        if os.path.exists(data_file):
-            with open(data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Error loading legal data: {e}")
-        return {}
+# Profile used when a request's latency budget cannot fit its selected profile
+FALLBACK_MODEL_TYPE = "Efficient"
+
+# Message returned when generation fails
+FALLBACK_ADVICE = "I apologize, but I encountered an issue while analyzing your query. Please try again or rephrase your question."
+
+# Number of retrieved acts/sections used to ground the prompt
+RETRIEVAL_TOP_K = 3
+
+# How long past its deadline a streamed answer may go without a token before
+# the worker is presumed stuck; generation itself is capped at the deadline
+STREAM_STALL_SECONDS = 30
 
 class LegalAgent:
     """
@@ -78,41 +81,103 @@ class LegalAgent:
         """
         self.category = category
         self.model_name = LEGAL_MODELS.get(category, DEFAULT_MODEL)
-        self.legal_data = load_legal_data(category)
+        
+        # Shared, indexed legal corpus (reloaded in place when the data files change)
+        self.corpus = get_corpus_store()
         
         # Get model configuration based on user preferences
-        model_type = st.session_state.get("model_type", "Standard")
-        self.config = MODEL_CONFIG[model_type]
+        self.model_type = st.session_state.get("model_type", "Standard")
+        self.config = MODEL_CONFIG[self.model_type]
+        
+        # Default per-request latency budget in seconds
+        self.latency_budget = read_environment()["LATENCY_BUDGET_SECONDS"]
         
         # Initialize model and tokenizer lazily (only when needed)
         self.model = None
         self.tokenizer = None
-        self.pipeline = None
+        self._model_handle = None
         
+        # How the model was loaded (strategy, load time, size), filled in by _load_model
+        self.metadata = {}
+        
+        # Serializes borrowing and releasing the model handle
+        self._load_lock = threading.Lock()
+        
+    @property
+    def legal_data(self):
+        """This category's records from the corpus store, or None if it has no data"""
+        return self.corpus.category(category_key(self.category))
+    
     def _load_model(self):
-        """Load the model and tokenizer if they haven't been loaded yet"""
-        if self.model is None or self.tokenizer is None:
-            with st.spinner(f"Loading {self.category} specialist model... This may take a moment."):
-                # Load model with lower precision for efficiency
-                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        """Borrow the model and tokenizer from the shared registry if not already held"""
+        # Concurrent reruns of the same session must not each borrow a handle
+        with self._load_lock:
+            if self.model is not None and self.tokenizer is not None:
+                return
+            
+            registry = get_model_registry()
+            if registry.is_loading(self.model_name):
+                message = f"Waiting for the {self.category} specialist model to finish warming up..."
+            else:
+                message = f"Loading {self.category} specialist model... This may take a moment."
+            
+            with st.spinner(message):
+                # Models are shared across sessions and categories by the registry;
+                # a load already in progress (e.g. warm-up) is awaited rather than repeated
+                handle = registry.acquire(self.model_name)
                 
-                # Use sequence-to-sequence model for T5 models
-                self.model = AutoModelForSeq2SeqLM.from_pretrained(
-                    self.model_name, 
-                    torch_dtype=torch.float16,
-                    device_map="auto",
-                    load_in_8bit=True
-                )
+                # Give the handle back when this agent is garbage collected
+                weakref.finalize(self, handle.release)
                 
-                # Create text generation pipeline
-                self.pipeline = pipeline(
-                    "text2text-generation",  # Use text2text-generation for seq2seq models
-                    model=self.model,
-                    tokenizer=self.tokenizer,
-                    max_length=self.config["max_length"],
-                    temperature=self.config["temperature"],
-                    top_p=self.config["top_p"]
-                )
+                self._model_handle = handle
+                self.metadata = dict(handle.metadata)
+                self.tokenizer = handle.tokenizer
+                self.model = handle.model
+    
+    def _generation_kwargs(self, config=None):
+        """
+        Build the generate() settings for a model configuration.
+        
+        Args:
+            config: A MODEL_CONFIG entry, defaults to this agent's configuration
+            
+        Returns:
+            dict: Keyword arguments for model.generate()
+        """
+        config = config or self.config
+        return {
+            "max_length": config["max_length"],
+            "temperature": config["temperature"],
+            "top_p": config["top_p"]
+        }
+    
+    def _select_config(self, deadline):
+        """
+        Pick the generation profile that fits in the time left before the deadline.
+        
+        Args:
+            deadline (float): time.monotonic() deadline for the request
+            
+        Returns:
+            tuple: (MODEL_CONFIG entry, whether it is a degraded fallback)
+        """
+        remaining = deadline - time.monotonic()
+        estimate = get_inference_worker().estimate_seconds(self.model, self.config["max_length"])
+        
+        # Without a latency estimate yet, max_time on the deadline is the only guard
+        if estimate is None or estimate <= remaining:
+            return self.config, False
+        
+        return MODEL_CONFIG[FALLBACK_MODEL_TYPE], self.config is not MODEL_CONFIG[FALLBACK_MODEL_TYPE]
+    
+    def release(self):
+        """Release this agent's model handle back to the shared registry"""
+        with self._load_lock:
+            if self._model_handle is not None:
+                self._model_handle.release()
+            self._model_handle = None
+            self.model = None
+            self.tokenizer = None
     
     def _preprocess_query(self, query, input_type="text"):
         """
@@ -149,26 +214,134 @@ class LegalAgent:
         # Default fallback
         return str(query)
     
-    def _format_prompt(self, preprocessed_query):
+    def _retrieve(self, preprocessed_query):
+        """
+        Find the acts and sections of this category most relevant to the query.
+        
+        Args:
+            preprocessed_query: The preprocessed query
+            
+        Returns:
+            list: Retrieved entries with scores, best first (empty on failure)
+        """
+        try:
+            return get_legal_index().search(
+                str(preprocessed_query), k=RETRIEVAL_TOP_K, category=category_key(self.category)
+            )
+        except Exception as e:
+            print(f"Error retrieving legal data: {e}")
+            return []
+    
+    def _format_prompt(self, preprocessed_query, retrieved=None):
         """
         Format the preprocessed query into a prompt for the model.
         
         Args:
             preprocessed_query: The preprocessed query
+            retrieved: Optional retrieved acts/sections to ground the answer in
             
         Returns:
             str: The formatted prompt
         """
+        # Ground the answer in the most relevant provisions, if any were found
+        grounding = ""
+        if retrieved:
+            lines = []
+            for entry in retrieved:
+                if entry.get("section"):
+                    lines.append(f"- {entry['act']} ({entry['year']}), Section {entry['section']}: {entry.get('content', '')}")
+                else:
+                    lines.append(f"- {entry['act']} ({entry['year']}): {entry['description']}")
+            grounding = "Relevant Bangladesh Law:\n" + "\n".join(lines) + "\n\n        "
+        
         # Create a prompt that includes the legal domain and Bangladesh context
         prompt = f"""You are an AI legal assistant specializing in {self.category} under Bangladesh law. 
         Provide accurate, helpful legal information based on Bangladesh's legal system.
         
-        User Query: {preprocessed_query}
+        {grounding}User Query: {preprocessed_query}
         
         Legal Analysis and Advice:"""
         
         return prompt
     
+    def _budget_prompt(self, preprocessed_query, retrieved=None):
+        """
+        Format the prompt so it fits the encoder's input window. The least
+        relevant grounding provisions are dropped first, then an oversized
+        query is cut to fit rather than letting the tokenizer drop the end of
+        the prompt, which holds the answer cue.
+        
+        Args:
+            preprocessed_query: The preprocessed query
+            retrieved: Optional retrieved acts/sections to ground the answer in
+            
+        Returns:
+            tuple: (prompt, token usage dict with input_tokens, grounding_dropped and truncated_tokens)
+        """
+        limit = max_input_tokens(self.tokenizer)
+        retrieved = list(retrieved or [])
+        prompt = self._format_prompt(preprocessed_query, retrieved)
+        tokens = count_tokens(self.tokenizer, prompt)
+        dropped = 0
+        truncated = 0
+        
+        # Retrieval returns the most relevant provisions first
+        while tokens > limit and retrieved:
+            retrieved.pop()
+            dropped += 1
+            prompt = self._format_prompt(preprocessed_query, retrieved)
+            tokens = count_tokens(self.tokenizer, prompt)
+        
+        if tokens > limit:
+            overhead = count_tokens(self.tokenizer, self._format_prompt("", retrieved))
+            query, truncated = truncate_tokens(self.tokenizer, str(preprocessed_query), max(limit - overhead, 0))
+            prompt = self._format_prompt(query, retrieved)
+            tokens = count_tokens(self.tokenizer, prompt)
+        
+        return prompt, {"input_tokens": tokens, "grounding_dropped": dropped, "truncated_tokens": truncated}
+    
+    def _condense_document(self, query, input_type, preprocessed_query, deadline):
+        """
+        Map step for documents longer than one chunk: summarize each chunk so
+        the synthesis prompt covers the whole document instead of its start.
+        Only as many chunks are summarized as their notes fit in the
+        synthesis prompt around the query scaffold.
+        
+        Args:
+            query: The original query (dict with 'text' for documents)
+            input_type: The type of input
+            preprocessed_query: The preprocessed query
+            deadline (float): time.monotonic() deadline for the request
+            
+        Returns:
+            tuple: (query to analyze, token usage dict)
+        """
+        if input_type != "image/document" or not isinstance(query, dict):
+            return preprocessed_query, {}
+        
+        analyzer = get_document_analyzer()
+        text = query.get("text", "")
+        if not analyzer.needs_condensing(self.tokenizer, text):
+            return preprocessed_query, {"document_tokens": count_tokens(self.tokenizer, text)}
+        
+        # The notes replace the document text inside this scaffold in the synthesis prompt
+        scaffold = self._format_prompt(self._preprocess_query(dict(query, text=""), input_type))
+        notes_window = max_input_tokens(self.tokenizer) - count_tokens(self.tokenizer, scaffold)
+        
+        with st.spinner("Reading the document section by section..."):
+            notes, usage = analyzer.condense(
+                text,
+                self.model,
+                self.tokenizer,
+                get_inference_worker(),
+                document_type=query.get("document_type") or "legal document",
+                deadline=deadline,
+                notes_window=notes_window,
+                synthesis_max_tokens=self.config["max_length"]
+            )
+        
+        return self._preprocess_query(dict(query, text=notes), input_type), usage
+    
     def _extract_citations(self, response):
         """
         Extract legal citations from the response.
@@ -177,27 +350,9 @@ class LegalAgent:
             response: The model's response
             
         Returns:
-            tuple: (response without citations, extracted citations)
+            tuple: (response without citation sentences, citation sentences, structured citations)
         """
-        # Simple implementation - in practice, this would use regex or NLP to identify citations
-        sentences = sent_tokenize(response)
-        citations = []
-        regular_text = []
-        
-        for sentence in sentences:
-            if any(citation_marker in sentence for citation_marker in ["Section", "Act", "Article", "Code", "vs.", "v."]):
-                citations.append(sentence)
-            else:
-                regular_text.append(sentence)
-        
-        # If no citations were found in the standard way, check for a "References:" section
-        if not citations and "References:" in response:
-            parts = response.split("References:")
-            if len(parts) > 1:
-                regular_text = [parts[0]]
-                citations = [f"References: {parts[1]}"]
-        
-        return " ".join(regular_text), "\n".join(citations) if citations else ""
+        return extract_citations(response, self.corpus)
     
     def _postprocess_response(self, raw_response):
         """
@@ -207,9 +362,9 @@ class LegalAgent:
             raw_response: The raw response from the model
             
         Returns:
-            dict: A dictionary with 'advice' and 'citations' keys
+            dict: A dictionary with 'advice', 'citations' and 'citation_spans' keys
         """
-        # Extract the generated text from the pipeline output
+        # Extract the generated text from the worker or pipeline output
         if isinstance(raw_response, list) and len(raw_response) > 0:
             if isinstance(raw_response[0], dict) and "generated_text" in raw_response[0]:
                 text = raw_response[0]["generated_text"]
@@ -223,90 +378,295 @@ class LegalAgent:
             text = text.split("Legal Analysis and Advice:")[-1]
         
         # Extract citations
-        advice, citations = self._extract_citations(text.strip())
+        advice, citations, citation_spans = self._extract_citations(text.strip())
         
         # Format the response
         return {
             "advice": advice.strip(),
-            "citations": citations.strip()
+            "citations": citations.strip(),
+            "citation_spans": citation_spans
         }
     
-    def _enhance_with_legal_data(self, response):
+    def _enhance_with_legal_data(self, response, retrieved=None):
         """
         Enhance the response with specific Bangladesh legal data if available.
         
         Args:
             response: The response dictionary
+            retrieved: Optional retrieved acts/sections, used to order the keyword-matched acts
             
         Returns:
             dict: The enhanced response
         """
+        legal_data = self.legal_data
+        
         # If we don't have legal data for this category, return as is
-        if not self.legal_data:
+        if legal_data is None:
             return response
         
         # If there are no citations, add some based on the legal data
-        if not response.get("citations") and self.legal_data.get("acts"):
-            relevant_acts = []
+        if not response.get("citations") and legal_data.acts:
+            # One pass over the advice, acts ranked by keyword score. Only acts the advice
+            # matches are cited: the index returns its top k for any query, related or not
+            relevant_acts = [match.act for match in legal_data.keyword_index.match(response["advice"])]
             
-            # Simple keyword matching to find relevant acts
-            for act in self.legal_data.get("acts", []):
-                # Check if keywords from the act appear in the response
-                if any(keyword.lower() in response["advice"].lower() for keyword in act.get("keywords", [])):
-                    relevant_acts.append(act)
+            if retrieved:
+                # Matched acts that were also retrieved go first, in retrieval order
+                matched = {act.name: act for act in relevant_acts}
+                ranked = []
+                for entry in retrieved:
+                    act = matched.pop(entry["act"], None)
+                    if act is not None:
+                        ranked.append(act)
+                relevant_acts = ranked + [act for act in relevant_acts if act.name in matched]
             
             # Add citations for relevant acts
             if relevant_acts:
                 citations = ["Relevant Bangladesh Laws and Regulations:"]
                 for act in relevant_acts[:3]:  # Limit to 3 most relevant
-                    citations.append(f"- {act['name']} ({act['year']}): {act.get('description', '')}")
+                    citations.append(f"- {act.name} ({act.year}): {act.description}")
                 response["citations"] = "\n".join(citations)
         
         return response
     
-    def process_query(self, query, input_type="text"):
+    def process_query(self, query, input_type="text", latency_budget=None):
         """
         Process a user query and generate a legal response.
         
         Args:
             query: The user query (text string or dict for document input)
             input_type: The type of input ('text', 'audio', or 'image')
+            latency_budget: Seconds allowed for this request, defaults to LATENCY_BUDGET_SECONDS
             
         Returns:
-            dict: A dictionary with the response including advice and citations
+            dict: A dictionary with the response including advice and citations,
+                and 'degraded' set when the latency budget forced a shorter answer
         """
-        # Ensure the model is loaded
-        self._load_model()
+        deadline = time.monotonic() + (latency_budget or self.latency_budget)
+        
+        # Pick up edits to the legal data files
+        self.corpus.refresh()
         
         # Preprocess the query based on input type
         preprocessed_query = self._preprocess_query(query, input_type)
         
-        # Format the prompt for the model
-        prompt = self._format_prompt(preprocessed_query)
+        # Repeated questions are answered from the cache without touching the model
+        cached = self._lookup_cached(preprocessed_query)
+        if cached is not None:
+            return cached
+        
+        # Ensure the model is loaded
+        self._load_model()
         
         # Generate the response
         with st.spinner("Analyzing and generating legal advice..."):
-            # Introduce a small delay to simulate deep thinking
-            time.sleep(1)
-            
             try:
-                raw_response = self.pipeline(prompt)
-                response = self._postprocess_response(raw_response)
-                enhanced_response = self._enhance_with_legal_data(response)
-                return enhanced_response
+                # Long documents are condensed chunk by chunk before the final analysis
+                analysis_query, token_usage = self._condense_document(query, input_type, preprocessed_query, deadline)
+                
+                # Retrieve relevant provisions before generation to ground the prompt
+                retrieved = self._retrieve(analysis_query)
+                
+                # Format the prompt for the model within its input window
+                prompt, token_usage["synthesis"] = self._budget_prompt(analysis_query, retrieved)
+                
+                # Fall back to a shorter profile if the full one would miss the deadline
+                config, degraded = self._select_config(deadline)
+                
+                # Generation is batched with other sessions' prompts by the shared worker
+                future = get_inference_worker().submit(
+                    self.model, self.tokenizer, prompt, deadline=deadline, **self._generation_kwargs(config)
+                )
+                raw_response = future.result()
+                token_usage["synthesis"]["output_tokens"] = count_tokens(self.tokenizer, raw_response)
+                
+                # Hitting the deadline means generation was cut short by max_time
+                degraded = degraded or time.monotonic() >= deadline
+                
+                return self._finalize_response(raw_response, degraded, retrieved, preprocessed_query, token_usage)
             except Exception as e:
                 st.error(f"Error generating response: {str(e)}")
                 # Fallback response
                 return {
-                    "advice": "I apologize, but I encountered an issue while analyzing your query. Please try again or rephrase your question.",
-                    "citations": ""
+                    "advice": FALLBACK_ADVICE,
+                    "citations": "",
+                    "degraded": False
                 }
+    
+    def _cache_scope(self):
+        """Everything besides the query that determines an answer"""
+        return (self.category, self.model_name, self.model_type, self.corpus.version)
+    
+    def _lookup_cached(self, preprocessed_query):
+        """
+        Look the query up in the exact-match cache, then the semantic cache.
+        
+        Args:
+            preprocessed_query: The preprocessed query
+            
+        Returns:
+            dict: A cached response, or None on a miss
+        """
+        cached = get_response_cache().get(make_cache_key(preprocessed_query, *self._cache_scope()))
+        if cached is not None:
+            return cached
+        
+        semantic_cache = get_semantic_cache()
+        if semantic_cache is not None:
+            return semantic_cache.lookup(preprocessed_query, self._cache_scope())
+        return None
+    
+    def _finalize_response(self, raw_response, degraded=False, retrieved=None, cache_query=None, token_usage=None):
+        """
+        Turn generated text into the final response dictionary.
+        
+        Args:
+            raw_response: The generated text or pipeline output
+            degraded (bool): Whether the latency budget shortened the answer
+            retrieved: Retrieved acts/sections used to rank citations
+            cache_query: Preprocessed query to cache the result under
+            token_usage (dict): Token counts per stage, reported as 'token_usage'
+            
+        Returns:
+            dict: The post-processed response with citations and legal data
+        """
+        response = self._postprocess_response(raw_response)
+        enhanced_response = self._enhance_with_legal_data(response, retrieved)
+        enhanced_response["degraded"] = degraded
+        if token_usage is not None:
+            enhanced_response["token_usage"] = token_usage
+        
+        # Shortened answers are not cached so a later request can get the full one
+        if cache_query is not None and not degraded:
+            get_response_cache().put(make_cache_key(cache_query, *self._cache_scope()), enhanced_response)
+            
+            semantic_cache = get_semantic_cache()
+            if semantic_cache is not None:
+                semantic_cache.add(cache_query, self._cache_scope(), enhanced_response)
+        
+        return enhanced_response
+    
+    def stream_query(self, query, input_type="text", latency_budget=None):
+        """
+        Process a user query, yielding the advice text as it is generated.
+        
+        Generation runs on the inference worker. Citation extraction and legal
+        data enhancement run once on the final text, which is available as
+        the stream's `response` after iteration finishes.
+        
+        Args:
+            query: The user query (text string or dict for document input)
+            input_type: The type of input ('text', 'audio', or 'image')
+            latency_budget: Seconds allowed for this request, defaults to LATENCY_BUDGET_SECONDS
+            
+        Returns:
+            ResponseStream: An iterable of generated text chunks
+        """
+        deadline = time.monotonic() + (latency_budget or self.latency_budget)
+        
+        # Pick up edits to the legal data files
+        self.corpus.refresh()
+        
+        preprocessed_query = self._preprocess_query(query, input_type)
+        
+        # Repeated questions are answered from the cache without touching the model
+        cached = self._lookup_cached(preprocessed_query)
+        if cached is not None:
+            return CachedResponseStream(cached)
+        
+        try:
+            # Ensure the model is loaded
+            self._load_model()
+            
+            analysis_query, token_usage = self._condense_document(query, input_type, preprocessed_query, deadline)
+            retrieved = self._retrieve(analysis_query)
+            prompt, token_usage["synthesis"] = self._budget_prompt(analysis_query, retrieved)
+            config, degraded = self._select_config(deadline)
+            
+            # Generation is queued on the shared worker like process_query's, so it is
+            # batched with other sessions' requests for the model and timed
+            streamer = transformers.TextIteratorStreamer(
+                self.tokenizer,
+                skip_prompt=True,
+                skip_special_tokens=True,
+                timeout=max(deadline - time.monotonic(), 0) + STREAM_STALL_SECONDS
+            )
+            future = get_inference_worker().submit(
+                self.model, self.tokenizer, prompt, deadline=deadline, streamer=streamer, **self._generation_kwargs(config)
+            )
+            return ResponseStream(self, streamer, future, deadline, degraded, retrieved, preprocessed_query, token_usage)
+        except Exception as e:
+            st.error(f"Error generating response: {str(e)}")
+            # Fallback response
+            return CachedResponseStream({
+                "advice": FALLBACK_ADVICE,
+                "citations": "",
+                "degraded": False
+            })
+
+
+class ResponseStream:
+    """
+    Iterable over the text chunks of a streaming LegalAgent response.
+    Once iteration completes, `response` holds the final response dictionary.
+    """
+    
+    def __init__(self, agent, streamer, future, deadline, degraded, retrieved=None, cache_query=None, token_usage=None):
+        self.agent = agent
+        self.streamer = streamer
+        self.future = future
+        self.deadline = deadline
+        self.degraded = degraded
+        self.retrieved = retrieved
+        self.cache_query = cache_query
+        self.token_usage = token_usage
+        self.response = None
+    
+    def __iter__(self):
+        chunks = []
+        try:
+            for chunk in self.streamer:
+                chunks.append(chunk)
+                yield chunk
+        except queue.Empty:
+            # The worker stopped producing tokens; do not hold the page forever
+            self.future.cancel()
+            st.error("Error generating response: the model stopped responding")
+            self.response = {"advice": FALLBACK_ADVICE, "citations": "", "degraded": False}
+            return
+        
+        error = self.future.exception()
+        if error is not None:
+            st.error(f"Error generating response: {str(error)}")
+            self.response = {"advice": FALLBACK_ADVICE, "citations": "", "degraded": False}
+            return
+        
+        text = "".join(chunks)
+        if self.token_usage is not None:
+            self.token_usage["synthesis"]["output_tokens"] = count_tokens(self.agent.tokenizer, text)
+        
+        # Hitting the deadline means generation was cut short by max_time
+        degraded = self.degraded or time.monotonic() >= self.deadline
+        self.response = self.agent._finalize_response(text, degraded, self.retrieved, self.cache_query, self.token_usage)
+
+
+class CachedResponseStream:
+    """
+    ResponseStream stand-in for a cache hit: yields the stored advice at once.
+    """
+    
+    def __init__(self, response):
+        self.response = response
+    
+    def __iter__(self):
+        yield self.response["advice"]
 
 
 def get_legal_agent(category):
     """
     Factory function to get or create a legal agent for the specified category.
-    Caches agents to avoid reloading models unnecessarily.
+    Agents are cached per session; the model weights themselves are shared
+    process-wide through the model registry.
     
     Args:
         category (str): The legal domain/category
@@ -315,7 +675,7 @@ def get_legal_agent(category):
         LegalAgent: An instance of LegalAgent for the specified category
     """
     # Check if we already have this agent in session state
-    agent_key = f"legal_agent_{category.lower().replace(' & ', '_').replace(' ', '_')}"
+    agent_key = f"legal_agent_{category_key(category)}"
     
     if agent_key not in st.session_state:
         # Create a new agent
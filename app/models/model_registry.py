@@ -0,0 +1,308 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from app.models.hardware import configure_threads, find_strategy, select_load_strategy
+from app.models.model_store import ModelNotAvailableError, resolve_model
+from app.models.onnx_backend import export_size_bytes, load_onnx_model_and_tokenizer
+from app.utils.env_loader import read_environment
+from app.utils.lazy_import import lazy_import
+
+transformers = lazy_import("transformers")
+
+
+def load_model_and_tokenizer(model_name, dtype, device):
+    """
+    Load a seq2seq model and its tokenizer using the matching load strategy.
+
+    Args:
+        model_name (str): The Hugging Face model identifier
+        dtype (str): Weight dtype of the strategy (see LoadStrategy.weight_dtype)
+        device (str): Device of the strategy
+
+    Returns:
+        tuple: (model, tokenizer)
+    """
+    strategy = find_strategy(device, dtype)
+    configure_threads()
+
+    if strategy.runtime == "onnxruntime":
+        return load_onnx_model_and_tokenizer(model_name)
+
+    # Always load from the local model cache so requests never wait on the Hub
+    path = resolve_model(model_name)
+    tokenizer = transformers.AutoTokenizer.from_pretrained(path, local_files_only=True)
+
+    # Use sequence-to-sequence model for T5 models
+    model = transformers.AutoModelForSeq2SeqLM.from_pretrained(path, local_files_only=True, **strategy.from_pretrained_kwargs())
+
+    return strategy.prepare(model), tokenizer
+
+
+# Load errors that retrying cannot fix: a missing model or an unknown strategy
+PERMANENT_LOAD_ERRORS = (ModelNotAvailableError, ValueError)
+
+
+def estimate_model_bytes(model):
+    """
+    Estimate how much memory a loaded model occupies.
+
+    Args:
+        model: A loaded transformers model
+
+    Returns:
+        int: Approximate size in bytes of the parameters and buffers
+    """
+    if hasattr(model, "get_memory_footprint"):
+        return int(model.get_memory_footprint())
+
+    # ONNX Runtime models hold their weights in the exported graphs
+    if hasattr(model, "model_save_dir"):
+        return export_size_bytes(str(model.model_save_dir))
+
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ModelHandle:
+    """
+    A borrowed reference to a model owned by the ModelRegistry.
+    The model stays resident while at least one handle is unreleased.
+    """
+
+    def __init__(self, registry, key, model, tokenizer, metadata):
+        self.registry = registry
+        self.key = key
+        self.model = model
+        self.tokenizer = tokenizer
+        self.metadata = metadata
+        self.released = False
+
+    def release(self):
+        """Return the handle to the registry. Safe to call more than once."""
+        self.registry.release(self)
+
+
+class _RegistryEntry:
+    __slots__ = ("model", "tokenizer", "size_bytes", "refcount", "metadata")
+
+    def __init__(self, model, tokenizer, size_bytes, metadata):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.size_bytes = size_bytes
+        self.refcount = 0
+        self.metadata = metadata
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models shared by every session and category.
+
+    Models are keyed by (model name, dtype, device) and reference counted.
+    Models with no outstanding handles are kept around for reuse and evicted
+    least-recently-used first once the memory budget is exceeded. Each model
+    is loaded at most once at a time: concurrent callers (including warm-up)
+    wait on the same load future.
+    """
+
+    def __init__(self, memory_budget_bytes=0, loader=load_model_and_tokenizer, load_retries=0, retry_backoff_seconds=1.0):
+        """
+        Initialize an empty registry.
+
+        Args:
+            memory_budget_bytes (int): Memory budget for resident models, 0 for unlimited
+            loader (callable): Function (model_name, weight dtype, device) -> (model, tokenizer)
+            load_retries (int): Extra attempts after a failed load
+            retry_backoff_seconds (float): Delay before the first retry, doubled for each further one
+        """
+        self.memory_budget_bytes = memory_budget_bytes
+        self.loader = loader
+        self.load_retries = load_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.RLock()
+
+    def load(self, model_name, strategy=None):
+        """
+        Make sure a model is resident without borrowing it.
+
+        Args:
+            model_name (str): The Hugging Face model identifier
+            strategy (LoadStrategy): How to load the weights, defaults to select_load_strategy()
+
+        Returns:
+            Future: Resolves once the model is loaded, or with the load error
+        """
+        strategy = strategy or select_load_strategy()
+        key = (model_name, strategy.weight_dtype, strategy.device)
+
+        with self._lock:
+            if key in self._entries:
+                future = Future()
+                future.set_result(key)
+                return future
+
+            future = self._loading.get(key)
+            if future is not None:
+                # Someone else is already loading this model; share their result
+                return future
+
+            future = self._loading[key] = Future()
+
+        # Load outside the lock so other models stay available meanwhile
+        try:
+            started = time.monotonic()
+            model, tokenizer = self._load_with_retries(model_name, strategy)
+            size_bytes = estimate_model_bytes(model)
+            metadata = {
+                "load_strategy": strategy.to_dict(),
+                "load_seconds": round(time.monotonic() - started, 3),
+                "size_bytes": size_bytes,
+            }
+        except Exception as e:
+            # Every waiter sees the same error; the next call starts a fresh load
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            return future
+
+        with self._lock:
+            self._entries[key] = _RegistryEntry(model, tokenizer, size_bytes, metadata)
+            del self._loading[key]
+        future.set_result(key)
+        return future
+
+    def _load_with_retries(self, model_name, strategy):
+        """Run the loader, retrying transient failures with exponential backoff"""
+        delay = self.retry_backoff_seconds
+        for attempt in range(self.load_retries + 1):
+            try:
+                return self.loader(model_name, strategy.weight_dtype, strategy.device)
+            except PERMANENT_LOAD_ERRORS:
+                raise
+            except Exception as e:
+                if attempt == self.load_retries:
+                    raise
+                print(f"Loading {model_name} failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay *= 2
+
+    def is_loading(self, model_name, strategy=None):
+        """
+        Returns:
+            bool: True while a load of the model is in progress
+        """
+        strategy = strategy or select_load_strategy()
+        with self._lock:
+            return (model_name, strategy.weight_dtype, strategy.device) in self._loading
+
+    def acquire(self, model_name, strategy=None):
+        """
+        Borrow a handle to the requested model, loading it if necessary.
+
+        Args:
+            model_name (str): The Hugging Face model identifier
+            strategy (LoadStrategy): How to load the weights, defaults to select_load_strategy()
+
+        Returns:
+            ModelHandle: A handle that must be released when no longer needed
+        """
+        strategy = strategy or select_load_strategy()
+
+        while True:
+            key = self.load(model_name, strategy).result()
+
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    # Evicted between loading and borrowing; load it again
+                    continue
+
+                # Mark as most recently used
+                self._entries.move_to_end(key)
+                entry.refcount += 1
+
+                self._evict_if_needed()
+                return ModelHandle(self, key, entry.model, entry.tokenizer, entry.metadata)
+
+    def release(self, handle):
+        """
+        Return a borrowed handle to the registry.
+
+        Args:
+            handle (ModelHandle): The handle obtained from acquire()
+        """
+        with self._lock:
+            if handle.released:
+                return
+            handle.released = True
+
+            entry = self._entries.get(handle.key)
+            if entry is not None:
+                entry.refcount = max(0, entry.refcount - 1)
+
+            self._evict_if_needed()
+
+    def _evict_if_needed(self):
+        """Evict idle models, least recently used first, until within budget."""
+        if not self.memory_budget_bytes:
+            return
+
+        for key in list(self._entries.keys()):
+            if self.resident_bytes() <= self.memory_budget_bytes:
+                return
+            if self._entries[key].refcount == 0:
+                del self._entries[key]
+
+        if self.resident_bytes() > self.memory_budget_bytes:
+            print("Model registry is over its memory budget but all resident models are in use")
+
+    def resident_bytes(self):
+        """
+        Returns:
+            int: Total estimated size of the resident models in bytes
+        """
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values())
+
+    def stats(self):
+        """
+        Returns:
+            dict: Per-model reference counts and sizes, keyed by "name|dtype|device"
+        """
+        with self._lock:
+            return {
+                "|".join(key): {
+                    "refcount": entry.refcount,
+                    "size_bytes": entry.size_bytes,
+                    "load_strategy": entry.metadata["load_strategy"]["name"],
+                    "load_seconds": entry.metadata["load_seconds"],
+                }
+                for key, entry in self._entries.items()
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """
+    Get the process-wide model registry, creating it on first use.
+
+    Returns:
+        ModelRegistry: The shared registry
+    """
+    global _registry
+
+    with _registry_lock:
+        if _registry is None:
+            env = read_environment()
+            _registry = ModelRegistry(
+                memory_budget_bytes=env["MODEL_MEMORY_BUDGET_MB"] * 1024 * 1024,
+                load_retries=env["MODEL_LOAD_RETRIES"],
+                retry_backoff_seconds=env["MODEL_LOAD_BACKOFF_SECONDS"]
+            )
+        return _registry
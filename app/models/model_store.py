@@ -0,0 +1,318 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Future
+
+from app.utils.env_loader import read_environment
+
+# Written next to each prefetched model: source revision and per-file sha256
+MANIFEST_FILE = "manifest.json"
+
+# Weight formats this app never loads; skipping them keeps the cache small
+IGNORE_PATTERNS = ["*.h5", "*.msgpack", "*.ot", "*.tflite", "onnx/*", "coreml/*", "openvino/*"]
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+class ModelNotAvailableError(RuntimeError):
+    """A model is missing or corrupt in the local cache and downloading is not allowed."""
+
+
+def local_model_path(model_name, cache_dir=None):
+    """
+    Args:
+        model_name (str): The Hugging Face model identifier
+        cache_dir (str): Cache root, defaults to MODEL_CACHE_DIR
+
+    Returns:
+        str: Directory the model's files are stored in
+    """
+    cache_dir = cache_dir or read_environment()["MODEL_CACHE_DIR"]
+    return os.path.join(cache_dir, model_name.replace("/", "--"))
+
+
+def required_models():
+    """
+    Returns:
+        list: Every model the application loads in its current configuration, without duplicates
+    """
+    from app.models.legal_agent import DEFAULT_MODEL, LEGAL_MODELS
+    from app.models.retrieval import index_embedder_name
+    from app.models.speech import SPEECH_MODEL
+
+    names = list(LEGAL_MODELS.values()) + [DEFAULT_MODEL]
+
+    # Retrieval only loads a model when its index was built with one, not the hashing embedder
+    embedder = index_embedder_name()
+    if not embedder.startswith("hashing-"):
+        names.append(embedder)
+
+    # Only the Whisper backend loads a Hugging Face model; Vosk models are unpacked by hand
+    env = read_environment()
+    if env["ENABLE_AUDIO_TRANSCRIPTION"] and env["STT_BACKEND"].lower() == "whisper":
+        names.append(env["SPEECH_MODEL"] or SPEECH_MODEL)
+    return list(dict.fromkeys(names))
+
+
+def sha256_file(path):
+    """Hex sha256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(path):
+    """
+    Returns:
+        dict: The model directory's manifest, or None if it was never completed
+    """
+    try:
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def verify_model(path, manifest=None, full=True):
+    """
+    Check a model directory against its manifest.
+
+    Args:
+        path (str): The model directory
+        manifest (dict): Manifest to check against, read from disk if omitted
+        full (bool): Compare sha256 digests, not just file sizes
+
+    Returns:
+        list: Relative paths of missing or corrupt files (empty when intact)
+    """
+    manifest = manifest or read_manifest(path)
+    if manifest is None:
+        return [MANIFEST_FILE]
+
+    problems = []
+    for name, expected in manifest["files"].items():
+        file_path = os.path.join(path, name)
+        if not os.path.isfile(file_path) or os.path.getsize(file_path) != expected["size"]:
+            problems.append(name)
+        elif full and sha256_file(file_path) != expected["sha256"]:
+            problems.append(name)
+    return problems
+
+
+def prefetch(model_name, cache_dir=None, revision=None, token=None):
+    """
+    Download a model into the local cache and record its checksums.
+
+    Args:
+        model_name (str): The Hugging Face model identifier
+        cache_dir (str): Cache root, defaults to MODEL_CACHE_DIR
+        revision (str): Branch, tag or commit to download, defaults to main
+        token (str): Hugging Face token for gated models
+
+    Returns:
+        str: The local model directory
+    """
+    from huggingface_hub import HfApi, snapshot_download
+
+    path = local_model_path(model_name, cache_dir)
+    token = token or read_environment()["HUGGINGFACE_API_TOKEN"] or None
+
+    # Remove the old manifest first so an interrupted download is never trusted
+    if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        os.remove(os.path.join(path, MANIFEST_FILE))
+
+    snapshot_download(
+        repo_id=model_name,
+        revision=revision,
+        local_dir=path,
+        local_dir_use_symlinks=False,
+        ignore_patterns=IGNORE_PATTERNS,
+        token=token
+    )
+
+    files = {}
+    for root, dirs, names in os.walk(path):
+        # snapshot_download keeps its own bookkeeping in .huggingface / .cache
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in names:
+            file_path = os.path.join(root, name)
+            relative = os.path.relpath(file_path, path).replace(os.sep, "/")
+            files[relative] = {"size": os.path.getsize(file_path), "sha256": sha256_file(file_path)}
+
+    manifest = {
+        "model": model_name,
+        "revision": HfApi().model_info(model_name, revision=revision, token=token).sha,
+        "files": files,
+    }
+    with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return path
+
+
+def missing_models(names=None, cache_dir=None):
+    """
+    Cheap startup check that only looks for completed manifests.
+
+    Args:
+        names (list): Models to check, defaults to required_models()
+        cache_dir (str): Cache root, defaults to MODEL_CACHE_DIR
+
+    Returns:
+        list: Names of models that have not been prefetched
+    """
+    names = names or required_models()
+    return [name for name in names if read_manifest(local_model_path(name, cache_dir)) is None]
+
+
+_all_present = False
+_all_present_lock = threading.Lock()
+
+
+def startup_missing_models():
+    """
+    missing_models() for the page's startup check, without re-reading every
+    manifest on each rerun: once all models are present that is remembered
+    for the process, until a load finds a model missing or corrupt.
+
+    Returns:
+        list: Names of models that have not been prefetched
+    """
+    global _all_present
+
+    with _all_present_lock:
+        if _all_present:
+            return []
+    missing = missing_models()
+    if not missing:
+        with _all_present_lock:
+            _all_present = True
+    return missing
+
+
+_verified = set()
+_verifying = {}
+_verify_lock = threading.Lock()
+
+
+def resolve_model(model_name):
+    """
+    Map a model identifier to its local directory, never touching the network
+    when USE_LOCAL_MODELS is set. Checksums are verified once per process.
+    Each directory is verified (or downloaded) by one caller at a time;
+    concurrent callers for the same model wait on its result, while other
+    models are resolved in parallel.
+
+    Args:
+        model_name (str): The Hugging Face model identifier
+
+    Returns:
+        str: Local directory to pass to from_pretrained()
+
+    Raises:
+        ModelNotAvailableError: If the model is missing or corrupt and may not be downloaded
+    """
+    env = read_environment()
+    path = local_model_path(model_name, env["MODEL_CACHE_DIR"])
+
+    with _verify_lock:
+        if path in _verified:
+            return path
+
+        future = _verifying.get(path)
+        if future is not None:
+            owner = False
+        else:
+            future = _verifying[path] = Future()
+            owner = True
+
+    if not owner:
+        # Someone else is already verifying this model; share their result
+        return future.result()
+
+    # Hash and download outside the lock so other models are not held up
+    try:
+        _verify_or_fetch(model_name, path, env)
+    except Exception as e:
+        if isinstance(e, ModelNotAvailableError):
+            _recheck_models()
+        with _verify_lock:
+            del _verifying[path]
+        future.set_exception(e)
+        raise
+
+    with _verify_lock:
+        _verified.add(path)
+        del _verifying[path]
+    future.set_result(path)
+    return path
+
+
+def _recheck_models():
+    """Make the next startup_missing_models() call check the cache again"""
+    global _all_present
+
+    with _all_present_lock:
+        _all_present = False
+
+
+def _verify_or_fetch(model_name, path, env):
+    """Check a model directory against its manifest, downloading it if that is allowed"""
+    manifest = read_manifest(path)
+    if manifest is not None:
+        problems = verify_model(path, manifest, full=env["MODEL_VERIFY_CHECKSUMS"])
+        if not problems:
+            return
+        reason = f"failed checksum verification ({', '.join(problems[:3])})"
+    else:
+        reason = "is not in the local model cache"
+
+    if env["USE_LOCAL_MODELS"]:
+        raise ModelNotAvailableError(
+            f"Model '{model_name}' {reason} at {path}. "
+            f"Run 'python -m app.models.model_store prefetch' with network access, "
+            f"or set USE_LOCAL_MODELS=False to allow downloading."
+        )
+
+    print(f"Model '{model_name}' {reason}; downloading to {path}")
+    prefetch(model_name, env["MODEL_CACHE_DIR"])
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Manage the local model cache in MODEL_CACHE_DIR")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prefetch_parser = subparsers.add_parser("prefetch", help="Download models for offline use")
+    prefetch_parser.add_argument("models", nargs="*", help="Models to fetch (default: every model the app uses)")
+    prefetch_parser.add_argument("--revision", help="Branch, tag or commit to download")
+    prefetch_parser.add_argument("--force", action="store_true", help="Download even if the cached copy is intact")
+
+    verify_parser = subparsers.add_parser("verify", help="Check cached models against their checksums")
+    verify_parser.add_argument("models", nargs="*", help="Models to verify (default: every model the app uses)")
+
+    args = parser.parse_args()
+    ok = True
+
+    for name in args.models or required_models():
+        model_path = local_model_path(name)
+
+        if args.command == "prefetch":
+            if args.force or verify_model(model_path):
+                print(f"Fetching {name}...")
+                prefetch(name, revision=args.revision)
+            print(f"✓ {name}: {model_path}")
+        else:
+            problems = verify_model(model_path)
+            if problems:
+                ok = False
+                print(f"✗ {name}: {', '.join(problems)}")
+            else:
+                print(f"✓ {name}")
+
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,132 @@
+import os
+import threading
+
+from app.utils.env_loader import read_environment
+
+# Subdirectory of MODEL_CACHE_DIR holding exported graphs, one folder per model
+ONNX_EXPORT_DIR = "onnx"
+
+_export_lock = threading.Lock()
+
+
+def onnx_export_path(model_name, cache_dir=None):
+    """
+    Args:
+        model_name (str): The Hugging Face model identifier
+        cache_dir (str): Cache root, defaults to MODEL_CACHE_DIR
+
+    Returns:
+        str: Directory the model's ONNX export lives in
+    """
+    cache_dir = cache_dir or read_environment()["MODEL_CACHE_DIR"]
+    return os.path.join(cache_dir, ONNX_EXPORT_DIR, model_name.replace("/", "--"))
+
+
+def is_exported(path):
+    """
+    Returns:
+        bool: True if path holds a complete encoder/decoder export
+    """
+    names = ("config.json", "encoder_model.onnx", "decoder_model.onnx", "decoder_with_past_model.onnx")
+    return all(os.path.exists(os.path.join(path, name)) for name in names)
+
+
+def session_options():
+    """
+    Returns:
+        onnxruntime.SessionOptions: All graph optimizations on, MODEL_NUM_THREADS intra-op threads
+    """
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    num_threads = read_environment()["MODEL_NUM_THREADS"]
+    if num_threads:
+        options.intra_op_num_threads = num_threads
+    return options
+
+
+def export_model(model_name, path):
+    """
+    Export the encoder, the first-step decoder and the decoder with KV cache to ONNX.
+
+    Args:
+        model_name (str): The Hugging Face model identifier
+        path (str): Output directory
+
+    Returns:
+        str: The output directory
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+
+    from app.models.model_store import resolve_model
+
+    # Export from the local model cache rather than the Hub
+    source = resolve_model(model_name)
+    model = ORTModelForSeq2SeqLM.from_pretrained(source, export=True, use_cache=True, local_files_only=True)
+    model.save_pretrained(path)
+    AutoTokenizer.from_pretrained(source, local_files_only=True).save_pretrained(path)
+    return path
+
+
+def load_onnx_model_and_tokenizer(model_name, cache_dir=None):
+    """
+    Load a seq2seq model as ONNX Runtime sessions, exporting it on first use.
+
+    The returned model exposes the transformers generate() API (greedy or
+    sampled decoding, streamers, max_time), so the inference worker and
+    streaming path use it exactly like the torch model.
+
+    Args:
+        model_name (str): The Hugging Face model identifier
+        cache_dir (str): Cache root, defaults to MODEL_CACHE_DIR
+
+    Returns:
+        tuple: (model, tokenizer)
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+
+    path = onnx_export_path(model_name, cache_dir)
+
+    with _export_lock:
+        if not is_exported(path):
+            print(f"Exporting {model_name} to ONNX in {path}")
+            export_model(model_name, path)
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        path,
+        use_cache=True,
+        provider="CPUExecutionProvider",
+        session_options=session_options()
+    )
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    return model, tokenizer
+
+
+def export_size_bytes(path):
+    """
+    Returns:
+        int: Total size of the .onnx graphs and external weight files under path
+    """
+    total = 0
+    for name in os.listdir(path):
+        if name.endswith((".onnx", ".onnx_data")):
+            total += os.path.getsize(os.path.join(path, name))
+    return total
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export models to ONNX under MODEL_CACHE_DIR")
+    parser.add_argument("models", nargs="*", default=["google/flan-t5-small"], help="Models to export")
+    parser.add_argument("--force", action="store_true", help="Re-export even if an export exists")
+    args = parser.parse_args()
+
+    for name in args.models:
+        output = onnx_export_path(name)
+        if args.force or not is_exported(output):
+            export_model(name, output)
+        print(f"{name}: {output} ({export_size_bytes(output) / (1024 * 1024):.1f} MB)")
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.utils.env_loader import read_environment
+
+
+def normalize_query(query):
+    """Normalize a preprocessed query so trivially different spellings share a key"""
+    return " ".join(str(query).lower().split())
+
+
+def make_cache_key(query, category, model_name, profile, corpus_version):
+    """
+    Build the cache key for a response.
+
+    Args:
+        query: The preprocessed query
+        category (str): The legal category
+        model_name (str): The generating model
+        profile (str): The MODEL_CONFIG profile name
+        corpus_version (str): Version of the legal corpus the answer was grounded in
+
+    Returns:
+        str: Hex digest identifying the response
+    """
+    parts = [normalize_query(query), category, model_name, profile, corpus_version]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache of final post-processed responses: an in-memory LRU in
+    front of an on-disk SQLite store shared by every worker on the host.
+    Entries expire after ttl_seconds and each tier is bounded in size.
+    """
+
+    def __init__(self, path=None, ttl_seconds=86400, memory_entries=512, disk_entries=10000):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str): SQLite file for the disk tier, or None for memory only
+            ttl_seconds (float): Time to live for entries
+            memory_entries (int): Maximum entries in the memory tier
+            disk_entries (int): Maximum entries in the disk tier
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def get(self, key):
+        """
+        Look up a response.
+
+        Args:
+            key (str): Key from make_cache_key()
+
+        Returns:
+            dict: A copy of the cached response, or None on a miss
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if now - created <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return dict(value)
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value, created = json.loads(row[0]), row[1]
+                    if now - created <= self.ttl_seconds:
+                        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                        self._remember(key, created, value)
+                        self.stats["disk_hits"] += 1
+                        return dict(value)
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, response):
+        """
+        Store a response in both tiers.
+
+        Args:
+            key (str): Key from make_cache_key()
+            response (dict): The final response dictionary
+        """
+        now = time.time()
+        value = dict(response)
+
+        with self._lock:
+            self._remember(key, now, value)
+            self.stats["stores"] += 1
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), now, now)
+                )
+                self._evict_disk(now)
+
+    def _remember(self, key, created, value):
+        """Insert into the memory tier, evicting least recently used entries"""
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self, now):
+        """Drop expired disk entries, then the least recently used beyond the size bound"""
+        self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.disk_entries:
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (count - self.disk_entries,)
+            )
+            self.stats["evictions"] += count - self.disk_entries
+
+    def clear(self):
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Get the process-wide response cache, creating it on first use.
+
+    Returns:
+        ResponseCache: The shared cache
+    """
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            env = read_environment()
+            _cache = ResponseCache(
+                path=env["RESPONSE_CACHE_PATH"] or None,
+                ttl_seconds=env["RESPONSE_CACHE_TTL_SECONDS"],
+                memory_entries=env["RESPONSE_CACHE_MEMORY_ENTRIES"],
+                disk_entries=env["RESPONSE_CACHE_DISK_ENTRIES"]
+            )
+        return _cache
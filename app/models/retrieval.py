@@ -0,0 +1,386 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from app.models.corpus_store import DATA_DIR, CorpusStore, get_corpus_store
+from app.utils.env_loader import read_environment
+
+# Embedding model for legal documents (BGE uses CLS pooling and a query instruction)
+DOCUMENT_MODEL = "BAAI/bge-small-en-v1.5"
+BGE_QUERY_INSTRUCTION = "Represent this sentence for searching relevant passages: "
+
+# Where the prebuilt index is written
+INDEX_DIR = os.path.join("app", "data", "index")
+INDEX_MATRIX_FILE = "legal_index.npy"
+INDEX_METADATA_FILE = "legal_index.json"
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """
+    Deterministic feature-hashing embedder over word unigrams and bigrams.
+    Needs no model download, which makes it suitable for tests and as a
+    lightweight fallback.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _embed_one(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+        for feature in features:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % self.dim] += sign
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts):
+        """
+        Args:
+            texts (list): Document strings
+
+        Returns:
+            np.ndarray: L2-normalized float32 matrix of shape (len(texts), dim)
+        """
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._embed_one(text) for text in texts])
+
+    def embed_query(self, text):
+        """
+        Args:
+            text (str): Query string
+
+        Returns:
+            np.ndarray: L2-normalized float32 vector of shape (dim,)
+        """
+        return self._embed_one(text)
+
+
+class TransformerEmbedder:
+    """
+    Sentence embedder backed by DOCUMENT_MODEL, loaded lazily on first use.
+    """
+
+    def __init__(self, model_name=DOCUMENT_MODEL, batch_size=32):
+        self.model_name = model_name
+        self.name = model_name
+        self.batch_size = batch_size
+        self.tokenizer = None
+        self.model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self.model is None:
+                from transformers import AutoTokenizer, AutoModel
+
+                from app.models.model_store import resolve_model
+
+                path = resolve_model(self.model_name)
+                self.tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=True)
+                self.model = AutoModel.from_pretrained(path, local_files_only=True)
+                self.model.eval()
+
+    def _embed(self, texts):
+        import torch
+
+        self._load()
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            inputs = self.tokenizer(batch, padding=True, truncation=True, max_length=512, return_tensors="pt")
+            with torch.no_grad():
+                outputs = self.model(**inputs)
+            # BGE uses the CLS token as the sentence embedding
+            cls = torch.nn.functional.normalize(outputs.last_hidden_state[:, 0], dim=-1)
+            vectors.append(cls.numpy().astype(np.float32))
+        return np.concatenate(vectors, axis=0)
+
+    def embed_documents(self, texts):
+        return self._embed(list(texts))
+
+    def embed_query(self, text):
+        return self._embed([BGE_QUERY_INSTRUCTION + text])[0]
+
+
+def get_embedder(name):
+    """
+    Create the embedder recorded in an index's metadata.
+
+    Args:
+        name (str): "hashing-<dim>" or a Hugging Face model identifier
+
+    Returns:
+        An embedder with embed_documents() and embed_query()
+    """
+    if name.startswith("hashing-"):
+        return HashingEmbedder(dim=int(name.split("-", 1)[1]))
+    return TransformerEmbedder(model_name=name)
+
+
+def collect_documents(store):
+    """
+    Flatten the acts and sections of the legal corpus into index entries.
+
+    Args:
+        store (CorpusStore): The loaded legal corpus
+
+    Returns:
+        tuple: (list of texts to embed, list of metadata dicts)
+    """
+    texts = []
+    entries = []
+
+    for category in store.categories():
+        for act in store.category(category).acts:
+            act_meta = {
+                "category": category,
+                "act": act.name,
+                "year": act.year,
+                "description": act.description,
+            }
+
+            texts.append(f"{act.name} {act.year}. {act.description} {' '.join(act.keywords)}")
+            entries.append(dict(act_meta, section=None, title=""))
+
+            for section in act.sections:
+                texts.append(f"{act.name} Section {section.number}: {section.title}. {section.content}")
+                entries.append(dict(act_meta, section=section.number, title=section.title, content=section.content))
+
+    return texts, entries
+
+
+def build_index(embedder, data_dir=DATA_DIR, output_dir=INDEX_DIR):
+    """
+    Embed the legal corpus and write the matrix and metadata sidecar to disk.
+
+    Args:
+        embedder: The embedder to encode documents with
+        data_dir (str): Directory holding the category JSON files
+        output_dir (str): Directory to write the index into
+
+    Returns:
+        str: The output directory
+    """
+    store = CorpusStore(data_dir)
+    texts, entries = collect_documents(store)
+    matrix = embedder.embed_documents(texts).astype(np.float32)
+
+    os.makedirs(output_dir, exist_ok=True)
+    np.save(os.path.join(output_dir, INDEX_MATRIX_FILE), matrix)
+    with open(os.path.join(output_dir, INDEX_METADATA_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "embedder": embedder.name,
+            "dim": int(matrix.shape[1]),
+            "source_hash": store.source_hash,
+            "entries": entries
+        }, f, ensure_ascii=False)
+
+    return output_dir
+
+
+class StaleIndexError(ValueError):
+    """Raised when a prebuilt index was built from other versions of the data files."""
+
+    def __init__(self, message, embedder_name):
+        super().__init__(message)
+        self.embedder_name = embedder_name
+
+
+class LegalIndex:
+    """
+    Vector index over acts and sections. Lookups are a single matrix-vector
+    product against the (memory-mapped) embedding matrix.
+    """
+
+    def __init__(self, matrix, entries, embedder):
+        self.matrix = matrix
+        self.entries = entries
+        self.embedder = embedder
+        self._categories = np.array([entry["category"] for entry in entries])
+
+    @classmethod
+    def load(cls, index_dir=INDEX_DIR, source_hash=None):
+        """
+        Open a prebuilt index, memory-mapping the embedding matrix.
+
+        Args:
+            index_dir (str): Directory written by build_index()
+            source_hash (str): If given, the hash_sources() digest the index must have been built from
+
+        Returns:
+            LegalIndex: The loaded index
+
+        Raises:
+            StaleIndexError: If the index does not match source_hash
+        """
+        with open(os.path.join(index_dir, INDEX_METADATA_FILE), "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if source_hash is not None and metadata.get("source_hash") != source_hash:
+            raise StaleIndexError(f"{index_dir} was built from other data files", metadata["embedder"])
+        matrix = np.load(os.path.join(index_dir, INDEX_MATRIX_FILE), mmap_mode="r")
+        return cls(matrix, metadata["entries"], get_embedder(metadata["embedder"]))
+
+    @classmethod
+    def build_in_memory(cls, embedder, store):
+        """
+        Build an index without writing it to disk.
+
+        Args:
+            embedder: The embedder to encode documents with
+            store (CorpusStore): The loaded legal corpus
+
+        Returns:
+            LegalIndex: The built index
+        """
+        texts, entries = collect_documents(store)
+        return cls(embedder.embed_documents(texts), entries, embedder)
+
+    def search(self, query, k=5, category=None):
+        """
+        Find the acts and sections most similar to the query.
+
+        Args:
+            query (str): The query text
+            k (int): Number of results to return
+            category (str): Optional category file key to restrict results to
+
+        Returns:
+            list: Metadata dicts with an added 'score', best first
+        """
+        if not len(self.entries):
+            return []
+
+        scores = np.asarray(self.matrix @ self.embedder.embed_query(query))
+        if category is not None:
+            scores = np.where(self._categories == category, scores, -np.inf)
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            dict(self.entries[i], score=float(scores[i]))
+            for i in top
+            if np.isfinite(scores[i])
+        ]
+
+
+def index_embedder_name():
+    """
+    Name of the embedder get_legal_index() will use, read from the prebuilt
+    index metadata or the corpus artifact header without loading either.
+
+    Returns:
+        str: "hashing-<dim>" or a Hugging Face model identifier
+    """
+    env = read_environment()
+    metadata_path = os.path.join(env["LEGAL_INDEX_DIR"], INDEX_METADATA_FILE)
+    if os.path.exists(metadata_path):
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            return json.load(f)["embedder"]
+
+    artifact_path = env["CORPUS_ARTIFACT_PATH"]
+    if artifact_path and os.path.exists(artifact_path):
+        from app.models.corpus_artifact import CorpusArtifact, CorpusArtifactError
+
+        try:
+            return CorpusArtifact(artifact_path).embedder_name
+        except (CorpusArtifactError, OSError):
+            pass
+
+    return HashingEmbedder().name
+
+
+def _load_prebuilt_index(index_dir, store):
+    """
+    Open the prebuilt index in index_dir, rebuilding it with the same embedder
+    if it was built from other data files.
+
+    Returns:
+        LegalIndex: The index, or None if it is stale and could not be rebuilt
+    """
+    try:
+        return LegalIndex.load(index_dir, store.source_hash)
+    except StaleIndexError as e:
+        print(f"Rebuilding legal index: {e}")
+        try:
+            build_index(get_embedder(e.embedder_name), data_dir=store.data_dir, output_dir=index_dir)
+            return LegalIndex.load(index_dir, store.source_hash)
+        except Exception as rebuild_error:
+            print(f"Could not rebuild the legal index in {index_dir}, ignoring it: {rebuild_error}")
+            return None
+
+
+def _open_index(store):
+    """Build the index for the store's current data, from the best available source"""
+    env = read_environment()
+    index_dir = env["LEGAL_INDEX_DIR"]
+    artifact_path = env["CORPUS_ARTIFACT_PATH"]
+
+    if os.path.exists(os.path.join(index_dir, INDEX_METADATA_FILE)):
+        index = _load_prebuilt_index(index_dir, store)
+        if index is not None:
+            return index
+
+    if artifact_path and os.path.exists(artifact_path):
+        # The corpus store rebuilds the artifact when it reloads stale data
+        from app.models.corpus_artifact import CorpusArtifact
+
+        artifact = CorpusArtifact(artifact_path)
+        if artifact.source_hash == store.source_hash:
+            return LegalIndex(artifact.embeddings(), artifact.index_entries(), get_embedder(artifact.embedder_name))
+
+    print(f"No up-to-date legal index in {index_dir}; building a hashing index in memory")
+    return LegalIndex.build_in_memory(HashingEmbedder(), store)
+
+
+_index = None
+_index_source_hash = None
+_index_lock = threading.Lock()
+
+
+def get_legal_index():
+    """
+    Get the process-wide legal index for the corpus store's current data.
+    Uses the prebuilt index when present (rebuilt if its data files changed),
+    then the compiled corpus artifact, and otherwise builds a hashing-embedder
+    index in memory. The index is rebuilt whenever the store reloads changed data.
+
+    Returns:
+        LegalIndex: The shared index
+    """
+    global _index, _index_source_hash
+
+    store = get_corpus_store()
+    with _index_lock:
+        source_hash = store.source_hash
+        if _index is None or _index_source_hash != source_hash:
+            _index = _open_index(store)
+            _index_source_hash = source_hash
+        return _index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the legal retrieval index")
+    parser.add_argument("--embedder", default=DOCUMENT_MODEL, help=f"'hashing-<dim>' or a model name (default: {DOCUMENT_MODEL})")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directory of legal JSON files")
+    parser.add_argument("--output-dir", default=read_environment()["LEGAL_INDEX_DIR"], help="Directory to write the index to")
+
+    args = parser.parse_args()
+
+    output_dir = build_index(get_embedder(args.embedder), data_dir=args.data_dir, output_dir=args.output_dir)
+    print(f"✓ Legal index written to {output_dir}")
@@ -0,0 +1,133 @@
+import logging
+import threading
+
+import numpy as np
+
+from app.utils.env_loader import read_environment
+
+logger = logging.getLogger(__name__)
+
+
+class _ScopeBuffer:
+    """Ring buffer of recent query embeddings and their responses for one scope"""
+
+    def __init__(self, capacity, dim):
+        self.matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self.responses = [None] * capacity
+        self.queries = [None] * capacity
+        self.size = 0
+        self.next = 0
+
+
+class SemanticCache:
+    """
+    Near-duplicate response cache. Recent queries are embedded and kept per
+    scope (category, model, profile and corpus version); an incoming query
+    whose cosine similarity to a stored one reaches the threshold gets the
+    stored answer. Lookups are a brute-force matrix-vector product over at
+    most `capacity` rows per scope.
+    """
+
+    def __init__(self, embedder, threshold=0.9, capacity=256):
+        """
+        Initialize the cache.
+
+        Args:
+            embedder: Embedder with embed_query() returning L2-normalized vectors
+            threshold (float): Minimum cosine similarity for a hit
+            capacity (int): Queries remembered per scope; the oldest are overwritten
+        """
+        self.embedder = embedder
+        self.threshold = threshold
+        self.capacity = capacity
+        self.stats = {"hits": 0, "misses": 0}
+        self._scopes = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, query, scope):
+        """
+        Find a stored response for a query similar enough to this one.
+
+        Args:
+            query (str): The preprocessed query
+            scope (tuple): Category, model, profile and corpus version
+
+        Returns:
+            dict: A copy of the stored response, or None
+        """
+        vector = self.embedder.embed_query(str(query))
+
+        with self._lock:
+            buffer = self._scopes.get(scope)
+            if buffer is None or buffer.size == 0:
+                self.stats["misses"] += 1
+                return None
+
+            scores = buffer.matrix[:buffer.size] @ vector
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+
+            logger.info(
+                "Semantic cache best similarity %.3f (threshold %.3f) for %r ~ %r",
+                score, self.threshold, str(query)[:80], buffer.queries[best][:80]
+            )
+
+            if score < self.threshold:
+                self.stats["misses"] += 1
+                return None
+
+            self.stats["hits"] += 1
+            return dict(buffer.responses[best], semantic_similarity=score)
+
+    def add(self, query, scope, response):
+        """
+        Remember a query and its final response.
+
+        Args:
+            query (str): The preprocessed query
+            scope (tuple): Category, model, profile and corpus version
+            response (dict): The final response dictionary
+        """
+        vector = self.embedder.embed_query(str(query))
+
+        with self._lock:
+            buffer = self._scopes.get(scope)
+            if buffer is None:
+                buffer = self._scopes[scope] = _ScopeBuffer(self.capacity, vector.shape[0])
+
+            slot = buffer.next
+            buffer.matrix[slot] = vector
+            buffer.responses[slot] = dict(response)
+            buffer.queries[slot] = str(query)
+            buffer.next = (slot + 1) % self.capacity
+            buffer.size = min(buffer.size + 1, self.capacity)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """
+    Get the process-wide semantic cache, or None when it is disabled.
+    It uses the same embedder as the legal retrieval index.
+
+    Returns:
+        SemanticCache: The shared cache, or None
+    """
+    global _cache
+
+    env = read_environment()
+    if not env["SEMANTIC_CACHE_ENABLED"]:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            from app.models.retrieval import get_legal_index
+
+            _cache = SemanticCache(
+                get_legal_index().embedder,
+                threshold=env["SEMANTIC_CACHE_THRESHOLD"],
+                capacity=env["SEMANTIC_CACHE_SIZE"]
+            )
+        return _cache
@@ -0,0 +1,348 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.models.model_store import ModelNotAvailableError, resolve_model
+from app.utils.audio import SAMPLE_RATE, iter_audio_blocks, segment_speech
+from app.utils.env_loader import read_environment
+from app.utils.lazy_import import lazy_import
+
+torch = lazy_import("torch")
+transformers = lazy_import("transformers")
+vosk = lazy_import("vosk")
+
+# Whisper checkpoint used by the default backend (multilingual, so it covers Bengali)
+SPEECH_MODEL = "openai/whisper-base"
+
+# Languages offered in the UI, by ISO 639-1 code
+LANGUAGES = {
+    "en": "English",
+    "bn": "Bengali",
+}
+
+# Whisper's encoder sees at most 30 seconds at a time
+WHISPER_WINDOW_SECONDS = 30
+
+
+class Transcription:
+    """The text recognized in one clip."""
+
+    __slots__ = ("text", "language", "audio_seconds", "seconds", "engine")
+
+    def __init__(self, text, language, audio_seconds, seconds, engine):
+        self.text = text
+        self.language = language
+        self.audio_seconds = audio_seconds
+        self.seconds = seconds
+        self.engine = engine
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class TranscriptSegment:
+    """The text of one speech segment of a longer recording."""
+
+    __slots__ = ("index", "start", "end", "text")
+
+    def __init__(self, index, start, end, text):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class SpeechEngine:
+    """
+    Base class of the speech-to-text backends.
+
+    An engine is created once per process and shared by every session: the
+    model is loaded on first use (or by an explicit load()), stays resident,
+    and is dropped with unload(). Subclasses implement _load() and
+    _transcribe().
+    """
+
+    name = "base"
+    languages = tuple(LANGUAGES)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.load_seconds = None
+
+    @property
+    def is_loaded(self):
+        return self._loaded
+
+    def load(self):
+        """Load the model once; concurrent callers wait for the same load"""
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                started = time.monotonic()
+                self._load()
+                self.load_seconds = time.monotonic() - started
+                self._loaded = True
+
+    def unload(self):
+        """Drop the model; the next transcription loads it again"""
+        with self._lock:
+            self._unload()
+            self._loaded = False
+
+    def transcribe(self, audio, language=None):
+        """
+        Recognize speech in a clip.
+
+        Args:
+            audio (numpy.ndarray): Mono float32 samples at SAMPLE_RATE
+            language (str): 'en' or 'bn', or None to let the engine decide
+
+        Returns:
+            Transcription: The recognized text
+        """
+        if language is not None and language not in self.languages:
+            raise ValueError(f"The {self.name} speech engine does not support language '{language}'")
+
+        self.load()
+        started = time.monotonic()
+        text = self._transcribe(np.asarray(audio, dtype=np.float32), language)
+        return Transcription(
+            text=text.strip(),
+            language=language,
+            audio_seconds=len(audio) / SAMPLE_RATE,
+            seconds=time.monotonic() - started,
+            engine=self.name,
+        )
+
+    def stats(self):
+        """
+        Returns:
+            dict: Engine name, languages and load state
+        """
+        return {
+            "engine": self.name,
+            "languages": list(self.languages),
+            "loaded": self._loaded,
+            "load_seconds": self.load_seconds,
+        }
+
+    def _load(self):
+        raise NotImplementedError
+
+    def _unload(self):
+        pass
+
+    def _transcribe(self, audio, language):
+        raise NotImplementedError
+
+
+class WhisperEngine(SpeechEngine):
+    """Whisper on CPU (or GPU) through transformers, from the local model cache."""
+
+    name = "whisper"
+
+    def __init__(self, model_name=SPEECH_MODEL, device="cpu"):
+        super().__init__()
+        self.model_name = model_name
+        self.device = device
+        self.model = None
+        self.processor = None
+
+    def _load(self):
+        from app.models.hardware import configure_threads
+
+        configure_threads()
+        path = resolve_model(self.model_name)
+        self.processor = transformers.WhisperProcessor.from_pretrained(path, local_files_only=True)
+        model = transformers.WhisperForConditionalGeneration.from_pretrained(path, local_files_only=True)
+        self.model = model.to(self.device).eval()
+
+    def _unload(self):
+        self.model = None
+        self.processor = None
+
+    def _transcribe(self, audio, language):
+        # Longer clips are cut into 30 s windows and decoded as one batch
+        window = WHISPER_WINDOW_SECONDS * SAMPLE_RATE
+        windows = [audio[start:start + window] for start in range(0, max(len(audio), 1), window)]
+
+        features = self.processor(windows, sampling_rate=SAMPLE_RATE, return_tensors="pt").input_features
+        generate_kwargs = {"task": "transcribe"}
+        if language is not None:
+            generate_kwargs["language"] = language
+
+        with torch.inference_mode():
+            ids = self.model.generate(features.to(self.device), **generate_kwargs)
+        return " ".join(text.strip() for text in self.processor.batch_decode(ids, skip_special_tokens=True))
+
+
+class VoskEngine(SpeechEngine):
+    """
+    Kaldi models through Vosk, from an unpacked model directory in the model
+    cache. Vosk publishes no Bengali model, so this engine is English only.
+    """
+
+    name = "vosk"
+    languages = ("en",)
+
+    def __init__(self, model_path):
+        super().__init__()
+        self.model_path = model_path
+        self.model = None
+
+    def _load(self):
+        if not os.path.isdir(self.model_path):
+            raise ModelNotAvailableError(
+                f"Vosk model not found at {self.model_path}. "
+                f"Download it from https://alphacephei.com/vosk/models and unpack it there."
+            )
+        self.model = vosk.Model(self.model_path)
+
+    def _unload(self):
+        self.model = None
+
+    def _transcribe(self, audio, language):
+        # Recognizers are cheap and hold per-stream state, so one per clip
+        recognizer = vosk.KaldiRecognizer(self.model, SAMPLE_RATE)
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+
+class StubEngine(SpeechEngine):
+    """Returns a fixed text without loading anything; for tests and UI development."""
+
+    name = "stub"
+
+    def __init__(self, text="What are my rights if my landlord evicts me without notice?"):
+        super().__init__()
+        self.text = text
+
+    def _load(self):
+        pass
+
+    def _transcribe(self, audio, language):
+        return self.text
+
+
+def create_speech_engine(backend=None):
+    """
+    Create a speech engine from the STT_* settings.
+
+    Args:
+        backend (str): 'whisper', 'vosk' or 'stub'; defaults to STT_BACKEND
+
+    Returns:
+        SpeechEngine: The engine, not yet loaded
+    """
+    env = read_environment()
+    backend = (backend or env["STT_BACKEND"]).lower()
+
+    if backend == "whisper":
+        return WhisperEngine(env["SPEECH_MODEL"] or SPEECH_MODEL)
+    if backend == "vosk":
+        return VoskEngine(os.path.join(env["MODEL_CACHE_DIR"], env["VOSK_MODEL"]))
+    if backend == "stub":
+        return StubEngine()
+    raise ValueError(f"Unknown STT_BACKEND '{backend}' (expected whisper, vosk or stub)")
+
+
+def transcribe_stream(source, language=None, engine=None, executor=None, max_pending=None, suffix=""):
+    """
+    Transcribe a recording segment by segment while it is still being decoded.
+
+    The audio is decoded in blocks and cut at pauses (see
+    app.utils.audio.segment_speech). Segments are transcribed concurrently on
+    the shared worker pool, and results are yielded in order as soon as each
+    one is ready. At most max_pending segments are held in memory, however
+    long the recording is.
+
+    Args:
+        source: The recording as bytes, a binary file object, a path or a 16 kHz numpy array
+        language (str): 'en' or 'bn', or None to let the engine decide
+        engine (SpeechEngine): Engine to use, defaults to the shared one
+        executor (ThreadPoolExecutor): Pool to run on, defaults to the shared one
+        max_pending (int): Segments decoded but not yet yielded; defaults to twice the pool size
+        suffix (str): Extension of in-memory input (e.g. '.m4a') for formats that need a file
+
+    Yields:
+        TranscriptSegment: Transcribed segments, in order
+    """
+    env = read_environment()
+    engine = engine or get_speech_engine()
+    executor = executor or get_transcription_executor()
+    max_pending = max_pending or 2 * env["STT_WORKERS"]
+    engine.load()
+
+    segments = segment_speech(
+        iter_audio_blocks(source, suffix=suffix),
+        min_silence_seconds=env["STT_MIN_SILENCE_SECONDS"],
+        max_segment_seconds=env["STT_MAX_SEGMENT_SECONDS"]
+    )
+
+    def result(segment, future):
+        return TranscriptSegment(segment.index, segment.start, segment.end, future.result().text)
+
+    pending = deque()
+    try:
+        for segment in segments:
+            pending.append((segment, executor.submit(engine.transcribe, segment.samples, language)))
+            # Hand back finished segments early; block only when the window is full
+            while pending and (pending[0][1].done() or len(pending) >= max_pending):
+                yield result(*pending.popleft())
+
+        while pending:
+            yield result(*pending.popleft())
+    finally:
+        # The caller stopped early or a segment failed; do not transcribe the rest
+        for _, future in pending:
+            future.cancel()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_speech_engine():
+    """
+    Get the process-wide speech engine, creating it on first use. Every
+    session shares it, so the model is loaded once per process.
+
+    Returns:
+        SpeechEngine: The shared engine
+    """
+    global _engine
+
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_speech_engine()
+        return _engine
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_transcription_executor():
+    """
+    Get the process-wide pool that transcribes speech segments (STT_WORKERS threads).
+
+    Returns:
+        ThreadPoolExecutor: The shared pool
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=read_environment()["STT_WORKERS"], thread_name_prefix="stt")
+        return _executor
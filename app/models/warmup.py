@@ -0,0 +1,160 @@
+import threading
+import time
+
+from app.models.inference_server import get_inference_worker
+from app.models.model_registry import get_model_registry
+from app.utils.env_loader import read_environment
+
+# Prompt and length of the throwaway generation that initializes kernels
+WARMUP_PROMPT = "What is the law?"
+WARMUP_MAX_LENGTH = 8
+
+# Readiness states reported per model
+PENDING = "pending"
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+def warmup_models():
+    """
+    Returns:
+        list: Models to warm up, from WARMUP_MODELS or every model the legal agents use
+    """
+    configured = read_environment()["WARMUP_MODELS"]
+    if configured:
+        return [name.strip() for name in configured.split(",") if name.strip()]
+
+    from app.models.legal_agent import DEFAULT_MODEL, LEGAL_MODELS
+
+    return list(dict.fromkeys(list(LEGAL_MODELS.values()) + [DEFAULT_MODEL]))
+
+
+class ModelWarmup:
+    """
+    Loads models through the shared registry on a background thread and runs
+    one short generation with each, so the first real request finds the
+    model resident and its kernels initialized. Requests that arrive during
+    warm-up wait on the registry's load future instead of loading again.
+    """
+
+    def __init__(self, model_names, registry=None, worker=None):
+        """
+        Args:
+            model_names (list): Models to warm up, in order
+            registry (ModelRegistry): Registry to load into, defaults to the shared one
+            worker (BatchingInferenceWorker): Worker for the dummy generation, defaults to the shared one
+        """
+        self.model_names = list(model_names)
+        self.registry = registry or get_model_registry()
+        self.worker = worker or get_inference_worker()
+        self._status = {name: {"state": PENDING, "seconds": None, "error": None} for name in self.model_names}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.index_ready = False
+
+    def start(self):
+        """Start warming up in the background; later calls do nothing"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+                self._thread.start()
+
+    def _set(self, name, state, **fields):
+        with self._lock:
+            self._status[name].update(state=state, **fields)
+
+    def _run(self):
+        """Warm-up thread main loop"""
+        # The retrieval index (and its embedder) is needed by every request too
+        try:
+            from app.models.retrieval import get_legal_index
+
+            get_legal_index()
+            self.index_ready = True
+        except Exception as e:
+            print(f"Warm-up could not load the legal index: {e}")
+
+        for name in self.model_names:
+            started = time.monotonic()
+            try:
+                self._set(name, LOADING)
+                handle = self.registry.acquire(name)
+                try:
+                    self._set(name, WARMING)
+                    # A cold first call includes one-off kernel setup, so it must not
+                    # seed the latency estimate that requests are degraded by
+                    self.worker.submit(
+                        handle.model, handle.tokenizer, WARMUP_PROMPT,
+                        record_latency=False, max_length=WARMUP_MAX_LENGTH
+                    ).result()
+                finally:
+                    handle.release()
+            except Exception as e:
+                print(f"Warm-up of {name} failed: {e}")
+                self._set(name, FAILED, error=str(e), seconds=round(time.monotonic() - started, 3))
+                continue
+
+            self._set(name, READY, seconds=round(time.monotonic() - started, 3))
+
+    def status(self):
+        """
+        Returns:
+            dict: Per-model state ('pending', 'loading', 'warming', 'ready' or 'failed'),
+            seconds taken and error message
+        """
+        with self._lock:
+            return {name: dict(status) for name, status in self._status.items()}
+
+    def state(self, model_name):
+        """
+        Returns:
+            str: The model's warm-up state, or None if it is not being warmed up
+        """
+        with self._lock:
+            status = self._status.get(model_name)
+            return status["state"] if status else None
+
+    def is_ready(self):
+        """
+        Returns:
+            bool: True once every model has finished warming up (successfully or not)
+        """
+        with self._lock:
+            return all(status["state"] in (READY, FAILED) for status in self._status.values())
+
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def get_model_warmup():
+    """
+    Get the process-wide warm-up, or None when WARMUP_ENABLED is off.
+
+    Returns:
+        ModelWarmup: The shared warm-up
+    """
+    global _warmup
+
+    if not read_environment()["WARMUP_ENABLED"]:
+        return None
+
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = ModelWarmup(warmup_models())
+        return _warmup
+
+
+def start_model_warmup():
+    """
+    Start the process-wide warm-up if it is enabled. Safe to call on every rerun.
+
+    Returns:
+        ModelWarmup: The shared warm-up, or None when disabled
+    """
+    warmup = get_model_warmup()
+    if warmup is not None:
+        warmup.start()
+    return warmup
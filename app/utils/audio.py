@@ -0,0 +1,235 @@
+import io
+import math
+import os
+import tempfile
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from app.utils.lazy_import import lazy_import
+
+sf = lazy_import("soundfile")
+soxr = lazy_import("soxr")
+librosa = lazy_import("librosa")
+
+# Rate every speech engine expects
+SAMPLE_RATE = 16000
+
+# Audio is decoded this many seconds at a time
+BLOCK_SECONDS = 1.0
+
+# Voice activity is decided per frame of this length
+FRAME_SECONDS = 0.03
+
+# Frames quieter than this are always silence, frames this far above the noise floor are speech
+SILENCE_FLOOR_DB = -50.0
+SPEECH_MARGIN_DB = 10.0
+
+# How quickly the noise floor follows the level of silent frames
+NOISE_FLOOR_ADAPTATION = 0.05
+
+
+class AudioSegment:
+    """A stretch of speech cut from a recording."""
+
+    __slots__ = ("index", "start", "samples", "sample_rate")
+
+    def __init__(self, index, start, samples, sample_rate=SAMPLE_RATE):
+        self.index = index
+        self.start = start
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+    @property
+    def end(self):
+        return self.start + len(self.samples) / self.sample_rate
+
+
+@contextmanager
+def spill_to_disk(source, suffix=""):
+    """
+    Write an in-memory recording to a temporary file for decoders that only
+    take paths. The file is removed when the block exits, even on errors.
+
+    Args:
+        source: bytes or binary file object
+        suffix (str): File extension the decoder uses to pick a format, e.g. '.m4a'
+
+    Yields:
+        str: Path of the temporary file
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix="ai-lawyer-audio-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                f.write(source)
+            else:
+                source.seek(0)
+                for chunk in iter(lambda: source.read(1 << 20), b""):
+                    f.write(chunk)
+        yield path
+    finally:
+        os.unlink(path)
+
+
+def iter_audio_blocks(source, sample_rate=SAMPLE_RATE, block_seconds=BLOCK_SECONDS, suffix=""):
+    """
+    Decode audio incrementally into mono float32 blocks at sample_rate.
+
+    Formats libsndfile reads (wav, flac, ogg, mp3) are decoded straight from
+    memory block by block and resampled with a streaming resampler, so memory
+    does not grow with the length of the recording. Other formats (m4a) are
+    decoded whole by librosa, through a temporary file for in-memory input.
+
+    Args:
+        source: Path, bytes, binary file object, or a numpy array already at sample_rate
+        sample_rate (int): Output sample rate
+        block_seconds (float): Seconds of input decoded per block
+        suffix (str): Extension of in-memory input (e.g. '.m4a'), used by the fallback decoder
+
+    Yields:
+        numpy.ndarray: Consecutive blocks of samples
+    """
+    step = int(sample_rate * block_seconds)
+    if isinstance(source, np.ndarray):
+        for start in range(0, len(source), step):
+            yield source[start:start + step].astype(np.float32, copy=False)
+        return
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+
+    try:
+        audio_file = sf.SoundFile(source)
+    except RuntimeError:
+        if isinstance(source, str):
+            audio, _ = librosa.load(source, sr=sample_rate, mono=True)
+        else:
+            # audioread (behind librosa) only opens paths
+            with spill_to_disk(source, suffix) as path:
+                audio, _ = librosa.load(path, sr=sample_rate, mono=True)
+        for start in range(0, len(audio), step):
+            yield audio[start:start + step].astype(np.float32, copy=False)
+        return
+
+    with audio_file:
+        resampler = None
+        if audio_file.samplerate != sample_rate:
+            resampler = soxr.ResampleStream(audio_file.samplerate, sample_rate, 1, dtype="float32")
+
+        blocksize = int(audio_file.samplerate * block_seconds)
+        for block in audio_file.blocks(blocksize=blocksize, dtype="float32", always_2d=True):
+            mono = block.mean(axis=1, dtype=np.float32)
+            if resampler is not None:
+                mono = resampler.resample_chunk(mono)
+            if len(mono):
+                yield mono
+
+        if resampler is not None:
+            tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+            if len(tail):
+                yield tail
+
+
+def read_audio(source, sample_rate=SAMPLE_RATE, suffix=""):
+    """
+    Decode a whole clip; prefer iter_audio_blocks() for recordings of unknown length.
+
+    Returns:
+        numpy.ndarray: Mono float32 samples at sample_rate
+    """
+    blocks = list(iter_audio_blocks(source, sample_rate, suffix=suffix))
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+
+
+def frame_levels(frames):
+    """
+    Returns:
+        numpy.ndarray: RMS level in dBFS of each row of frames
+    """
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20 * np.log10(rms + 1e-10)
+
+
+def segment_speech(blocks, sample_rate=SAMPLE_RATE, min_silence_seconds=0.5, max_segment_seconds=20.0,
+                   padding_seconds=0.2, frame_seconds=FRAME_SECONDS):
+    """
+    Cut a stream of audio blocks into speech segments at pauses.
+
+    A frame is speech when its level is SPEECH_MARGIN_DB above an adaptive
+    noise floor (and above SILENCE_FLOOR_DB). A segment ends after
+    min_silence_seconds of silence, or at max_segment_seconds, so at most one
+    segment is buffered however long the recording is.
+
+    Args:
+        blocks: Iterable of mono float32 blocks at sample_rate
+        sample_rate (int): Sample rate of the blocks
+        min_silence_seconds (float): Pause length that ends a segment
+        max_segment_seconds (float): Longest segment emitted
+        padding_seconds (float): Audio kept before and after the speech in each segment
+        frame_seconds (float): Frame length for the voice activity decision
+
+    Yields:
+        AudioSegment: Segments containing speech, in order
+    """
+    frame_length = int(sample_rate * frame_seconds)
+    padding_frames = max(1, math.ceil(padding_seconds / frame_seconds))
+    silence_frames = max(1, math.ceil(min_silence_seconds / frame_seconds))
+    max_frames = max(1, int(max_segment_seconds / frame_seconds))
+
+    leftover = np.zeros(0, dtype=np.float32)
+    preroll = deque(maxlen=padding_frames)
+    segment = []
+    segment_start = 0
+    trailing_silence = 0
+    noise_floor = None
+    frame_index = 0
+    index = 0
+
+    def emit(frames, start_frame):
+        return AudioSegment(index, start_frame * frame_seconds, np.concatenate(frames), sample_rate)
+
+    for block in blocks:
+        samples = np.concatenate((leftover, block)) if len(leftover) else block
+        usable = len(samples) - len(samples) % frame_length
+        leftover = samples[usable:]
+        if not usable:
+            continue
+
+        frames = samples[:usable].reshape(-1, frame_length)
+        for frame, level in zip(frames, frame_levels(frames)):
+            if noise_floor is None:
+                noise_floor = level
+            speech = level > max(SILENCE_FLOOR_DB, noise_floor + SPEECH_MARGIN_DB)
+            if not speech:
+                # Drop instantly to quieter levels, rise slowly so speech does not drag the floor up
+                noise_floor = min(level, noise_floor + NOISE_FLOOR_ADAPTATION * (level - noise_floor))
+
+            if segment:
+                segment.append(frame)
+                trailing_silence = 0 if speech else trailing_silence + 1
+                if trailing_silence >= silence_frames:
+                    # Keep padding after the last speech frame, drop the rest of the pause
+                    keep = len(segment) - trailing_silence + padding_frames
+                    yield emit(segment[:keep], segment_start)
+                    index += 1
+                    segment = []
+                    preroll.clear()
+                elif len(segment) >= max_frames:
+                    # Cut long speech without a pause; the next speech frame starts a new segment
+                    yield emit(segment, segment_start)
+                    index += 1
+                    segment = []
+                    preroll.clear()
+            elif speech:
+                segment = list(preroll) + [frame]
+                segment_start = frame_index - len(preroll)
+                trailing_silence = 0
+            else:
+                preroll.append(frame)
+            frame_index += 1
+
+    if segment:
+        keep = len(segment) - max(0, trailing_silence - padding_frames)
+        yield emit(segment[:keep], segment_start)
@@ -0,0 +1,271 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.utils.env_loader import read_environment
+from app.utils.lazy_import import lazy_import
+from app.utils.ocr import OcrPipeline, get_ocr_pipeline
+
+pdfium = lazy_import("pypdfium2")
+
+# Pages whose text layer has fewer characters than this are treated as scans and OCR'd
+MIN_TEXT_LAYER_CHARS = 20
+
+# Separator between pages in the assembled text
+PAGE_SEPARATOR = "\n\n"
+
+# PDF user space is 72 points per inch
+PDF_POINTS_PER_INCH = 72
+
+# Longest side of the first-page preview
+PREVIEW_PIXELS = 1200
+
+
+class DocumentPage:
+    """The text of one page and where it came from; error is set when the page could not be read."""
+
+    __slots__ = ("number", "text", "source", "seconds", "error")
+
+    def __init__(self, number, text, source, seconds=0.0, error=None):
+        self.number = number
+        self.text = text
+        self.source = source
+        self.seconds = seconds
+        self.error = error
+
+
+def assemble_pages(pages):
+    """
+    Join page texts into one document, recording where each page starts and ends.
+
+    Args:
+        pages (list): DocumentPage objects in page order
+
+    Returns:
+        tuple: (full text, list of {'page', 'start', 'end', 'source'} offsets into it)
+    """
+    parts = []
+    offsets = []
+    position = 0
+    for page in pages:
+        text = page.text.strip()
+        if parts:
+            parts.append(PAGE_SEPARATOR)
+            position += len(PAGE_SEPARATOR)
+        parts.append(text)
+        offsets.append({"page": page.number, "start": position, "end": position + len(text), "source": page.source})
+        position += len(text)
+    return "".join(parts), offsets
+
+
+def page_at(offsets, position):
+    """
+    Returns:
+        int: Number of the page containing a character offset of the assembled text, or None
+    """
+    for offset in offsets:
+        if offset["start"] <= position <= offset["end"]:
+            return offset["page"]
+    return None
+
+
+# Each OCR worker process builds its pipeline once per settings
+_worker_pipelines = {}
+
+
+def _init_ocr_worker():
+    # Pages are already spread over processes; tesseract's own threads would only contend
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+# Worker exceptions are re-raised as RuntimeError carrying only their message, since the
+# originals (e.g. pytesseract's) may not survive being pickled back to the server
+def _ocr_page(image, dpi, settings):
+    """Run in a worker process: OCR one rasterized page"""
+    try:
+        key = tuple(sorted(settings.items()))
+        pipeline = _worker_pipelines.get(key)
+        if pipeline is None:
+            pipeline = _worker_pipelines[key] = OcrPipeline(**settings)
+        started = time.perf_counter()
+        return pipeline.recognize(image, dpi), time.perf_counter() - started
+    except Exception as e:
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+
+def pipeline_settings(pipeline):
+    """
+    Returns:
+        dict: The OcrPipeline arguments that workers need to reproduce pipeline
+    """
+    return {
+        "target_dpi": pipeline.target_dpi,
+        "threshold": pipeline.threshold,
+        "deskew": pipeline.deskew,
+        "denoise": pipeline.denoise,
+    }
+
+
+def is_pdf(data):
+    return data[:5] == b"%PDF-"
+
+
+def render_preview(page):
+    """
+    Returns:
+        PIL.Image.Image: A small rendering of a PDF page for display
+    """
+    scale = PREVIEW_PIXELS / max(page.get_size())
+    return page.render(scale=scale).to_pil()
+
+
+def iter_pdf_pages(data, pipeline=None, executor=None, max_pending=None, preview=None):
+    """
+    Extract the text of a PDF page by page, OCR'ing only pages without a text layer.
+
+    Pages are opened one at a time. Pages with a text layer are read directly;
+    the others are rasterized at the pipeline's target DPI and OCR'd on the
+    process pool, with at most max_pending rasterized pages in memory.
+    Results are yielded in page order as soon as each is ready. A page that
+    fails is yielded with its error set and no text. If the shared pool
+    breaks (a worker process died), it is replaced and the page retried once.
+
+    Args:
+        data (bytes): The PDF file
+        pipeline (OcrPipeline): Preprocessing settings, defaults to the shared pipeline
+        executor (Executor): Pool to OCR on, defaults to the shared process pool
+        max_pending (int): Pages in flight; defaults to twice the pool size
+        preview (list): If given, a preview image of the first page is appended to it
+
+    Yields:
+        DocumentPage: Pages in order
+    """
+    pipeline = pipeline or get_ocr_pipeline()
+    shared = executor is None
+    executor = executor or get_ocr_executor()
+    max_pending = max_pending or 2 * ocr_workers()
+    settings = pipeline_settings(pipeline)
+    scale = pipeline.target_dpi / PDF_POINTS_PER_INCH
+
+    def submit(image):
+        """Returns: (future, the pool it was submitted to)"""
+        pool = executor
+        try:
+            return pool.submit(_ocr_page, image, pipeline.target_dpi, settings), pool
+        except Exception as e:
+            # A broken pool refuses new work; fail the page's future so result() handles it
+            future = Future()
+            future.set_exception(e)
+            return future, pool
+
+    def result(number, source, future, image, pool):
+        nonlocal executor
+        try:
+            try:
+                text, seconds = future.result()
+            except BrokenProcessPool:
+                if not shared:
+                    raise
+                # Only the pool this page ran on is replaced; pages from the same dead
+                # pool then find the replacement already in place
+                executor = _reset_ocr_executor(pool)
+                text, seconds = submit(image)[0].result()
+        except Exception as e:
+            return DocumentPage(number, "", source, error=str(e) or type(e).__name__)
+        return DocumentPage(number, text, source, seconds)
+
+    pdf = pdfium.PdfDocument(data)
+    pending = deque()
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            try:
+                if index == 0 and preview is not None:
+                    preview.append(render_preview(page))
+
+                textpage = page.get_textpage()
+                text = textpage.get_text_range()
+                textpage.close()
+                if len(text.strip()) >= MIN_TEXT_LAYER_CHARS:
+                    future = Future()
+                    future.set_result((text, 0.0))
+                    pending.append((index + 1, "text", future, None, None))
+                else:
+                    bitmap = page.render(scale=scale, grayscale=True)
+                    # to_numpy() is a view of pdfium's buffer and the pool pickles lazily, so take a copy.
+                    # The image is kept until the page's result is in, for the retry on a broken pool
+                    image = bitmap.to_numpy()[:, :, 0].copy()
+                    bitmap.close()
+                    future, pool = submit(image)
+                    pending.append((index + 1, "ocr", future, image, pool))
+                    del image
+            finally:
+                page.close()
+
+            # Hand back finished pages early; block only when the window is full
+            while pending and (pending[0][2].done() or len(pending) >= max_pending):
+                yield result(*pending.popleft())
+
+        while pending:
+            yield result(*pending.popleft())
+    finally:
+        for _, _, future, _, _ in pending:
+            future.cancel()
+        pdf.close()
+
+
+def ocr_workers():
+    """
+    Returns:
+        int: OCR worker processes, OCR_WORKERS or one per CPU
+    """
+    return read_environment()["OCR_WORKERS"] or os.cpu_count() or 1
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_ocr_executor():
+    """
+    Get the process-wide pool that OCRs document pages, creating it on first use.
+    It has OCR_WORKERS processes (default: one per CPU) and uses spawn, so
+    workers do not inherit the server's threads.
+
+    Returns:
+        ProcessPoolExecutor: The shared pool
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=ocr_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker
+            )
+        return _executor
+
+
+def _reset_ocr_executor(broken):
+    """
+    Replace the shared pool after its worker processes died. Concurrent
+    callers holding the same broken pool all get the one replacement.
+
+    Args:
+        broken (ProcessPoolExecutor): The pool that raised BrokenProcessPool
+
+    Returns:
+        ProcessPoolExecutor: The new shared pool
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False)
+    return get_ocr_executor()
@@ -1,15 +1,39 @@
 import os
+import threading
 from dotenv import load_dotenv
 import streamlit as st
 
-def load_environment():
+# Settings are parsed once per process; see read_environment()
+_settings = None
+_settings_lock = threading.Lock()
+
+def read_environment(reload=False):
     """
-    Load environment variables from .env file.
+    Read the application settings from the environment without touching
+    Streamlit session state, so background threads and CLI tools can use it.
     Will not override existing environment variables.
     
+    The .env file and environment are parsed on the first call only; later
+    calls return the same dictionary, which callers must not modify.
+    
+    Args:
+        reload (bool): Parse the settings again, e.g. after a test changes the environment
+    
     Returns:
         dict: A dictionary of environment variables
     """
+    global _settings
+    
+    with _settings_lock:
+        if _settings is None or reload:
+            _settings = _parse_environment()
+        return _settings
+
+def _parse_environment():
+    """
+    Returns:
+        dict: The settings parsed from .env and the process environment
+    """
     # Load environment variables from .env file if it exists
     load_dotenv()
     
@@ -26,6 +50,71 @@ def load_environment():
         "DEFAULT_MODEL": os.getenv("DEFAULT_MODEL", "google/flan-t5-small"),
         "USE_LOCAL_MODELS": os.getenv("USE_LOCAL_MODELS", "True").lower() in ("true", "1", "t"),
         "MODEL_CACHE_DIR": os.getenv("MODEL_CACHE_DIR", "./model_cache"),
+        # Check sha256 of cached model files once per process (sizes are always checked)
+        "MODEL_VERIFY_CHECKSUMS": os.getenv("MODEL_VERIFY_CHECKSUMS", "True").lower() in ("true", "1", "t"),
+        # Shared model registry budget in megabytes (0 disables eviction)
+        "MODEL_MEMORY_BUDGET_MB": int(os.getenv("MODEL_MEMORY_BUDGET_MB", "2048")),
+        # Retries (with doubling backoff) for transient model load failures
+        "MODEL_LOAD_RETRIES": int(os.getenv("MODEL_LOAD_RETRIES", "2")),
+        "MODEL_LOAD_BACKOFF_SECONDS": float(os.getenv("MODEL_LOAD_BACKOFF_SECONDS", "1.0")),
+        # Hardware-aware loading: 'auto' or a strategy name, and torch thread count (0 = all cores)
+        "MODEL_LOAD_STRATEGY": os.getenv("MODEL_LOAD_STRATEGY", "auto"),
+        "MODEL_NUM_THREADS": int(os.getenv("MODEL_NUM_THREADS", "0")),
+        # Generation backend: 'torch' or 'onnx' (graphs exported once under MODEL_CACHE_DIR)
+        "INFERENCE_BACKEND": os.getenv("INFERENCE_BACKEND", "torch").lower(),
+        # Load and warm up models in the background at startup (empty list: every legal model)
+        "WARMUP_ENABLED": os.getenv("WARMUP_ENABLED", "True").lower() in ("true", "1", "t"),
+        "WARMUP_MODELS": os.getenv("WARMUP_MODELS", ""),
+        # Micro-batching window and size for the shared inference worker
+        "INFERENCE_MAX_WAIT_MS": float(os.getenv("INFERENCE_MAX_WAIT_MS", "20")),
+        "INFERENCE_MAX_BATCH_SIZE": int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "8")),
+        # Default per-request latency budget in seconds
+        "LATENCY_BUDGET_SECONDS": float(os.getenv("LATENCY_BUDGET_SECONDS", "20")),
+        # Long documents: total token budget across map and synthesis, chunk size/overlap and per-chunk summary length
+        "DOCUMENT_TOKEN_BUDGET": int(os.getenv("DOCUMENT_TOKEN_BUDGET", "4096")),
+        "DOCUMENT_CHUNK_TOKENS": int(os.getenv("DOCUMENT_CHUNK_TOKENS", "384")),
+        "DOCUMENT_CHUNK_OVERLAP": int(os.getenv("DOCUMENT_CHUNK_OVERLAP", "32")),
+        "DOCUMENT_MAP_MAX_TOKENS": int(os.getenv("DOCUMENT_MAP_MAX_TOKENS", "96")),
+        # Prebuilt retrieval index over the legal JSON data
+        "LEGAL_INDEX_DIR": os.getenv("LEGAL_INDEX_DIR", "./app/data/index"),
+        # Precompiled binary corpus, rebuilt when the JSON data changes (empty disables)
+        "CORPUS_ARTIFACT_PATH": os.getenv("CORPUS_ARTIFACT_PATH", "./app/data/corpus.bin"),
+        # Response cache: SQLite file (empty for memory only), TTL and tier sizes
+        "RESPONSE_CACHE_PATH": os.getenv("RESPONSE_CACHE_PATH", "./cache/responses.sqlite3"),
+        "RESPONSE_CACHE_TTL_SECONDS": float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400")),
+        "RESPONSE_CACHE_MEMORY_ENTRIES": int(os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", "512")),
+        "RESPONSE_CACHE_DISK_ENTRIES": int(os.getenv("RESPONSE_CACHE_DISK_ENTRIES", "10000")),
+        # Optional near-duplicate lookup in front of generation
+        "SEMANTIC_CACHE_ENABLED": os.getenv("SEMANTIC_CACHE_ENABLED", "False").lower() in ("true", "1", "t"),
+        "SEMANTIC_CACHE_THRESHOLD": float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9")),
+        "SEMANTIC_CACHE_SIZE": int(os.getenv("SEMANTIC_CACHE_SIZE", "256")),
+        
+        # Bundled offline resources (punkt, tesseract language packs); empty dirs default to RESOURCE_DIR/<name>
+        "RESOURCE_DIR": os.getenv("RESOURCE_DIR", "./resources"),
+        "NLTK_DATA_DIR": os.getenv("NLTK_DATA_DIR", ""),
+        "TESSDATA_DIR": os.getenv("TESSDATA_DIR", ""),
+        "OCR_LANGUAGES": os.getenv("OCR_LANGUAGES", "eng"),
+        # OCR preprocessing: rescale to OCR_TARGET_DPI, OCR_THRESHOLD otsu/adaptive/none; results
+        # for the last OCR_CACHE_SIZE uploads are kept by content hash
+        "OCR_TARGET_DPI": int(os.getenv("OCR_TARGET_DPI", "300")),
+        "OCR_THRESHOLD": os.getenv("OCR_THRESHOLD", "otsu"),
+        "OCR_DESKEW": os.getenv("OCR_DESKEW", "True").lower() in ("true", "1", "t"),
+        "OCR_DENOISE": os.getenv("OCR_DENOISE", "True").lower() in ("true", "1", "t"),
+        "OCR_CACHE_SIZE": int(os.getenv("OCR_CACHE_SIZE", "64")),
+        # Processes that OCR scanned PDF pages in parallel (0 = one per CPU)
+        "OCR_WORKERS": int(os.getenv("OCR_WORKERS", "0")),
+        
+        # Speech-to-text: whisper (SPEECH_MODEL from the model cache), vosk (VOSK_MODEL directory in
+        # MODEL_CACHE_DIR, English only) or stub; empty SPEECH_MODEL uses the default Whisper checkpoint
+        "STT_BACKEND": os.getenv("STT_BACKEND", "whisper"),
+        "SPEECH_MODEL": os.getenv("SPEECH_MODEL", ""),
+        "VOSK_MODEL": os.getenv("VOSK_MODEL", "vosk-model-small-en-us-0.15"),
+        "STT_LANGUAGE": os.getenv("STT_LANGUAGE", "auto"),
+        # Long recordings are cut at pauses of STT_MIN_SILENCE_SECONDS (or every STT_MAX_SEGMENT_SECONDS)
+        # and the pieces transcribed on STT_WORKERS threads
+        "STT_WORKERS": int(os.getenv("STT_WORKERS", "2")),
+        "STT_MIN_SILENCE_SECONDS": float(os.getenv("STT_MIN_SILENCE_SECONDS", "0.5")),
+        "STT_MAX_SEGMENT_SECONDS": float(os.getenv("STT_MAX_SEGMENT_SECONDS", "20")),
         
         # Feature flags
         "ENABLE_AUDIO_TRANSCRIPTION": os.getenv("ENABLE_AUDIO_TRANSCRIPTION", "True").lower() in ("true", "1", "t"),
@@ -37,6 +126,18 @@ def load_environment():
     if env_vars["HUGGINGFACE_API_TOKEN"]:
         os.environ["HUGGINGFACE_TOKEN"] = env_vars["HUGGINGFACE_API_TOKEN"]
     
+    return env_vars
+
+def load_environment():
+    """
+    Load environment variables from .env file.
+    Will not override existing environment variables.
+    
+    Returns:
+        dict: A dictionary of environment variables
+    """
+    env_vars = read_environment()
+    
     # Store environment variables in session state for easy access
     if "env" not in st.session_state:
         st.session_state.env = env_vars
@@ -0,0 +1,56 @@
+import importlib
+import sys
+import threading
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is only imported on first attribute access.
+
+    Heavy optional dependencies (torch, transformers, cv2, speech_recognition,
+    ...) are bound at module level through this shim, so importing the app
+    stays cheap and a session only pays for the libraries it actually uses.
+    A missing package raises ImportError at first use instead of at startup.
+    """
+
+    __slots__ = ("_name", "_module", "_lock")
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+                module = self._module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "imported" if self._module is not None else "not imported"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Args:
+        name (str): Dotted module name, e.g. 'cv2' or 'langchain.text_splitter'
+
+    Returns:
+        LazyModule: A proxy that imports the module when first used
+    """
+    return LazyModule(name)
+
+
+def is_imported(name):
+    """
+    Returns:
+        bool: True if the module has been imported in this process
+    """
+    return name in sys.modules
@@ -0,0 +1,242 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.utils.env_loader import read_environment
+from app.utils.lazy_import import lazy_import
+from app.utils.resources import tesseract_options
+
+cv2 = lazy_import("cv2")
+pytesseract = lazy_import("pytesseract")
+
+# Threshold methods: Otsu for scans with even lighting, adaptive for photos with shadows
+THRESHOLD_METHODS = ("otsu", "adaptive", "none")
+
+# Images without DPI metadata are assumed to be a page; cap them at A4 height at the target DPI
+PAGE_HEIGHT_INCHES = 11.69
+
+# Skew below this is left alone; beyond the limit the estimate is more likely wrong than the page
+MIN_DESKEW_DEGREES = 0.3
+MAX_DESKEW_DEGREES = 10.0
+
+# Skew is estimated on a copy at most this many pixels on its longer side
+DESKEW_SAMPLE_PIXELS = 1000
+
+
+def content_hash(data):
+    """
+    Returns:
+        str: Hex sha256 of an uploaded file's bytes
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def image_dpi(data):
+    """
+    Returns:
+        float: Horizontal DPI from the image metadata, or None if it does not say
+    """
+    from PIL import Image
+
+    try:
+        dpi = Image.open(io.BytesIO(data)).info.get("dpi")
+    except Exception:
+        return None
+    # Many cameras write 72 DPI regardless of the real resolution
+    if not dpi or float(dpi[0]) <= 72:
+        return None
+    return float(dpi[0])
+
+
+def estimate_skew(binary):
+    """
+    Estimate the rotation of the text on a binarized page from the minimum-area
+    rectangle around its ink.
+
+    Args:
+        binary (numpy.ndarray): Black text on white, uint8
+
+    Returns:
+        float: Degrees to rotate the image by (counter-clockwise) to straighten it
+    """
+    scale = min(1.0, DESKEW_SAMPLE_PIXELS / max(binary.shape))
+    sample = binary if scale == 1.0 else cv2.resize(binary, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    ink = cv2.findNonZero(255 - sample)
+    if ink is None or len(ink) < 100:
+        return 0.0
+
+    angle = cv2.minAreaRect(ink)[-1]
+    # OpenCV versions disagree on the range minAreaRect reports ([-90, 0) or (0, 90]);
+    # the rectangle's sides are interchangeable, so fold it to the nearest axis
+    return float((angle + 45) % 90 - 45)
+
+
+class OcrPipeline:
+    """
+    Prepares document images for tesseract and caches the recognized text.
+
+    Images are rescaled to target_dpi (tesseract is most accurate around
+    300 DPI and much slower above it), converted to grayscale, lightly
+    denoised, binarized with Otsu or adaptive thresholding and optionally
+    deskewed, all in memory. Results are cached by the sha256 of the uploaded
+    bytes, so Streamlit reruns do not run OCR again.
+    """
+
+    def __init__(self, target_dpi=300, threshold="otsu", deskew=True, denoise=True, cache_size=64):
+        """
+        Initialize the pipeline.
+
+        Args:
+            target_dpi (int): Resolution images are rescaled to before OCR
+            threshold (str): 'otsu', 'adaptive' or 'none'
+            deskew (bool): Straighten slightly rotated pages
+            denoise (bool): Median-filter the grayscale image before thresholding
+            cache_size (int): Recognized documents kept in memory
+        """
+        if threshold not in THRESHOLD_METHODS:
+            raise ValueError(f"Unknown OCR threshold '{threshold}' (expected one of {', '.join(THRESHOLD_METHODS)})")
+        self.target_dpi = target_dpi
+        self.threshold = threshold
+        self.deskew = deskew
+        self.denoise = denoise
+        self.cache_size = cache_size
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def rescale(self, gray, dpi=None):
+        """
+        Returns:
+            numpy.ndarray: gray resampled to target_dpi, or capped to a page at target_dpi if dpi is unknown
+        """
+        if dpi:
+            scale = self.target_dpi / dpi
+        else:
+            scale = min(1.0, PAGE_HEIGHT_INCHES * self.target_dpi / max(gray.shape))
+        if abs(scale - 1.0) < 0.05:
+            return gray
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+        return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interpolation)
+
+    def binarize(self, gray):
+        """
+        Returns:
+            numpy.ndarray: Black text on white
+        """
+        if self.threshold == "otsu":
+            return cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+        if self.threshold == "adaptive":
+            # Block of about a tenth of an inch, so each line is thresholded against its own background
+            block = max(3, int(self.target_dpi / 10) | 1)
+            return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, block, 15)
+        return gray
+
+    def straighten(self, image, binary):
+        """
+        Returns:
+            numpy.ndarray: image rotated so the text lines are horizontal
+        """
+        angle = estimate_skew(binary)
+        if not MIN_DESKEW_DEGREES <= abs(angle) <= MAX_DESKEW_DEGREES:
+            return image
+        height, width = image.shape[:2]
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        return cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_CUBIC, borderValue=255)
+
+    def preprocess(self, image, dpi=None):
+        """
+        Prepare an image for tesseract.
+
+        Args:
+            image (numpy.ndarray): Grayscale or BGR image
+            dpi (float): Its resolution, if known
+
+        Returns:
+            numpy.ndarray: The image tesseract should read, at target_dpi
+        """
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = self.rescale(gray, dpi)
+        if self.denoise:
+            gray = cv2.medianBlur(gray, 3)
+
+        binary = self.binarize(gray)
+        if self.deskew:
+            # Skew is measured on ink pixels, so unthresholded images get a throwaway Otsu copy
+            ink = binary if self.threshold != "none" else cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+            binary = self.straighten(binary, ink)
+        return binary
+
+    def recognize(self, image, dpi=None):
+        """
+        Run tesseract on an image array, without writing it to disk first.
+
+        Args:
+            image (numpy.ndarray): Grayscale or BGR image
+            dpi (float): Its resolution, if known
+
+        Returns:
+            str: The recognized text
+        """
+        options = tesseract_options()
+        # The image is at target_dpi now; saying so stops tesseract from guessing
+        options["config"] = f"{options['config']} --dpi {self.target_dpi}".strip()
+        return pytesseract.image_to_string(self.preprocess(image, dpi), **options)
+
+    def extract_text(self, data):
+        """
+        Recognize the text in an uploaded image, reusing the result for the same bytes.
+
+        Args:
+            data (bytes): The uploaded image file
+
+        Returns:
+            str: The recognized text
+        """
+        key = content_hash(data)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._cache[key]
+            self.stats["misses"] += 1
+
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise ValueError("The file is not an image OpenCV can read")
+        text = self.recognize(image, image_dpi(data))
+
+        with self._lock:
+            self._cache[key] = text
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+                self.stats["evictions"] += 1
+        return text
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_ocr_pipeline():
+    """
+    Get the process-wide OCR pipeline, creating it from the OCR_* settings on first use.
+
+    Returns:
+        OcrPipeline: The shared pipeline
+    """
+    global _pipeline
+
+    with _pipeline_lock:
+        if _pipeline is None:
+            env = read_environment()
+            _pipeline = OcrPipeline(
+                target_dpi=env["OCR_TARGET_DPI"],
+                threshold=env["OCR_THRESHOLD"],
+                deskew=env["OCR_DESKEW"],
+                denoise=env["OCR_DENOISE"],
+                cache_size=env["OCR_CACHE_SIZE"]
+            )
+        return _pipeline
@@ -0,0 +1,218 @@
+import os
+import re
+import shutil
+import threading
+
+from app.utils.env_loader import read_environment
+
+# Abbreviations that end in a period without ending the sentence
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "md", "no", "nos", "sec", "secs", "art", "arts",
+    "v", "vs", "ltd", "co", "inc", "govt", "e.g", "i.e", "etc", "cf", "viz", "para", "cl", "ord",
+}
+
+# Candidate sentence breaks: terminal punctuation, optional closing quote/bracket, then whitespace
+_SENTENCE_BREAK = re.compile(r"([.!?]+[\"')\]]*)\s+")
+
+_lock = threading.RLock()
+_cache = {}
+
+
+def regex_sentence_spans(text):
+    """
+    Split text into sentences with a single regex scan. Used when the punkt
+    model is not available; handles common legal abbreviations ("Sec.", "v.").
+
+    Args:
+        text (str): The text to split
+
+    Returns:
+        list: (start, end) offsets of each sentence, ending after its punctuation
+    """
+    spans = []
+    start = 0
+    for match in _SENTENCE_BREAK.finditer(text):
+        end = match.end()
+        # The last word before the break decides whether it is an abbreviation
+        word = text[start:match.start()].rsplit(None, 1)[-1:] or [""]
+        next_char = text[end:end + 1]
+        if word[0].lower().rstrip(".") in ABBREVIATIONS or (next_char and next_char.islower()):
+            continue
+        spans.append((start, match.end(1)))
+        start = end
+
+    if text[start:].strip():
+        spans.append((start, len(text.rstrip())))
+    return spans
+
+
+def _cached(name, resolve):
+    """Resolve a resource once per process"""
+    with _lock:
+        if name not in _cache:
+            _cache[name] = resolve()
+        return _cache[name]
+
+
+def nltk_data_dir():
+    """
+    Returns:
+        str: The bundled NLTK data directory (RESOURCE_DIR/nltk_data unless NLTK_DATA_DIR is set)
+    """
+    env = read_environment()
+    return env["NLTK_DATA_DIR"] or os.path.join(env["RESOURCE_DIR"], "nltk_data")
+
+
+def find_punkt():
+    """
+    Look for the punkt sentence model in the bundled directory and NLTK's
+    usual locations. Never downloads.
+
+    Returns:
+        str: Path of the punkt data, or None if it is not installed
+    """
+    def resolve():
+        try:
+            import nltk
+        except ImportError:
+            return None
+
+        bundled = nltk_data_dir()
+        if bundled not in nltk.data.path:
+            nltk.data.path.insert(0, bundled)
+        try:
+            return str(nltk.data.find("tokenizers/punkt"))
+        except LookupError:
+            return None
+
+    return _cached("punkt", resolve)
+
+
+def get_sentence_splitter():
+    """
+    Returns:
+        callable: Maps text to (start, end) sentence offsets; NLTK's punkt if it is
+        installed, otherwise regex_sentence_spans
+    """
+    def resolve():
+        if find_punkt() is None:
+            return regex_sentence_spans
+
+        import nltk
+
+        punkt = nltk.data.load("tokenizers/punkt/english.pickle")
+        return lambda text: list(punkt.span_tokenize(text))
+
+    return _cached("sentence_splitter", resolve)
+
+
+def sent_tokenize(text):
+    """
+    Split text into sentences with the best available splitter.
+
+    Args:
+        text (str): The text to split
+
+    Returns:
+        list: The sentences
+    """
+    return [text[start:end].strip() for start, end in get_sentence_splitter()(text)]
+
+
+def tessdata_dir():
+    """
+    Returns:
+        str: The bundled tesseract language directory (RESOURCE_DIR/tessdata unless TESSDATA_DIR is set)
+    """
+    env = read_environment()
+    return env["TESSDATA_DIR"] or os.path.join(env["RESOURCE_DIR"], "tessdata")
+
+
+def find_tesseract():
+    """
+    Locate the tesseract binary and its language packs. Never downloads.
+
+    Returns:
+        dict: 'binary' path (or None), 'tessdata' directory used (or None for the
+        system default), 'languages' available and 'missing' requested languages
+    """
+    def resolve():
+        requested = read_environment()["OCR_LANGUAGES"].split("+")
+        binary = shutil.which("tesseract")
+
+        bundled = tessdata_dir()
+        if os.path.isdir(bundled):
+            available = sorted(name[:-len(".traineddata")] for name in os.listdir(bundled) if name.endswith(".traineddata"))
+            tessdata = bundled
+        else:
+            available = []
+            tessdata = None
+            if binary is not None:
+                try:
+                    import pytesseract
+
+                    available = sorted(pytesseract.get_languages(config=""))
+                except Exception:
+                    available = []
+
+        return {
+            "binary": binary,
+            "tessdata": tessdata,
+            "languages": available,
+            "missing": [lang for lang in requested if lang not in available],
+        }
+
+    return _cached("tesseract", resolve)
+
+
+def tesseract_options():
+    """
+    Returns:
+        dict: 'lang' and 'config' keyword arguments for pytesseract, limited to installed languages
+    """
+    tesseract = find_tesseract()
+    languages = [lang for lang in read_environment()["OCR_LANGUAGES"].split("+") if lang not in tesseract["missing"]]
+
+    config = ""
+    if tesseract["tessdata"]:
+        config = f'--tessdata-dir "{tesseract["tessdata"]}"'
+    return {"lang": "+".join(languages) or "eng", "config": config}
+
+
+def health_check():
+    """
+    Report which bundled resources are present, without downloading anything.
+
+    Returns:
+        dict: Per resource, 'ok' and details of what is missing
+    """
+    from app.models.model_store import missing_models
+
+    punkt = find_punkt()
+    tesseract = find_tesseract()
+    models = missing_models()
+
+    return {
+        "punkt": {
+            "ok": punkt is not None,
+            "path": punkt,
+            "fallback": None if punkt else "regex sentence splitter",
+        },
+        "tesseract": {
+            "ok": tesseract["binary"] is not None and not tesseract["missing"],
+            **tesseract,
+        },
+        "models": {
+            "ok": not models,
+            "missing": models,
+        },
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    report = health_check()
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if all(resource["ok"] for resource in report.values()) else 1)
@@ -1,4 +1,5 @@
 import streamlit as st
+from collections import OrderedDict
 
 def initialize_session_state():
     """
@@ -17,6 +18,13 @@ def initialize_session_state():
     if "history" not in st.session_state:
         st.session_state.history = []
     
+    # Processed document uploads by content hash, and the hash of each upload
+    if "processed_documents" not in st.session_state:
+        st.session_state.processed_documents = OrderedDict()
+    
+    if "upload_hashes" not in st.session_state:
+        st.session_state.upload_hashes = {}
+    
     # Initialize model settings if not set
     if "model_type" not in st.session_state:
         st.session_state.model_type = "Standard"
@@ -0,0 +1 @@
+# Benchmarks for AI-Lawyer Bangladesh application
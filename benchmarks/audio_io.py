@@ -0,0 +1,106 @@
+"""
+Compare the old temp-file audio path with in-memory decoding.
+
+The old path wrote every recording or upload to a NamedTemporaryFile and
+decoded it again by path. The new path decodes the bytes Streamlit already
+holds straight to 16 kHz mono float32. Both use the same decoder, so the
+difference is the disk round trip. For each format, this reports time per
+upload, bytes written to disk, and temp files left behind. The old component
+also rewrote the temp file on every rerun of the page, and only deleted it
+once Transcribe was clicked. This benchmark counts one write per upload, so
+the savings it reports are a lower bound.
+
+Usage:
+    python -m benchmarks.audio_io [--seconds 60] [--uploads 20] [--formats wav,ogg,mp3]
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+from app.utils.audio import read_audio
+
+SOURCE_RATE = 44100
+
+
+def make_upload(seconds, file_format):
+    """
+    Returns:
+        bytes: A stereo recording of speech-like tone bursts, encoded as file_format
+    """
+    t = np.arange(int(seconds * SOURCE_RATE)) / SOURCE_RATE
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t) * (np.sin(2 * np.pi * 0.5 * t) > 0)
+    frames = np.stack((tone, tone), axis=1).astype(np.float32)
+    buffer = io.BytesIO()
+    with sf.SoundFile(buffer, "w", samplerate=SOURCE_RATE, channels=2, format=file_format.upper()) as f:
+        # libsndfile's Vorbis encoder crashes on very large single writes
+        for start in range(0, len(frames), SOURCE_RATE):
+            f.write(frames[start:start + SOURCE_RATE])
+    return buffer.getvalue()
+
+
+def temp_file_path(data, suffix):
+    """The previous component: spill to a NamedTemporaryFile(delete=False), decode by path, delete"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+        tmp_file.write(data)
+        temp_filename = tmp_file.name
+    try:
+        return read_audio(temp_filename), len(data)
+    finally:
+        os.unlink(temp_filename)
+
+
+def in_memory_path(data, suffix):
+    """The current component: decode the uploaded bytes directly"""
+    return read_audio(data, suffix=suffix), 0
+
+
+def leftover_temp_files():
+    return {name for name in os.listdir(tempfile.gettempdir()) if name.startswith(("tmp", "ai-lawyer-audio-"))}
+
+
+def run(name, decode, data, suffix, uploads):
+    """
+    Returns:
+        tuple: (seconds per upload, bytes written per upload, decoded samples)
+    """
+    before = leftover_temp_files()
+    started = time.perf_counter()
+    for _ in range(uploads):
+        audio, written = decode(data, suffix)
+    elapsed = (time.perf_counter() - started) / uploads
+    leaked = len(leftover_temp_files() - before)
+
+    print(f"  {name:<12}{elapsed * 1000:>10.1f} ms{written / 1e6:>12.2f} MB{leaked:>8}")
+    return elapsed, written, audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the audio upload path")
+    parser.add_argument("--seconds", type=float, default=60, help="Length of each upload")
+    parser.add_argument("--uploads", type=int, default=20, help="Uploads decoded per format and path")
+    parser.add_argument("--formats", default="wav,ogg,mp3", help="Comma-separated upload formats")
+    args = parser.parse_args()
+
+    print(f"{args.uploads} uploads of {args.seconds:.0f}s per format\n")
+    print(f"  {'path':<12}{'per upload':>13}{'disk writes':>15}{'leaked':>8}")
+    for file_format in args.formats.split(","):
+        data = make_upload(args.seconds, file_format)
+        suffix = f".{file_format}"
+        print(f"{file_format} ({len(data) / 1e6:.2f} MB)")
+
+        old_seconds, _, old_audio = run("temp file", temp_file_path, data, suffix, args.uploads)
+        new_seconds, _, new_audio = run("in memory", in_memory_path, data, suffix, args.uploads)
+
+        if not np.array_equal(old_audio, new_audio):
+            print("  ✗ The two paths decoded different audio")
+        print(f"  {len(new_audio) / 16000:.1f}s at 16 kHz mono float32, "
+              f"{(old_seconds - new_seconds) * 1000:+.1f} ms saved per upload\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Compare the precompiled citation parser with the previous sent_tokenize +
+substring-marker extractor on a large set of synthetic responses.
+
+Reports throughput for both, plus how often each flags sentences that
+contain no citation (e.g. "action", "contract") or misses real ones.
+
+Usage:
+    python -m benchmarks.citation_extraction [--responses 5000] [--seed 0]
+"""
+import argparse
+import random
+import time
+
+from app.models.citation_parser import extract_citations
+from app.models.corpus_store import get_corpus_store
+from app.utils.resources import find_punkt, sent_tokenize
+
+PLAIN_SENTENCES = [
+    "You should keep copies of every document you sign.",
+    "Any action taken by the landlord must follow due process.",
+    "Read the contract carefully before you sign it.",
+    "The court may consider the interests of the children.",
+    "Factors such as income and conduct are taken into account.",
+    "Contact a qualified lawyer for advice on your specific situation.",
+    "Your employer cannot deduct wages arbitrarily.",
+    "Interaction with the police should be recorded where possible.",
+    "Act quickly to protect rights.",
+]
+
+CITED_TEMPLATES = [
+    "Under Section {section} of the {act}, {year}, you may apply to the court.",
+    "The {act} governs this matter.",
+    "Article {article} of the Constitution guarantees equality before law.",
+    "See {party} v. State, ({year}) {volume} DLR (AD) {page}.",
+    "Sec. {section} of the {act} sets out the procedure.",
+]
+
+PARTIES = ["Abdul Kader", "Rahima Khatun", "Bangladesh Bank", "Md. Rafiqul Islam", "Sonali Bank Ltd."]
+
+
+def legacy_extract_citations(response):
+    """The extractor this benchmark compares against (punkt sentences + substring markers)"""
+    sentences = sent_tokenize(response)
+    citations = []
+    regular_text = []
+
+    for sentence in sentences:
+        if any(citation_marker in sentence for citation_marker in ["Section", "Act", "Article", "Code", "vs.", "v."]):
+            citations.append(sentence)
+        else:
+            regular_text.append(sentence)
+
+    if not citations and "References:" in response:
+        parts = response.split("References:")
+        if len(parts) > 1:
+            regular_text = [parts[0]]
+            citations = [f"References: {parts[1]}"]
+
+    return " ".join(regular_text), "\n".join(citations) if citations else ""
+
+
+def make_responses(count, acts, seed):
+    """
+    Build synthetic responses of plain and cited sentences.
+
+    Returns:
+        list: (response text, number of cited sentences) tuples
+    """
+    rng = random.Random(seed)
+    responses = []
+    for _ in range(count):
+        sentences = []
+        cited = 0
+        for _ in range(rng.randint(4, 12)):
+            if rng.random() < 0.3:
+                act = rng.choice(acts)
+                sentences.append(rng.choice(CITED_TEMPLATES).format(
+                    act=act.name.replace("The ", "the ", 1),
+                    year=act.year,
+                    section=rng.randint(1, 120),
+                    article=rng.randint(1, 153),
+                    party=rng.choice(PARTIES),
+                    volume=rng.randint(1, 75),
+                    page=rng.randint(1, 600),
+                ))
+                cited += 1
+            else:
+                sentences.append(rng.choice(PLAIN_SENTENCES))
+        responses.append((" ".join(sentences), cited))
+    return responses
+
+
+def run(name, extract, responses):
+    """Time one extractor and count its cited-sentence errors against the ground truth"""
+    started = time.perf_counter()
+    outputs = [extract(text) for text, _ in responses]
+    elapsed = time.perf_counter() - started
+
+    wrong = 0
+    for (_, expected), output in zip(responses, outputs):
+        found = len(output[1].split("\n")) if output[1] else 0
+        wrong += abs(found - expected)
+
+    print(f"{name:<12}{elapsed:>10.3f}s{len(responses) / elapsed:>14.0f}/s{wrong:>16}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark citation extraction")
+    parser.add_argument("--responses", type=int, default=5000, help="Number of synthetic responses")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    store = get_corpus_store()
+    acts = [act for key in store.categories() for act in store.category(key).acts]
+    responses = make_responses(args.responses, acts, args.seed)
+
+    if find_punkt() is None:
+        print("punkt is not installed; the legacy extractor uses the regex sentence splitter")
+    print(f"{len(responses)} synthetic responses, {sum(len(text) for text, _ in responses) / 1e6:.1f} MB")
+    print(f"{'extractor':<12}{'time':>11}{'throughput':>16}{'sentence errors':>16}")
+    legacy = run("legacy", legacy_extract_citations, responses)
+    parser_time = run("parser", lambda text: extract_citations(text, store), responses)
+    print(f"\nSpeedup: {legacy / parser_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Measure what a Streamlit worker pays to import the app before the first render.
+
+Runs app.py's module-level code in a fresh interpreter under `python -X importtime`
+(with model warm-up disabled, so only imports are measured), then reports the
+most expensive modules. Exits nonzero when the total import time exceeds
+--max-ms, regresses past a recorded --baseline by more than --tolerance, or
+when any heavy dependency that a text-only session must not load was imported.
+
+Usage:
+    python -m benchmarks.import_time [--max-ms 3000] [--top 20] [--output import_time.json]
+    python -m benchmarks.import_time --baseline import_time.json [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Dependencies only the model, audio and image paths need
+FORBIDDEN_MODULES = [
+    "torch", "transformers", "langchain", "nltk", "optimum", "onnxruntime",
+    "cv2", "pytesseract", "speech_recognition", "soundfile",
+]
+
+SCRIPT = "import runpy; runpy.run_path('app.py')"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_imports(script=SCRIPT):
+    """
+    Run script in a fresh interpreter with -X importtime.
+
+    Returns:
+        list: (module, self microseconds, cumulative microseconds, depth) per import, in order
+    """
+    env = dict(os.environ, WARMUP_ENABLED="False", PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing the app failed:\n{result.stderr[-2000:]}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        # import time:       self [us] |  cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def summarize(imports, top):
+    """
+    Returns:
+        dict: Total import time, module count and the top modules by cumulative time
+    """
+    total_us = sum(self_us for _, self_us, _, _ in imports)
+    # Top-level packages only, so a package and its submodules are not counted twice
+    packages = {}
+    for name, self_us, _, _ in imports:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(imports),
+        "packages": {
+            package: round(us / 1000, 1)
+            for package, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+        "slowest_modules": [
+            {"module": name, "self_ms": round(self_us / 1000, 1), "cumulative_ms": round(cumulative_us / 1000, 1)}
+            for name, self_us, cumulative_us, _ in sorted(imports, key=lambda item: -item[2])[:top]
+        ],
+        "forbidden_imported": sorted({
+            name.split(".")[0] for name, _, _, _ in imports if name.split(".")[0] in FORBIDDEN_MODULES
+        }),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app startup import time")
+    parser.add_argument("--max-ms", type=float, default=3000, help="Fail above this total import time")
+    parser.add_argument("--baseline", help="JSON report from a previous --output run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown over the baseline (fraction)")
+    parser.add_argument("--top", type=int, default=20, help="Number of modules and packages to report")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = summarize(measure_imports(), args.top)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['modules']} modules imported in {report['total_ms']:.1f} ms\n")
+        print(f"{'package':<32}{'self ms':>10}")
+        for package, ms in report["packages"].items():
+            print(f"{package:<32}{ms:>10.1f}")
+        print(f"\n{'module':<48}{'self ms':>10}{'cumul. ms':>12}")
+        for entry in report["slowest_modules"]:
+            print(f"{entry['module'][:47]:<48}{entry['self_ms']:>10.1f}{entry['cumulative_ms']:>12.1f}")
+        print()
+
+    failures = []
+    if report["forbidden_imported"]:
+        failures.append(f"heavy dependencies imported at startup: {', '.join(report['forbidden_imported'])}")
+    if report["total_ms"] > args.max_ms:
+        failures.append(f"total import time {report['total_ms']:.1f} ms exceeds {args.max_ms:.0f} ms")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        limit = baseline["total_ms"] * (1 + args.tolerance)
+        if report["total_ms"] > limit:
+            failures.append(
+                f"total import time {report['total_ms']:.1f} ms regressed past {limit:.1f} ms "
+                f"(baseline {baseline['total_ms']:.1f} ms + {args.tolerance:.0%})"
+            )
+
+    for failure in failures:
+        print(f"✗ {failure}")
+    if not failures:
+        print("✓ Startup imports within budget")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare model load strategies on this host.
+
+For every strategy usable on the detected backend, the model is loaded from
+scratch, then a fixed-length generation is timed to get per-token latency.
+
+Usage:
+    python -m benchmarks.model_loading [--model google/flan-t5-small] [--tokens 64] [--json]
+"""
+import argparse
+import gc
+import json
+import statistics
+import time
+
+import torch
+
+from app.models.hardware import STRATEGIES, available_strategies, configure_threads, detect_backend
+from app.models.model_registry import estimate_model_bytes, load_model_and_tokenizer
+
+PROMPT = "What are the legal requirements for filing a divorce case in Bangladesh?"
+
+
+def benchmark_strategy(model_name, strategy, num_tokens, repeats):
+    """
+    Load the model with one strategy and time a fixed-length generation.
+
+    Returns:
+        dict: Load time, size and per-token latency for the strategy
+    """
+    started = time.perf_counter()
+    model, tokenizer = load_model_and_tokenizer(model_name, strategy.weight_dtype, strategy.device)
+    load_seconds = time.perf_counter() - started
+
+    inputs = tokenizer(PROMPT, return_tensors="pt").to(strategy.device)
+    generate_kwargs = {"min_new_tokens": num_tokens, "max_new_tokens": num_tokens, "do_sample": False}
+
+    with torch.inference_mode():
+        # Warm-up run so one-off kernel selection is not measured
+        model.generate(**inputs, **generate_kwargs)
+
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            model.generate(**inputs, **generate_kwargs)
+            timings.append(time.perf_counter() - started)
+
+    result = {
+        "strategy": strategy.name,
+        "load_seconds": round(load_seconds, 3),
+        "size_mb": round(estimate_model_bytes(model) / (1024 * 1024), 1),
+        "ms_per_token": round(statistics.median(timings) / num_tokens * 1000, 2),
+    }
+
+    del model, tokenizer
+    gc.collect()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model load strategies")
+    parser.add_argument("--model", default="google/flan-t5-small", help="Model to benchmark")
+    parser.add_argument("--tokens", type=int, default=64, help="Tokens generated per run")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed generations per strategy")
+    parser.add_argument("--strategy", action="append", help="Strategy to run (default: all available)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    configure_threads()
+    names = args.strategy or available_strategies()
+    results = [benchmark_strategy(args.model, STRATEGIES[name], args.tokens, args.repeats) for name in names]
+
+    if args.json:
+        print(json.dumps({"backend": detect_backend(), "threads": torch.get_num_threads(), "results": results}, indent=2))
+        return
+
+    print(f"Backend: {detect_backend()}, threads: {torch.get_num_threads()}, model: {args.model}")
+    print(f"{'strategy':<20}{'load (s)':>10}{'size (MB)':>12}{'ms/token':>12}")
+    for result in results:
+        print(f"{result['strategy']:<20}{result['load_seconds']:>10}{result['size_mb']:>12}{result['ms_per_token']:>12}")
+
+
+if __name__ == "__main__":
+    main()
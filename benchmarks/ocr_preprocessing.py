@@ -0,0 +1,87 @@
+"""
+Compare the OCR preprocessing pipeline with the previous fixed-threshold +
+fastNlMeansDenoising step on synthetic page photos.
+
+Pages are rendered at --dpi and slightly rotated; tesseract itself is not
+run, so only the preprocessing cost (and the size of the image tesseract
+would get) is measured. Pass --tesseract to OCR both outputs as well.
+
+Usage:
+    python -m benchmarks.ocr_preprocessing [--dpi 600] [--pages 3] [--tesseract]
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from app.utils.ocr import OcrPipeline, estimate_skew
+
+LINE = "Section {n} of the Muslim Family Laws Ordinance, 1961 requires written notice."
+
+
+def make_page(dpi, skew_degrees, seed):
+    """
+    Returns:
+        numpy.ndarray: A BGR photo-like A4 page of text at dpi, rotated by skew_degrees
+    """
+    rng = np.random.default_rng(seed)
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    page = np.full((height, width), 235, dtype=np.uint8)
+    scale = dpi / 300
+    for n in range(40):
+        y = int((150 + n * 75) * scale)
+        cv2.putText(page, LINE.format(n=n + 1), (int(120 * scale), y), cv2.FONT_HERSHEY_SIMPLEX, 1.1 * scale, 30, max(1, int(2 * scale)))
+
+    # Uneven lighting and sensor noise, as in a phone photo
+    gradient = np.linspace(-25, 15, width, dtype=np.float32)[None, :]
+    noisy = page.astype(np.float32) + gradient + rng.normal(0, 8, page.shape).astype(np.float32)
+    page = np.clip(noisy, 0, 255).astype(np.uint8)
+
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), skew_degrees, 1.0)
+    page = cv2.warpAffine(page, matrix, (width, height), borderValue=235)
+    return cv2.cvtColor(page, cv2.COLOR_GRAY2BGR)
+
+
+def legacy_preprocess(image):
+    """The previous extract_text_from_image preprocessing, without its disk round trip"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    _, binary = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
+    return cv2.fastNlMeansDenoising(binary, None, 10, 7, 21)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OCR preprocessing")
+    parser.add_argument("--dpi", type=int, default=600, help="Resolution of the synthetic pages")
+    parser.add_argument("--pages", type=int, default=3, help="Number of pages")
+    parser.add_argument("--tesseract", action="store_true", help="Also time tesseract on both outputs")
+    args = parser.parse_args()
+
+    pages = [make_page(args.dpi, skew, seed) for seed, skew in enumerate(np.linspace(-3, 3, args.pages))]
+    pipelines = {
+        "legacy": legacy_preprocess,
+        "otsu": lambda image: OcrPipeline(threshold="otsu").preprocess(image, dpi=args.dpi),
+        "adaptive": lambda image: OcrPipeline(threshold="adaptive").preprocess(image, dpi=args.dpi),
+    }
+
+    print(f"{args.pages} pages at {args.dpi} DPI ({pages[0].shape[1]}x{pages[0].shape[0]})\n")
+    print(f"{'pipeline':<12}{'per page':>12}{'output':>14}{'residual skew':>16}")
+    for name, preprocess in pipelines.items():
+        started = time.perf_counter()
+        outputs = [preprocess(page) for page in pages]
+        elapsed = (time.perf_counter() - started) / len(pages)
+        skew = np.mean([abs(estimate_skew(output)) for output in outputs])
+        size = f"{outputs[0].shape[1]}x{outputs[0].shape[0]}"
+        print(f"{name:<12}{elapsed * 1000:>9.0f} ms{size:>14}{skew:>15.2f}°")
+
+        if args.tesseract:
+            import pytesseract
+
+            started = time.perf_counter()
+            for output in outputs:
+                pytesseract.image_to_string(output)
+            print(f"{'':<12}tesseract: {(time.perf_counter() - started) / len(pages) * 1000:.0f} ms per page")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import sys
 from dotenv import load_dotenv
 import argparse
 from transformers import AutoTokenizer, pipeline
+from app.models.model_store import ModelNotAvailableError, resolve_model
 
 def test_huggingface_api():
     """
@@ -28,14 +29,18 @@ def test_huggingface_api():
         model_name = "google/flan-t5-small"
         print(f"Loading model: {model_name}")
         
-        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        # Resolve to the local model cache (downloads only when USE_LOCAL_MODELS=False)
+        model_path = resolve_model(model_name)
+        print(f"✓ Model found in local cache: {model_path}")
+        
+        tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=True)
         print(f"✓ Tokenizer loaded successfully")
         
         # Create a simple pipeline
         print("Creating text generation pipeline...")
         pipe = pipeline(
             "text-generation", 
-            model=model_name,
+            model=model_path,
             tokenizer=tokenizer,
             max_length=50
         )
@@ -57,6 +62,9 @@ def test_huggingface_api():
             print("✗ Model failed to generate a response")
             return False
             
+    except ModelNotAvailableError as e:
+        print(f"✗ {str(e)}")
+        return False
     except Exception as e:
         print(f"✗ Error: {str(e)}")
         print("\nTroubleshooting tips:")
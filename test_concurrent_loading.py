@@ -0,0 +1,81 @@
+import sys
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from app.models.legal_agent import FALLBACK_ADVICE, LegalAgent
+from app.models.model_registry import get_model_registry
+from app.models.response_cache import get_response_cache
+
+CATEGORIES = ["Family Law", "Criminal Law", "Property Law", "Labor Law", "Tax Law"]
+QUERY = "What are my rights if my employer does not pay my salary?"
+
+
+def run_concurrent_loading(num_threads, requests_per_thread):
+    """
+    Send queries from many threads at once and check that every model is
+    loaded exactly once, however many agents and threads ask for it.
+    """
+    # Cached answers would skip loading altogether
+    get_response_cache().clear()
+
+    registry = get_model_registry()
+    loads = Counter()
+    loads_lock = threading.Lock()
+    load_model = registry.loader
+
+    # Count real loads by wrapping the registry's loader
+    def counting_loader(model_name, dtype, device):
+        with loads_lock:
+            loads[(model_name, dtype, device)] += 1
+        return load_model(model_name, dtype, device)
+
+    registry.loader = counting_loader
+
+    def worker(index):
+        # Each thread stands in for a session with its own agents; get_legal_agent()
+        # keeps them in st.session_state, which only exists under `streamlit run`
+        agents = {}
+        results = []
+        for i in range(requests_per_thread):
+            category = CATEGORIES[(index + i) % len(CATEGORIES)]
+            if category not in agents:
+                agents[category] = LegalAgent(category)
+            results.append(agents[category].process_query(QUERY))
+        return results
+
+    print(f"Running {num_threads} threads x {requests_per_thread} queries...")
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        results = [r for batch in executor.map(worker, range(num_threads)) for r in batch]
+
+    errors = [r for r in results if r.get("advice") == FALLBACK_ADVICE]
+    print(f"✓ {len(results)} responses received ({len(errors)} fallbacks)")
+
+    for key, count in loads.items():
+        marker = "✓" if count == 1 else "✗"
+        print(f"{marker} {'|'.join(key)} loaded {count} time(s)")
+
+    if not loads:
+        print("✗ No model was loaded")
+        return False
+
+    if any(count != 1 for count in loads.values()):
+        print("\nStress test failed: some models were loaded more than once")
+        return False
+
+    print("\nStress test passed: each model was loaded exactly once.")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress test concurrent model loading")
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent threads")
+    parser.add_argument("--requests", type=int, default=3, help="Queries per thread")
+
+    args = parser.parse_args()
+
+    success = run_concurrent_loading(args.threads, args.requests)
+
+    # Exit with appropriate code
+    sys.exit(0 if success else 1)
@@ -0,0 +1,88 @@
+import re
+import sys
+import argparse
+
+import torch
+
+from app.models.hardware import STRATEGIES
+from app.models.model_registry import load_model_and_tokenizer
+
+QUESTIONS_FILE = "QUESTIONS.md"
+
+
+def load_questions(path=QUESTIONS_FILE):
+    """
+    Read the sample questions, grouped under their '# Category' headings.
+
+    Returns:
+        list: (category, question) tuples
+    """
+    questions = []
+    category = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#"):
+                category = line.lstrip("#").strip()
+                continue
+            match = re.search(r'"(.+)"', line)
+            if match:
+                questions.append((category, match.group(1)))
+    return questions
+
+
+def generate(model, tokenizer, prompt, max_new_tokens):
+    """Greedy-decode one prompt"""
+    inputs = tokenizer(prompt, return_tensors="pt", truncation=True).to(model.device)
+    with torch.no_grad():
+        outputs = model.generate(**inputs, max_new_tokens=max_new_tokens, do_sample=False)
+    return tokenizer.decode(outputs[0], skip_special_tokens=True)
+
+
+def run_onnx_parity(model_name, max_new_tokens):
+    """
+    Check that the ONNX Runtime backend produces the same greedy output as
+    the torch model for every question in QUESTIONS.md.
+    """
+    questions = load_questions()
+    print(f"Comparing torch and ONNX Runtime outputs of {model_name} on {len(questions)} questions...")
+
+    torch_strategy = STRATEGIES["cpu-fp32"]
+    onnx_strategy = STRATEGIES["onnx-cpu"]
+    torch_model, torch_tokenizer = load_model_and_tokenizer(model_name, torch_strategy.weight_dtype, torch_strategy.device)
+    onnx_model, onnx_tokenizer = load_model_and_tokenizer(model_name, onnx_strategy.weight_dtype, onnx_strategy.device)
+    print("✓ Both backends loaded")
+
+    mismatches = 0
+    for category, question in questions:
+        prompt = f"You are an AI legal assistant specializing in {category} under Bangladesh law.\n\nUser Query: {question}\n\nLegal Analysis and Advice:"
+        expected = generate(torch_model, torch_tokenizer, prompt, max_new_tokens)
+        actual = generate(onnx_model, onnx_tokenizer, prompt, max_new_tokens)
+
+        if expected == actual:
+            print(f"✓ {question[:70]}")
+        else:
+            mismatches += 1
+            print(f"✗ {question[:70]}")
+            print(f"    torch: {expected}")
+            print(f"    onnx:  {actual}")
+
+    if mismatches:
+        print(f"\n{mismatches} of {len(questions)} outputs differ between backends")
+        return False
+
+    print("\nParity test passed: the ONNX backend matches the torch pipeline.")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ONNX Runtime and torch generation outputs")
+    parser.add_argument("--model", default="google/flan-t5-small", help="Model to compare")
+    parser.add_argument("--max-new-tokens", type=int, default=64, help="Tokens generated per question")
+
+    args = parser.parse_args()
+
+    success = run_onnx_parity(args.model, args.max_new_tokens)
+
+    # Exit with appropriate code
+    sys.exit(0 if success else 1)
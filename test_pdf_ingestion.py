@@ -0,0 +1,183 @@
+import io
+import sys
+import time
+import argparse
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.utils.documents import assemble_pages, get_ocr_executor, iter_pdf_pages, ocr_workers, page_at
+
+TEXT_LINE = "Section {page} of the Transfer of Property Act, 1882 applies to this lease."
+
+
+def text_pdf(lines):
+    """
+    Returns:
+        bytes: A one-page PDF with a real text layer (Helvetica), written by hand
+    """
+    content = "BT /F1 14 Tf 72 720 Td 18 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return pdf.encode("latin-1")
+
+
+def scanned_pdf(lines, dpi=200):
+    """
+    Returns:
+        bytes: A one-page PDF holding only an image of the text, like a scan
+    """
+    page = Image.new("L", (int(8.5 * dpi), int(11 * dpi)), 255)
+    draw = ImageDraw.Draw(page)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", int(dpi / 6))
+    except OSError:
+        font = ImageFont.load_default()
+    for i, line in enumerate(lines):
+        draw.text((dpi, dpi + i * dpi // 3), line, fill=0, font=font)
+    buffer = io.BytesIO()
+    page.save(buffer, format="PDF", resolution=dpi)
+    return buffer.getvalue()
+
+
+def make_document(num_pages):
+    """
+    Build a PDF alternating text-layer and scanned pages.
+
+    Returns:
+        tuple: (PDF bytes, list of 'text'/'ocr' expected per page)
+    """
+    import pypdfium2 as pdfium
+
+    document = pdfium.PdfDocument.new()
+    expected = []
+    for number in range(1, num_pages + 1):
+        lines = [TEXT_LINE.format(page=number)]
+        scanned = number % 2 == 0
+        part = pdfium.PdfDocument(scanned_pdf(lines) if scanned else text_pdf(lines))
+        document.import_pages(part)
+        expected.append("ocr" if scanned else "text")
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue(), expected
+
+
+def run_pdf_ingestion(num_pages):
+    """
+    Ingest a mixed PDF and check that only scanned pages are OCR'd, pages come
+    back in order with their text, and page offsets point into the assembled text.
+    """
+    data, expected = make_document(num_pages)
+    print(f"Ingesting a {num_pages} page PDF ({expected.count('ocr')} scanned) on {ocr_workers()} OCR processes...")
+
+    started = time.perf_counter()
+    first = None
+    pages = []
+    preview = []
+    try:
+        for page in iter_pdf_pages(data, preview=preview):
+            if first is None:
+                first = time.perf_counter() - started
+            pages.append(page)
+    except Exception as e:
+        print(f"✗ Ingestion failed: {str(e)}")
+        return False
+    elapsed = time.perf_counter() - started
+    print(f"✓ {len(pages)} pages in {elapsed:.2f}s, first after {first:.2f}s")
+
+    success = True
+    if [page.number for page in pages] != list(range(1, num_pages + 1)):
+        print("✗ Pages were not returned in order")
+        success = False
+
+    if [page.source for page in pages] != expected:
+        print(f"✗ Expected sources {expected}, got {[page.source for page in pages]}")
+        success = False
+
+    failed = {page.number: page.error for page in pages if page.error}
+    if failed:
+        print(f"✗ Pages failed: {failed}")
+        success = False
+
+    missed = [page.number for page in pages if f"Section {page.number}" not in page.text]
+    if missed:
+        print(f"✗ Text not found on pages {missed}")
+        success = False
+    else:
+        print("✓ Every page's text was extracted")
+
+    text, offsets = assemble_pages(pages)
+    position = text.find(f"Section {num_pages} ")
+    if position < 0 or page_at(offsets, position) != num_pages:
+        print("✗ Page offsets do not match the assembled text")
+        success = False
+    else:
+        print("✓ Page offsets map text back to its page")
+
+    if not preview:
+        print("✗ No preview of the first page")
+        success = False
+
+    if success:
+        print("\nPDF ingestion test passed.")
+    return success
+
+
+def run_broken_pool_recovery(num_pages):
+    """
+    Kill the OCR worker processes and check that ingestion replaces the
+    broken pool and still reads every page.
+    """
+    data, expected = make_document(num_pages)
+    executor = get_ocr_executor()
+    # Start the workers, then kill them as the OOM killer would
+    executor.submit(time.sleep, 0).result()
+    for process in list(executor._processes.values()):
+        process.kill()
+        process.join()
+    print(f"Killed {ocr_workers()} OCR processes; ingesting {num_pages} pages...")
+
+    try:
+        pages = list(iter_pdf_pages(data))
+    except Exception as e:
+        print(f"✗ Ingestion failed on a broken pool: {str(e)}")
+        return False
+
+    failed = {page.number: page.error for page in pages if page.error}
+    if failed or [page.source for page in pages] != expected:
+        print(f"✗ Pages were not recovered: {failed}")
+        return False
+    if get_ocr_executor() is executor:
+        print("✗ The broken pool was not replaced")
+        return False
+
+    print("✓ The broken pool was replaced and every page was read")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test PDF ingestion with parallel OCR")
+    parser.add_argument("--pages", type=int, default=8, help="Pages in the test document")
+
+    args = parser.parse_args()
+
+    success = run_pdf_ingestion(args.pages)
+    success = run_broken_pool_recovery(args.pages) and success
+
+    # Exit with appropriate code
+    sys.exit(0 if success else 1)